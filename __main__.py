@@ -1,4 +1,4 @@
-from .ipcalc import main  # or wherever your main logic lives
+from ipcalc import main
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
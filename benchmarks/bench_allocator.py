@@ -0,0 +1,65 @@
+"""
+Allocator benchmark: allocations and releases per second in a fragmented supernet.
+
+    python benchmarks/bench_allocator.py [--parent 10.0.0.0/8] [--existing 100000] [--operations 100000]
+
+The allocator is seeded with --existing random /26 - /30 allocations, then asked for /26s, half of which are released
+again in random order.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from subnet_calc.allocator import Allocator
+from subnet_calc.prefix import Prefix
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--parent', default='10.0.0.0/8')
+    parser.add_argument('--existing', type=int, default=100_000)
+    parser.add_argument('--operations', type=int, default=100_000)
+    args = parser.parse_args()
+
+    # Random non-overlapping allocations, at most one per /26
+    parent = Prefix.parse(args.parent)
+    rng = random.Random(10)
+    slots = rng.sample(range(1 << (26 - parent.length)), args.existing)
+    existing = [Prefix(parent.network | (slot << 6), rng.randint(26, 30)) for slot in slots]
+
+    start = time.perf_counter()
+    allocator = Allocator(parent, existing)
+    print(f'seeded with {args.existing:,} allocations in {time.perf_counter() - start:.2f} s, {len(allocator.free_blocks()):,} free blocks')
+
+    start = time.perf_counter()
+    allocated = [allocator.allocate(26) for _ in range(args.operations)]
+    elapsed = time.perf_counter() - start
+    print(f'allocate(26):  {args.operations / elapsed:>10,.0f} /s')
+
+    rng.shuffle(allocated)
+    released = allocated[:args.operations // 2]
+    start = time.perf_counter()
+    for prefix in released:
+        allocator.release(prefix)
+    elapsed = time.perf_counter() - start
+    print(f'release:       {len(released) / elapsed:>10,.0f} /s')
+
+    start = time.perf_counter()
+    for _ in range(len(released)):
+        allocator.allocate(26)
+    elapsed = time.perf_counter() - start
+    print(f're-allocate:   {len(released) / elapsed:>10,.0f} /s')
+
+    start = time.perf_counter()
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'allocator-snapshot.json')
+    allocator.save(path)
+    saved = time.perf_counter() - start
+    Allocator.load(path)
+    print(f'save: {saved:.2f} s, load: {time.perf_counter() - start - saved:.2f} s ({os.path.getsize(path) / 2**20:.1f} MiB)')
+    os.remove(path)
+
+if __name__ == '__main__':
+    main()
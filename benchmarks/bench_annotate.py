@@ -0,0 +1,59 @@
+"""
+Log annotation benchmark: runs `ipcalc annotate` end to end over a generated access log with 1 to N worker processes,
+reporting the lines per second and the peak memory of the largest process.
+
+    python benchmarks/bench_annotate.py [--lines 1000000] [--prefixes 100000] [--max-jobs N]
+
+The inventory is the synthetic routing table from bench_lookup.py, and the log lines are web server access log lines,
+half of them from addresses inside /8s that are in the inventory.
+"""
+import argparse
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bench_lookup import random_prefixes
+from subnet_calc.prefix import int_to_ip
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+def write_files(directory: str, lines: int, prefixes: int):
+    entries = random_prefixes(prefixes)
+    table = os.path.join(directory, 'prefixes.csv')
+    with open(table, 'w') as file:
+        file.write('prefix,label\n')
+        file.writelines(f'{prefix},site-{label}\n' for prefix, label in entries)
+
+    rng = random.Random(3)
+    networks = [prefix.network for prefix, _ in entries]
+    log = os.path.join(directory, 'access.log')
+    with open(log, 'w') as file:
+        for _ in range(lines):
+            ip = rng.choice(networks) | rng.getrandbits(8) if rng.random() < 0.5 else rng.getrandbits(32)
+            file.write(f'{int_to_ip(ip)} - - [18/Oct/2026:10:00:00 +0000] "GET /index.html HTTP/1.1" 200 {rng.randrange(100000)}\n')
+    return table, log
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--lines', type=int, default=1_000_000)
+    parser.add_argument('--prefixes', type=int, default=100_000)
+    parser.add_argument('--max-jobs', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        table, log = write_files(directory, args.lines, args.prefixes)
+        print(f'{args.lines:,} lines ({os.path.getsize(log) / 2**20:.0f} MiB), {args.prefixes:,} prefixes, {os.cpu_count()} CPUs')
+        for jobs in range(1, args.max_jobs + 1):
+            command = [sys.executable, '-c', 'import ipcalc; ipcalc.main()', 'annotate', '--table', table, '--jobs', str(jobs), log]
+            result = subprocess.run(command, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+            # ru_maxrss covers every finished child, including the workers, so this is the largest single process so far
+            rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+            print(f'jobs {jobs}: {result.stderr.strip()}, peak RSS {rss:.0f} MiB')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Co-process benchmark: the round trip latency of one query at a time through a resident `ipcalc --coprocess`, against
+starting a new ipcalc process for every query as a shell script would.
+
+    python benchmarks/bench_coprocess.py [--queries 20000] [--spawns 20]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bench_parallel import random_cidrs
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+COMMAND = [sys.executable, '-c', 'import ipcalc; ipcalc.main()']
+
+def percentile(latencies: list[float], fraction: float):
+    return latencies[min(int(len(latencies) * fraction), len(latencies) - 1)] * 1000
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--queries', type=int, default=20000)
+    parser.add_argument('--spawns', type=int, default=20)
+    args = parser.parse_args()
+
+    cidrs = random_cidrs(args.queries)
+
+    start = time.perf_counter()
+    process = subprocess.Popen([*COMMAND, '--coprocess'], cwd=ROOT, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+    process.stdin.write(f'{cidrs[0]}\n')
+    process.stdin.flush()
+    process.stdout.readline()
+    first = time.perf_counter() - start
+
+    # Strictly one query in flight, as a script that waits for each answer would do
+    latencies = []
+    for cidr in cidrs:
+        start = time.perf_counter()
+        process.stdin.write(f'{cidr}\n')
+        process.stdin.flush()
+        process.stdout.readline()
+        latencies.append(time.perf_counter() - start)
+    process.stdin.close()
+    process.wait()
+    latencies.sort()
+    mean = sum(latencies) / len(latencies) * 1000
+
+    spawns = []
+    for cidr in cidrs[:args.spawns]:
+        start = time.perf_counter()
+        subprocess.run([*COMMAND, cidr], cwd=ROOT, stdout=subprocess.DEVNULL, check=True)
+        spawns.append(time.perf_counter() - start)
+    spawns.sort()
+    spawn = sum(spawns) / len(spawns) * 1000
+
+    print(f'{args.queries:,} queries, {os.cpu_count()} CPUs')
+    print(f'co-process:  mean {mean:.3f} ms  p50 {percentile(latencies, 0.5):.3f} ms  p99 {percentile(latencies, 0.99):.3f} ms'
+          f'  (first answer after {first * 1000:.0f} ms)')
+    print(f'spawn:       mean {spawn:.1f} ms  p50 {percentile(spawns, 0.5):.1f} ms')
+    print(f'{spawn / mean:,.0f}x lower latency per query')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""
+HostRange benchmark: iteration throughput over the hosts of a prefix.
+
+    python benchmarks/bench_hosts.py [--cidr 10.0.0.0/8] [--chunk 65536]
+
+Compares chunked iteration (ints and strings) and plain iteration with converting each address with int_to_ip and with
+the standard library's ipaddress.
+"""
+import argparse
+import ipaddress
+import os
+import sys
+import time
+from collections import deque
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from subnet_calc.hosts import hosts
+from subnet_calc.prefix import int_to_ip
+
+def consume(chunk):
+    # An int batch is itself a lazy range, so step through it to count the cost of reading every value
+    deque(chunk, maxlen=0)
+    return len(chunk)
+
+def timed(label: str, func):
+    start = time.perf_counter()
+    count = func()
+    elapsed = time.perf_counter() - start
+    print(f'{label:<28} {elapsed:>7.2f} s  {count / elapsed:>14,.0f} hosts/s')
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--cidr', default='10.0.0.0/8')
+    parser.add_argument('--chunk', type=int, default=65536)
+    args = parser.parse_args()
+
+    results = hosts(args.cidr)
+    print(f'{len(results):,} hosts in {args.cidr}')
+
+    timed('chunks (ints)', lambda: sum(consume(chunk) for chunk in results.chunks(args.chunk)))
+    timed('chunks (strings)', lambda: sum(len(chunk) for chunk in results.chunks(args.chunk, strings=True)))
+    timed('iterate (strings)', lambda: sum(1 for _ in results))
+    timed('int_to_ip per host', lambda: sum(1 for value in results.values if int_to_ip(value)))
+    timed('ipaddress hosts() + str', lambda: sum(1 for host in ipaddress.ip_network(args.cidr, strict=False).hosts() if str(host)))
+
+if __name__ == '__main__':
+    main()
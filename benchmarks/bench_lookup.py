@@ -0,0 +1,73 @@
+"""
+PrefixTable benchmark: build time, memory per prefix and lookups per second.
+
+    python benchmarks/bench_lookup.py [--prefixes 1000000] [--lookups 1000000]
+
+The synthetic table roughly follows the shape of a full routing table: most prefixes are /24, with the rest spread
+over /8 - /23 and a small number of longer prefixes.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from subnet_calc.lookup import PrefixTable
+from subnet_calc.prefix import Prefix
+
+def random_prefixes(count: int, seed: int = 1):
+    rng = random.Random(seed)
+    prefixes = []
+    for index in range(count):
+        roll = rng.random()
+        if roll < 0.6:
+            length = 24
+        elif roll < 0.97:
+            length = rng.randint(8, 23)
+        else:
+            length = rng.randint(25, 32)
+        prefixes.append((Prefix(rng.getrandbits(32), length), index))
+    return prefixes
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--prefixes', type=int, default=1_000_000)
+    parser.add_argument('--lookups', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    prefixes = random_prefixes(args.prefixes)
+    rng = random.Random(2)
+    ips = [rng.getrandbits(32) for _ in range(args.lookups)]
+
+    start = time.perf_counter()
+    table = PrefixTable(prefixes)
+    build = time.perf_counter() - start
+
+    # tracemalloc slows every allocation down, so measure the memory with a second build
+    del table
+    tracemalloc.start()
+    table = PrefixTable(prefixes)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    table.lookup_many(ips)
+    many = time.perf_counter() - start
+
+    sample = ips[:args.lookups // 10]
+    start = time.perf_counter()
+    for ip in sample:
+        table.lookup(ip)
+    single = time.perf_counter() - start
+
+    print(f'{len(table):,} unique prefixes')
+    print(f'build:        {build:.2f} s')
+    print(f'memory:       {memory / 2**20:.1f} MiB ({memory / len(table):.0f} bytes per prefix, including payloads)')
+    print(f'lookup_many:  {args.lookups / many:,.0f} lookups/s')
+    print(f'lookup:       {len(sample) / single:,.0f} lookups/s')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+"""
+Overlap detection benchmark: find_overlaps() on a large generated inventory.
+
+    python benchmarks/bench_overlaps.py [--prefixes 1000000]
+
+Uses the prefixes from bench_summarize.py. Every overlapping pair is reported, so the run time also grows with the number
+of pairs found: the bench_lookup.py table, where most prefixes sit under a few short prefixes, has ~170 million pairs
+per million prefixes.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bench_summarize import random_array
+from subnet_calc.overlaps import find_overlaps
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--prefixes', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    prefixes = random_array(args.prefixes)
+
+    start = time.perf_counter()
+    results = find_overlaps(prefixes)
+    loaded = time.perf_counter() - start
+    kinds = {'duplicate': 0, 'nested': 0}
+    for overlap in results:
+        kinds[overlap.kind] += 1
+    elapsed = time.perf_counter() - start
+
+    print(f'{len(prefixes):,} prefixes')
+    print(f'load and sort:  {loaded:.2f} s')
+    print(f'total:          {elapsed:.2f} s  ({len(prefixes) / elapsed:,.0f} prefixes/s)')
+    print(f'found:          {kinds["duplicate"]:,} duplicate and {kinds["nested"]:,} nested pairs')
+    print(f'sweep:          {(kinds["duplicate"] + kinds["nested"]) / (elapsed - loaded):,.0f} pairs/s')
+
+if __name__ == '__main__':
+    main()
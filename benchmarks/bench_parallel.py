@@ -0,0 +1,42 @@
+"""
+Scaling benchmark for calc_subnets_parallel: throughput of the bulk calculations with 1 to N worker processes.
+
+    python benchmarks/bench_parallel.py [--count 1000000] [--max-jobs N] [--chunk-size 10000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from subnet_calc.parallel import calc_subnets_parallel, DEFAULT_CHUNK_SIZE
+
+def random_cidrs(count: int, seed: int = 1):
+    rng = random.Random(seed)
+    return [f'{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(256)}/{rng.randint(1, 30)}'
+            for _ in range(count)]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--count', type=int, default=1_000_000)
+    parser.add_argument('--max-jobs', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    addresses = random_cidrs(args.count)
+    print(f'{args.count} addresses, chunk size {args.chunk_size}, {os.cpu_count()} CPUs')
+    print(f'{"jobs":>4}  {"seconds":>8}  {"rows/s":>10}  {"speedup":>7}')
+
+    baseline = None
+    for jobs in range(1, args.max_jobs + 1):
+        start = time.perf_counter()
+        for _ in calc_subnets_parallel(addresses, jobs=jobs, chunk_size=args.chunk_size):
+            pass
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f'{jobs:>4}  {elapsed:>8.2f}  {args.count / elapsed:>10,.0f}  {baseline / elapsed:>6.2f}x')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+PrefixArray benchmark: memory per prefix against a list of CIDR strings, and the time to build, sort and calculate.
+
+    python benchmarks/bench_prefixarray.py [--prefixes 1000000]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bench_lookup import random_prefixes
+from subnet_calc import prefixarray
+from subnet_calc.prefixarray import PrefixArray
+
+def measure(build):
+    tracemalloc.start()
+    result = build()
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, memory
+
+def timed(label: str, func, count: int):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f'{label:<26} {elapsed:>6.2f} s  {count / elapsed:>12,.0f} prefixes/s')
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--prefixes', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    cidrs = [str(prefix) for prefix, _ in random_prefixes(args.prefixes)]
+    count = len(cidrs)
+
+    _, strings = measure(lambda: [cidr.encode().decode() for cidr in cidrs])
+    array, memory = measure(lambda: PrefixArray(cidrs))
+    print(f'list of str:   {strings / count:>6.1f} bytes per prefix')
+    print(f'PrefixArray:   {memory / count:>6.1f} bytes per prefix (nbytes {array.nbytes / count:.1f})')
+    print()
+
+    timed('build from strings', lambda: PrefixArray(cidrs), count)
+    timed('iterate', lambda: sum(1 for _ in array), count)
+    timed('sort', lambda: array[:].sort(), count)
+    if prefixarray.np is not None:
+        timed('calc_subnets (numpy)', array.calc_subnets, count)
+    prefixarray.np = None
+    timed('calc_subnets (pure Python)', array.calc_subnets, count)
+
+if __name__ == '__main__':
+    main()
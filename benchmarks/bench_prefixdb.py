@@ -0,0 +1,98 @@
+"""
+Prefix database benchmark: worker startup time and memory, loading a text file versus opening a PrefixDatabase.
+
+    python benchmarks/bench_prefixdb.py [--prefixes 1000000] [--lookups 1000]
+
+Both files are generated from the same synthetic table. Each loader runs in a fresh process, which reports the time
+until it has answered its first lookups and its peak RSS (Linux only). The text loader validates and parses every line and builds a
+PrefixTable, which is what a worker had to do before.
+"""
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from bench_lookup import random_prefixes
+from subnet_calc.prefixdb import PrefixDatabase, save_prefixes
+
+# Run in a fresh interpreter, with the start time taken after the interpreter itself has started
+WORKER = '''
+import random, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+{load}
+rng = random.Random(2)
+table.lookup_many([rng.getrandbits(32) for _ in range({lookups})])
+# VmHWM rather than ru_maxrss, which Linux carries over from the benchmark process through fork and exec
+with open('/proc/self/status') as status:
+    rss = next(line.split()[1] for line in status if line.startswith('VmHWM:'))
+print(time.perf_counter() - start, rss)
+'''
+
+TEXT = '''
+from subnet_calc.lookup import PrefixTable
+from subnet_calc.prefix import Prefix
+from subnet_calc.validation import valid_cidr
+def load(path):
+    with open(path) as file:
+        for line in file:
+            cidr, payload = line.split()
+            if valid_cidr(cidr):
+                yield Prefix.parse(cidr), payload
+table = PrefixTable(load({path!r}))
+'''
+
+DATABASE = '''
+from subnet_calc.prefixdb import PrefixDatabase
+table = PrefixDatabase({path!r})
+'''
+
+BASELINE = '''
+table = type('Empty', (), {{'lookup_many': lambda self, ips: None}})()
+'''
+
+def run(load: str, lookups: int):
+    output = subprocess.run([sys.executable, '-c', WORKER.format(root=ROOT, load=load, lookups=lookups)],
+                            capture_output=True, text=True, check=True).stdout
+    seconds, rss = output.split()
+    return float(seconds), int(rss) / 1024
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--prefixes', type=int, default=1_000_000)
+    parser.add_argument('--lookups', type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        text_path = os.path.join(directory, 'prefixes.txt')
+        database_path = os.path.join(directory, 'prefixes.db')
+        prefixes = [(str(prefix), f'label-{payload}') for prefix, payload in random_prefixes(args.prefixes)]
+        with open(text_path, 'w') as file:
+            file.writelines(f'{cidr} {payload}\n' for cidr, payload in prefixes)
+
+        start = time.perf_counter()
+        count = save_prefixes(database_path, prefixes)
+        print(f'{count:,} unique prefixes, database written in {time.perf_counter() - start:.2f} s')
+        print(f'text file: {os.path.getsize(text_path) / 2**20:.1f} MiB, database: {os.path.getsize(database_path) / 2**20:.1f} MiB')
+        print()
+        print('loader      startup     peak RSS')
+        for name, load in (('interpreter', BASELINE), ('text', TEXT), ('database', DATABASE)):
+            seconds, rss = run(load.format(path=text_path if name == 'text' else database_path), args.lookups)
+            print(f'{name:<11} {seconds:>7.3f} s  {rss:>7.1f} MiB')
+
+        rng = random.Random(3)
+        ips = [rng.getrandbits(32) for _ in range(100_000)]
+        with PrefixDatabase(database_path) as database:
+            start = time.perf_counter()
+            database.lookup_many(ips)
+            print()
+            print(f'database lookup_many: {len(ips) / (time.perf_counter() - start):,.0f} lookups/s')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Range to CIDR conversion benchmark: the scalar range_to_cidrs(), the streaming convert_lines() used by ipcalc range,
+and the numpy batch ranges_to_cidrs().
+
+    python benchmarks/bench_ranges.py [--ranges 1000000]
+
+The ranges start at random addresses and cover a random number of addresses up to 2**24, so they are mostly unaligned
+and split into many prefixes each, like the ranges in IP reputation and geolocation feeds.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from subnet_calc.prefix import int_to_ip
+from subnet_calc.ranges import range_to_cidrs, convert_lines
+
+try:
+    from subnet_calc.batch import ranges_to_cidrs
+    import numpy as np
+except ImportError:
+    np = None
+
+def random_ranges(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    starts, ends = [], []
+    for _ in range(count):
+        start = rng.getrandbits(32)
+        starts.append(start)
+        ends.append(min(start + rng.getrandbits(rng.randint(0, 24)), 0xFFFFFFFF))
+    return starts, ends
+
+def report(label: str, elapsed: float, ranges: int, prefixes: int):
+    print(f'{label:<16} {elapsed:>6.2f} s  {ranges / elapsed:>11,.0f} ranges/s  {prefixes / elapsed:>11,.0f} prefixes/s')
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--ranges', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    starts, ends = random_ranges(args.ranges)
+    print(f'{args.ranges:,} ranges')
+
+    start = time.perf_counter()
+    count = sum(len(range_to_cidrs(first, last)) for first, last in zip(starts, ends))
+    report('range_to_cidrs', time.perf_counter() - start, args.ranges, count)
+    print(f'{count / args.ranges:.1f} prefixes per range')
+
+    lines = [f'{int_to_ip(first)}-{int_to_ip(last)}' for first, last in zip(starts, ends)]
+    start = time.perf_counter()
+    count = sum(len(result) for _, result, _ in convert_lines(lines))
+    report('convert_lines', time.perf_counter() - start, args.ranges, count)
+
+    if np is None:
+        print('numpy is not installed, skipping ranges_to_cidrs')
+        return
+    starts, ends = np.array(starts, dtype=np.int64), np.array(ends, dtype=np.int64)
+    start = time.perf_counter()
+    indexes, _, _ = ranges_to_cidrs(starts, ends)
+    report('ranges_to_cidrs', time.perf_counter() - start, args.ranges, len(indexes))
+
+if __name__ == '__main__':
+    main()
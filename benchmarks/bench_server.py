@@ -0,0 +1,96 @@
+"""
+SubnetServer benchmark: requests per second and latency for /calc and /batch over keep-alive connections, against
+starting a new ipcalc process for every calculation.
+
+    python benchmarks/bench_server.py [--requests 20000] [--clients 50] [--batch 1000]
+
+The server runs as `ipcalc serve` in its own process, and the clients run in this process with asyncio.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bench_parallel import random_cidrs
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+COMMAND = [sys.executable, '-c', 'import ipcalc; ipcalc.main()']
+
+async def client(port: int, requests: list[bytes], latencies: list[float]):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    for request in requests:
+        start = time.perf_counter()
+        writer.write(request)
+        head = await reader.readuntil(b'\r\n\r\n')
+        length = int(next(line for line in head.split(b'\r\n') if line.startswith(b'Content-Length')).split(b':')[1])
+        await reader.readexactly(length)
+        latencies.append(time.perf_counter() - start)
+    writer.close()
+
+async def load(port: int, requests: list[bytes], clients: int):
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(port, requests[index::clients], latencies) for index in range(clients)))
+    return time.perf_counter() - start, sorted(latencies)
+
+def report(label: str, elapsed: float, latencies: list[float], items: int):
+    p50, p99 = latencies[len(latencies) // 2] * 1000, latencies[len(latencies) * 99 // 100] * 1000
+    print(f'{label:<14} {len(latencies) / elapsed:>9,.0f} requests/s  {items / elapsed:>9,.0f} cidrs/s  '
+          f'p50 {p50:>6.2f} ms  p99 {p99:>6.2f} ms')
+
+def get(cidr: str):
+    return f'GET /calc?cidr={cidr} HTTP/1.1\r\nHost: localhost\r\n\r\n'.encode()
+
+def post(path: str, payload: dict):
+    body = json.dumps(payload).encode()
+    return f'POST {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n\r\n'.encode() + body
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--clients', type=int, default=50)
+    parser.add_argument('--batch', type=int, default=1000)
+    parser.add_argument('--spawns', type=int, default=20)
+    args = parser.parse_args()
+
+    cidrs = random_cidrs(args.requests)
+    server = subprocess.Popen([*COMMAND, 'serve', '--port', '0'], cwd=ROOT, stderr=subprocess.PIPE, text=True)
+    try:
+        port = int(server.stderr.readline().rsplit(':', 1)[1])
+        print(f'{args.requests:,} requests from {args.clients} clients, {os.cpu_count()} CPUs')
+
+        elapsed, latencies = asyncio.run(load(port, [get(cidr) for cidr in cidrs], args.clients))
+        report('/calc', elapsed, latencies, args.requests)
+
+        batches = [post('/batch', {'cidrs': cidrs[start:start + args.batch]}) for start in range(0, args.requests, args.batch)]
+        elapsed, latencies = asyncio.run(load(port, batches, min(args.clients, len(batches))))
+        report(f'/batch x{args.batch}', elapsed, latencies, args.requests)
+
+        stats = json.loads(asyncio.run(fetch_stats(port)))
+        print(f'coalesced {stats["coalesced"]["requests"]:,} /calc requests into {stats["coalesced"]["batches"]:,} batches')
+    finally:
+        server.terminate()
+        server.wait()
+
+    # The alternative: a new interpreter for every calculation
+    start = time.perf_counter()
+    for cidr in random.Random(1).sample(cidrs, args.spawns):
+        subprocess.run([*COMMAND, cidr], cwd=ROOT, stdout=subprocess.DEVNULL, check=True)
+    per_spawn = (time.perf_counter() - start) / args.spawns
+    print(f'{"spawn ipcalc":<14} {1 / per_spawn:>9,.0f} requests/s  {"":>17}  {per_spawn * 1000:.1f} ms each')
+
+async def fetch_stats(port: int):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(b'GET /stats HTTP/1.1\r\nConnection: close\r\n\r\n')
+    response = await reader.read()
+    writer.close()
+    return response.split(b'\r\n\r\n', 1)[1]
+
+if __name__ == '__main__':
+    main()
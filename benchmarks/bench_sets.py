@@ -0,0 +1,53 @@
+"""
+PrefixSet benchmark: building sets from large prefix lists, and the set operations between them.
+
+    python benchmarks/bench_sets.py [--prefixes 1000000]
+
+Builds two sets from independently generated prefix lists (see bench_summarize.py) and times each operation.
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bench_summarize import random_array
+from subnet_calc.sets import PrefixSet
+
+def timed(label: str, func):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    ranges = sum(1 for _ in result.ranges())
+    print(f'{label:<22} {elapsed:>6.2f} s  -> {ranges:>9,} ranges')
+    return result
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--prefixes', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    left_prefixes, right_prefixes = random_array(args.prefixes, 1), random_array(args.prefixes, 2)
+    print(f'{args.prefixes:,} prefixes per set')
+
+    left = timed('build (left)', lambda: PrefixSet(left_prefixes))
+    right = timed('build (right)', lambda: PrefixSet(right_prefixes))
+    timed('union', lambda: left | right)
+    timed('intersection', lambda: left & right)
+    timed('difference', lambda: left - right)
+    result = timed('symmetric difference', lambda: left ^ right)
+
+    start = time.perf_counter()
+    count = sum(1 for _ in result.prefixes())
+    print(f'{"to prefixes":<22} {time.perf_counter() - start:>6.2f} s  -> {count:>9,} prefixes')
+
+    tracemalloc.start()
+    left | right
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f'union peak memory: {peak / 2**20:.1f} MiB')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+"""
+Start-up benchmark: the wall clock time of `ipcalc CIDR` as a new process, against a bare interpreter.
+
+    python benchmarks/bench_startup.py [--runs 20]
+
+Bytecode caching is turned on for the runs (PYTHONDONTWRITEBYTECODE is removed), as it is for an installed package.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+def median_ms(command: list[str], runs: int, env: dict):
+    subprocess.run(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, check=True) # Warm up, and write the bytecode
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, check=True)
+        times.append(time.perf_counter() - start)
+    return sorted(times)[runs // 2] * 1000
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+
+    env = {name: value for name, value in os.environ.items() if name != 'PYTHONDONTWRITEBYTECODE'}
+    bare = median_ms([sys.executable, '-c', 'pass'], args.runs, env)
+    print(f'{"python -c pass":<30} {bare:>6.1f} ms')
+    for label, arguments in (('ipcalc 10.1.2.3/24', ['10.1.2.3/24']), ('ipcalc --fields network_id ...', ['--fields', 'network_id', '10.1.2.3/24']),
+                             ('python -m subnet_calc ...', None)):
+        command = [sys.executable, '-m', 'subnet_calc', '10.1.2.3/24'] if arguments is None else \
+                  [sys.executable, '-c', f'import ipcalc; ipcalc.main({arguments!r})']
+        elapsed = median_ms(command, args.runs, env)
+        print(f'{label:<30} {elapsed:>6.1f} ms  (+{elapsed - bare:.1f} ms)')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+Summarization benchmark: summarize() and summarize_sorted() throughput on large generated prefix lists.
+
+    python benchmarks/bench_summarize.py [--prefixes 1000000 10000000] [--pure]
+
+The prefixes are generated straight into a PrefixArray: mostly /24, with the rest spread over /16 - /30 so that some of
+them overlap and merge. --pure also times summarize() without numpy.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from array import array
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from subnet_calc import aggregate
+from subnet_calc.aggregate import summarize, summarize_sorted
+from subnet_calc.prefixarray import PrefixArray
+from subnet_calc.tables import MASKS
+
+def random_array(count: int, seed: int = 1):
+    # Networks without host bits, so that PrefixArray.sort() gives the order summarize_sorted() needs
+    rng = random.Random(seed)
+    lengths = array('B', (24 if roll < 0.6 else rng.randint(25, 30) if roll < 0.9 else rng.randint(16, 23)
+                          for roll in (rng.random() for _ in range(count))))
+    addresses = array('I', (rng.getrandbits(32) & MASKS[length] for length in lengths))
+    return PrefixArray.from_arrays(addresses, lengths)
+
+def timed(label: str, func, count: int):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f'  {label:<28} {elapsed:>7.2f} s  {count / elapsed:>12,.0f} prefixes/s  -> {len(result):,} prefixes')
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--prefixes', type=int, nargs='+', default=[1_000_000, 10_000_000])
+    parser.add_argument('--pure', action='store_true')
+    args = parser.parse_args()
+
+    for count in args.prefixes:
+        prefixes = random_array(count)
+        print(f'{count:,} prefixes')
+
+        if aggregate.np is not None:
+            timed('summarize (numpy sort)', lambda: summarize(prefixes), count)
+        if args.pure or aggregate.np is None:
+            np, aggregate.np = aggregate.np, None
+            timed('summarize (sorted())', lambda: summarize(prefixes), count)
+            aggregate.np = np
+
+        ordered = prefixes[:]
+        ordered.sort()
+        timed('summarize_sorted', lambda: list(summarize_sorted(ordered)), count)
+        del prefixes, ordered
+
+if __name__ == '__main__':
+    main()
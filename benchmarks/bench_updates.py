@@ -0,0 +1,71 @@
+"""
+MutablePrefixTable benchmark: update rate with and without concurrent lookups.
+
+    python benchmarks/bench_updates.py [--prefixes 200000] [--readers 2] [--seconds 5] [--batch 1]
+
+A writer thread alternately inserts and deletes random prefixes (in batches of --batch changes per apply) while the
+reader threads run lookups against the current snapshot.
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bench_lookup import random_prefixes
+from subnet_calc.lookup import MutablePrefixTable
+from subnet_calc.prefix import Prefix
+
+def run(table: MutablePrefixTable, readers: int, seconds: float, batch: int):
+    stop = threading.Event()
+    lookups = [0] * readers
+
+    def reader(slot: int):
+        rng = random.Random(slot)
+        ips = [rng.getrandbits(32) for _ in range(1000)]
+        while not stop.is_set():
+            table.lookup_many(ips)
+            lookups[slot] += len(ips)
+
+    threads = [threading.Thread(target=reader, args=(slot,)) for slot in range(readers)]
+    for thread in threads:
+        thread.start()
+
+    rng = random.Random(99)
+    updates = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        length = rng.randint(16, 32)
+        # A set, since deleting the same new prefix twice in one batch would fail
+        prefixes = {Prefix(Prefix(rng.getrandbits(32), length).network, length) for _ in range(batch)}
+        table.apply([('insert', prefix, 'new') for prefix in prefixes])
+        table.apply([('delete', prefix) for prefix in prefixes])
+        updates += 2 * len(prefixes)
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return updates / elapsed, sum(lookups) / elapsed
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--prefixes', type=int, default=200_000)
+    parser.add_argument('--readers', type=int, default=2)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--batch', type=int, default=1)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    table = MutablePrefixTable(random_prefixes(args.prefixes))
+    print(f'{len(table):,} prefixes loaded in {time.perf_counter() - start:.2f} s')
+
+    for readers in sorted({0, args.readers}):
+        update_rate, lookup_rate = run(table, readers, args.seconds, args.batch)
+        print(f'{readers} readers:  {update_rate:>10,.0f} updates/s  {lookup_rate:>10,.0f} lookups/s')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,217 @@
+"""
+Benchmark suite for the core calculations: ops/sec and allocations for each function on a single input and on a bulk
+dataset, with the standard library ipaddress module doing the same work as a baseline.
+
+    python benchmarks/run.py [--count 10000] [--repeat 10] [--only calc_subnet,valid_cidr]
+    python benchmarks/run.py --save                 # Record the results as the new baseline
+    python benchmarks/run.py --threshold 0.2        # Fail if any case is over 20% slower than the baseline
+
+The baseline is saved to benchmarks/baseline.json (or --baseline PATH). Every run compares against it when it exists and
+exits with status 1 if any case is slower than the baseline by more than the threshold, so it can gate a CI job. The
+comparison uses each case's speed relative to its ipaddress equivalent, timed side by side with it, rather than the raw
+ops/s: that stays put when the CPU is busy or throttled, or the baseline was recorded on other hardware. Record the
+baseline again after upgrading Python, since ipaddress can change speed too.
+
+Columns:
+    ops/s        calls per second, from the best of --repeat runs over each slice of the inputs
+    vs ipaddress how many times faster than the ipaddress equivalent (below 1 is slower)
+    allocs/op    memory blocks still allocated per call when every result is kept, from sys.getallocatedblocks()
+    bytes/op     the traced memory per call when every result is kept, from tracemalloc
+    vs baseline  the speed relative to ipaddress, compared to the same in the saved baseline
+"""
+import argparse
+import gc
+import ipaddress
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from subnet_calc.calculate import calc_ipv4_mask, ipv4_net_id, ipv4_broadcast, ipv4_edge
+from subnet_calc.helpers import ipv4_bin, ipv4_wildcard
+from subnet_calc.validation import valid_cidr
+from subnet_calc.wrapper import calc_subnet
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# Inputs per timed slice, see ops_per_second
+_SLICE = 200
+
+# A single, typical input, called over and over
+SINGLE_CIDR = '192.168.10.37/26'
+
+def inventory_cidrs(count: int, seed: int = 1):
+    # Shaped like an address plan or routing table: mostly /24, the rest /8 - /30, half of them with host bits set as
+    # they would be when typed in. /31 and /32 are left out, since ipv4_edge rejects them.
+    rng = random.Random(seed)
+    cidrs = []
+    for _ in range(count):
+        roll = rng.random()
+        length = 24 if roll < 0.6 else rng.randint(8, 23) if roll < 0.9 else rng.randint(25, 30)
+        address = rng.getrandbits(32)
+        if rng.random() < 0.5:
+            address &= (0xFFFFFFFF << (32 - length)) & 0xFFFFFFFF
+        cidrs.append(f'{address >> 24}.{(address >> 16) & 0xFF}.{(address >> 8) & 0xFF}.{address & 0xFF}/{length}')
+    return cidrs
+
+def user_input(count: int, seed: int = 2):
+    # Validation sees the raw input, so one in ten of these is invalid in one of the usual ways
+    rng = random.Random(seed)
+    mistakes = ('10.0.0.0', '10.0.0.256/24', '10.0.0/24', '10.0.0.0/33', 'foo', '10.0.0.0/2a', '')
+    return [rng.choice(mistakes) if rng.random() < 0.1 else cidr for cidr in inventory_cidrs(count, seed)]
+
+def _network(cidr: str):
+    return ipaddress.IPv4Network(cidr, strict=False)
+
+def _ipaddress_valid(cidr: str):
+    try:
+        _network(cidr)
+        return True
+    except ValueError:
+        return False
+
+def _ipaddress_bin(mask: str):
+    return '.'.join(f'{octet:08b}' for octet in ipaddress.IPv4Address(mask).packed)
+
+def _ipaddress_subnet(cidr: str):
+    network = _network(cidr)
+    return {
+        'network_id': str(network.network_address),
+        'netmask': str(network.netmask),
+        'broadcast': str(network.broadcast_address),
+        'wildcard': str(network.hostmask),
+        'first': str(network.network_address + 1),
+        'last': str(network.broadcast_address - 1),
+        'total': network.num_addresses - 2,
+        'binary': [_ipaddress_bin(str(address)) for address in (network.network_address, network.netmask, network.broadcast_address)],
+    }
+
+# name: (function, ipaddress equivalent, input kind). calc_subnet is lazy, so it is measured with to_dict(), which
+# calculates every field.
+CASES = {
+    'calc_ipv4_mask':   (calc_ipv4_mask,                        lambda cidr: str(_network(cidr).netmask),                    'cidr'),
+    'ipv4_net_id':      (ipv4_net_id,                           lambda cidr: str(_network(cidr).network_address),            'cidr'),
+    'ipv4_broadcast':   (ipv4_broadcast,                        lambda cidr: str(_network(cidr).broadcast_address),          'cidr'),
+    'ipv4_edge':        (lambda cidr: ipv4_edge(cidr, True),    lambda cidr: str(_network(cidr).network_address + 1),        'cidr'),
+    'ipv4_bin':         (ipv4_bin,                              _ipaddress_bin,                                              'mask'),
+    'ipv4_wildcard':    (ipv4_wildcard,                         lambda cidr: str(_network(cidr).hostmask),                   'cidr'),
+    'valid_cidr':       (valid_cidr,                            _ipaddress_valid,                                            'input'),
+    'calc_subnet':      (lambda cidr: calc_subnet(cidr).to_dict(), _ipaddress_subnet,                                        'cidr'),
+}
+
+def datasets(count: int):
+    bulk = inventory_cidrs(count)
+    return {
+        'single': {'cidr': [SINGLE_CIDR] * count, 'mask': [calc_ipv4_mask(SINGLE_CIDR)] * count, 'input': [SINGLE_CIDR] * count},
+        'bulk': {'cidr': bulk, 'mask': [calc_ipv4_mask(cidr) for cidr in bulk], 'input': user_input(count)},
+    }
+
+def ops_per_second(funcs: list, inputs: list, repeat: int):
+    # The inputs are timed in short slices, keeping the best time of each slice over the repeats, and the functions take
+    # turns on each slice. On a shared or throttled CPU a long loop is easily slowed down part of the way through, but
+    # a slice usually gets at least one clean run, and functions timed side by side see the same CPU speed.
+    slices = [inputs[start:start + _SLICE] for start in range(0, len(inputs), _SLICE)]
+    best = [[float('inf')] * len(slices) for _ in funcs]
+    for _ in range(repeat):
+        for index, values in enumerate(slices):
+            for func, times in zip(funcs, best):
+                start = time.perf_counter()
+                for value in values:
+                    func(value)
+                times[index] = min(times[index], time.perf_counter() - start)
+    return [len(inputs) / sum(times) for times in best]
+
+def allocations(func, inputs: list):
+    # Keep every result, so what each call allocates is still there to be counted
+    gc.collect()
+    blocks = sys.getallocatedblocks()
+    results = [func(value) for value in inputs]
+    blocks = sys.getallocatedblocks() - blocks
+    del results
+
+    tracemalloc.start()
+    results = [func(value) for value in inputs]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del results
+    return blocks / len(inputs), size / len(inputs)
+
+def _relative(result: dict):
+    # Speed relative to the ipaddress equivalent timed alongside it, which cancels out how fast the CPU happened to be
+    return result['ops'] / result['ipaddress_ops']
+
+def run(count: int, repeat: int, only=None):
+    """
+    :returns: Returns a dictionary of {'function/dataset': {'ops': ..., 'ipaddress_ops': ..., 'allocs': ..., 'bytes': ...}}
+    """
+
+    results = {}
+    for dataset, inputs in datasets(count).items():
+        for name, (func, baseline, kind) in CASES.items():
+            if only and name not in only:
+                continue
+            values = inputs[kind]
+            allocs, size = allocations(func, values)
+            ops, ipaddress_ops = ops_per_second([func, baseline], values, repeat)
+            results[f'{name}/{dataset}'] = {
+                'ops': ops,
+                'ipaddress_ops': ipaddress_ops,
+                'allocs': allocs,
+                'bytes': size,
+            }
+    return results
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--count', type=int, default=10000, help='Inputs per dataset (default: 10000)')
+    parser.add_argument('--repeat', type=int, default=10, help='Runs per case, the best is kept (default: 10)')
+    parser.add_argument('--only', type=lambda value: set(value.split(',')), metavar='NAME,...', help='Only run these functions')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, metavar='PATH', help='The saved baseline to compare against')
+    parser.add_argument('--save', action='store_true', help='Save the results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Fail if a case is slower than the baseline by more than this fraction (default: 0.2)')
+    args = parser.parse_args()
+
+    unknown = (args.only or set()) - set(CASES)
+    if unknown:
+        parser.error(f'unknown function: {", ".join(sorted(unknown))}')
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save:
+        with open(args.baseline) as file:
+            baseline = json.load(file)['results']
+
+    results = run(args.count, args.repeat, args.only)
+
+    print(f'{args.count:,} inputs per dataset, best of {args.repeat}, Python {platform.python_version()}')
+    print(f'{"case":<24} {"ops/s":>11} {"vs ipaddress":>12} {"allocs/op":>9} {"bytes/op":>9} {"vs baseline":>11}')
+    regressions = []
+    for case, result in results.items():
+        compared = ''
+        if case in baseline:
+            ratio = _relative(result) / _relative(baseline[case])
+            compared = f'{ratio:.2f}x'
+            if ratio < 1 - args.threshold:
+                regressions.append(case)
+                compared += ' !'
+        print(f'{case:<24} {result["ops"]:>11,.0f} {result["ops"] / result["ipaddress_ops"]:>11.1f}x '
+              f'{result["allocs"]:>9.1f} {result["bytes"]:>9.0f} {compared:>11}')
+
+    if args.save:
+        with open(args.baseline, 'w') as file:
+            json.dump({'python': platform.python_version(), 'machine': platform.machine(), 'count': args.count,
+                       'results': results}, file, indent=2)
+        print(f'saved the baseline to {args.baseline}')
+
+    if regressions:
+        print(f'{len(regressions)} cases are more than {args.threshold:.0%} slower than the baseline: {", ".join(regressions)}',
+              file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
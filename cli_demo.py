@@ -1,4 +1,4 @@
-import json, sys
+import sys
 from subnet_calc.wrapper import calc_subnet
 
 address = ''
@@ -12,11 +12,10 @@ if address == '': # If no CLI address is specified
     if address == '': # If no address is specified
         print('Address cannot be blank')
 
-raw_results = calc_subnet(address)
-results = json.loads(raw_results)
+results = calc_subnet(address)
 
-if results['output']['result']:
-    for key, value in results.items():
+if results.result:
+    for key, value in results.to_dict().items():
         print(f'{key}:')
         for sub_key, sub_value in value.items():
             print(f'   {sub_key:<12}:  {sub_value}')
@@ -1,26 +1,409 @@
-import json, sys
-from subnet_calc.wrapper import calc_subnet
+import sys
 
-def main():
-    address = ''
-    argument_list = sys.argv[1:] # Retrieve arguments
+# Only sys is imported up front. Everything else is imported by the code path that needs it, so a single calculation
+# does not pay for argparse, json or the bulk, parallel and server modules on every run (see tests/test_startup.py).
 
-    if len(argument_list) != 0:
-        address = argument_list[0]
+def _field_list(value: str):
+    import argparse
+    from subnet_calc.wrapper import FIELD_NAMES
+    fields = tuple(field.strip() for field in value.split(',') if field.strip())
+    for field in fields:
+        if field not in FIELD_NAMES:
+            raise argparse.ArgumentTypeError(f'unknown field: {field}')
+    return fields
+
+def _job_count(value: str):
+    import argparse
+    # 0 means one worker per CPU, anything below that is a mistake
+    try:
+        jobs = int(value)
+    except ValueError:
+        jobs = -1
+    if jobs < 0:
+        raise argparse.ArgumentTypeError(f'invalid job count: {value} (must be 0 or more)')
+    return jobs
+
+def _parse_args(argument_list):
+    import argparse
+    from subnet_calc import bulk
+    parser = argparse.ArgumentParser(prog='ipcalc', description='IPv4 subnet calculator')
+    parser.add_argument('address', nargs='?', default='', help='The IP Address in CIDR notation')
+    parser.add_argument('--batch', nargs='?', const='-', metavar='FILE',
+                        help="Calculate every address in FILE (one per line), or stdin if FILE is '-' or omitted")
+    parser.add_argument('--format', choices=sorted(bulk.WRITERS), default='jsonl',
+                        help='Output format for --batch (default: jsonl)')
+    parser.add_argument('--jobs', type=_job_count, default=1, metavar='N',
+                        help='Number of worker processes for --batch, 0 for one per CPU (default: 1)')
+    parser.add_argument('--unordered', action='store_true',
+                        help='With --jobs, write results as they complete rather than in input order')
+    parser.add_argument('--fields', type=_field_list, metavar='FIELD,...',
+                        help='Only calculate these fields (eg network_id,broadcast). Section names such as hosts select the whole section.')
+    parser.add_argument('--check-overlaps', metavar='FILE',
+                        help="Report every duplicate or nested pair of prefixes in FILE (one per line), or stdin if FILE is '-'")
+    parser.add_argument('--cache', type=int, metavar='N',
+                        help='With --batch, cache the calculations for up to N networks and report the hit rate on stderr')
+    parser.add_argument('--coprocess', action='store_true',
+                        help='Stay running, reading one address or command per line on stdin and writing one JSON result per line')
+    return parser.parse_args(argument_list)
+
+def _run_batch(source: str, output_format: str, jobs: int, ordered: bool, fields, cache_size: int | None):
+    from subnet_calc import bulk, cache
+    from subnet_calc.parallel import calc_subnets_parallel
+
+    # Bulk records are flat, so expand any section names into their individual fields
+    fields = bulk.DEFAULT_FIELDS if fields is None else bulk.expand_fields(fields)
+
+    # Stream the input straight through to the output, so memory use does not depend on the size of the input
+    addresses = bulk.read_lines(source)
+    writer = bulk.WRITERS[output_format]
+    if jobs != 1: # The worker processes keep their own caches, so there is nothing to report
+        records = calc_subnets_parallel(addresses, jobs=jobs or None, ordered=ordered, fields=fields, cache_size=cache_size)
+        _write_records(writer, records, fields)
+        return
+    if cache_size is None:
+        _write_records(writer, bulk.calc_records(addresses, fields), fields)
+        return
+
+    with cache.cache_enabled_for(cache_size): # Only while this batch runs, main() can be called again in the same process
+        _write_records(writer, bulk.calc_records(addresses, fields), fields)
+        info = cache.cache_info()
+    print(f'cache: {info.hits} hits, {info.misses} misses, {info.currsize}/{info.maxsize} entries', file=sys.stderr)
+
+def _write_records(writer, records, fields):
+    try: # The input is only opened once the writer starts reading it
+        writer(records, sys.stdout, fields)
+    except OSError as e:
+        sys.exit(f'ipcalc: {e}')
+    sys.stdout.flush()
+
+def _check_overlaps(source: str):
+    from subnet_calc import bulk
+    from subnet_calc.overlaps import find_overlaps
+    from subnet_calc.prefix import Prefix
+
+    def prefixes():
+        for number, line in bulk.read_numbered_lines(source):
+            try:
+                yield Prefix.parse(line), number
+            except ValueError as e:
+                print(f'line {number}: {e}', file=sys.stderr)
+
+    # The report is written as the sweep finds each pair, rather than collected first
+    count = 0
+    try:
+        for overlap in find_overlaps(prefixes()):
+            relation = 'duplicates' if overlap.kind == 'duplicate' else 'is nested in'
+            sys.stdout.write(f'line {overlap.inner_label}: {overlap.inner} {relation} {overlap.outer} (line {overlap.outer_label})\n')
+            count += 1
+    except OSError as e: # Exit with 2, since 1 means the check ran and found overlaps
+        print(f'ipcalc --check-overlaps: {e}', file=sys.stderr)
+        sys.exit(2)
+    sys.stdout.flush()
+
+    print(f'{count} overlapping pairs found', file=sys.stderr)
+    if count: # Fail, so this can be used as a check in scripts
+        sys.exit(1)
+
+def _summarize(argument_list):
+    import argparse
+    from subnet_calc import bulk
+    from subnet_calc.aggregate import summarize, summarize_sorted
+
+    parser = argparse.ArgumentParser(prog='ipcalc summarize',
+                                     description='Summarize a list of prefixes into the smallest list covering the same addresses')
+    parser.add_argument('file', nargs='?', default='-', help="One prefix per line, or stdin if FILE is '-' or omitted")
+    parser.add_argument('--sorted', action='store_true',
+                        help='The input is already sorted by network, then prefix length, so stream it rather than loading it all')
+    args = parser.parse_args(argument_list)
+
+    prefixes = bulk.read_lines(args.file)
+    try:
+        results = summarize_sorted(prefixes) if args.sorted else summarize(prefixes)
+        sys.stdout.writelines(f'{prefix}\n' for prefix in results)
+    except (OSError, ValueError) as e:
+        sys.exit(f'ipcalc summarize: {e}')
+    sys.stdout.flush()
+
+def _prefix_length(value: str):
+    import argparse
+    # Accept both 24 and /24
+    try:
+        return int(value.removeprefix('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'invalid prefix length: {value}')
+
+def _subnets(argument_list):
+    import argparse
+    from subnet_calc.split import subnets
+
+    parser = argparse.ArgumentParser(prog='ipcalc subnets', description='List the subnets of a prefix at a longer prefix length')
+    parser.add_argument('cidr', help='The prefix to split in CIDR notation')
+    parser.add_argument('new_prefix', type=_prefix_length, help='The prefix length of the subnets, eg 24 or /24')
+    parser.add_argument('--start', type=int, default=0, metavar='N', help='Start from the Nth subnet (counting from 0)')
+    parser.add_argument('--count', type=int, metavar='N', help='Only list N subnets')
+    args = parser.parse_args(argument_list)
+
+    try:
+        results = subnets(args.cidr, args.new_prefix)
+    except ValueError as e:
+        sys.exit(f'ipcalc subnets: {e}')
+
+    # Slicing the sequence is O(1), so this never generates the subnets before --start
+    end = None if args.count is None else args.start + args.count
+    sys.stdout.writelines(f'{prefix}\n' for prefix in results[args.start:end])
+    sys.stdout.flush()
+
+def _vlsm(argument_list):
+    import argparse
+    from subnet_calc.split import vlsm_plan
+    from subnet_calc.tables import HOST_COUNTS
+
+    parser = argparse.ArgumentParser(prog='ipcalc vlsm', description='Plan variable length subnets within a prefix')
+    parser.add_argument('cidr', help='The prefix to allocate from in CIDR notation')
+    parser.add_argument('hosts', type=int, nargs='+', help='The number of hosts each subnet needs')
+    args = parser.parse_args(argument_list)
+
+    try:
+        plan = vlsm_plan(args.cidr, args.hosts)
+    except ValueError as e:
+        sys.exit(f'ipcalc vlsm: {e}')
+
+    for allocation in plan:
+        prefix = allocation.prefix
+        print(f'{str(prefix):<18}  {allocation.hosts:>10} hosts requested  {HOST_COUNTS[prefix.length]:>10} available')
+
+def _format_conversion(result):
+    # A range converts to a list of prefixes, a prefix to a (first, last) range
+    if isinstance(result, tuple):
+        return f'{result[0]}-{result[1]}'
+    return ' '.join(str(prefix) for prefix in result)
+
+def _range(argument_list):
+    import argparse
+    from subnet_calc import bulk
+    from subnet_calc.ranges import convert_line
+
+    parser = argparse.ArgumentParser(prog='ipcalc range',
+                                     description='Convert an address range to the fewest prefixes covering it, or a prefix to its range')
+    parser.add_argument('address', nargs='*', help='A range as START END (or START-END), or a prefix in CIDR notation')
+    parser.add_argument('--batch', nargs='?', const='-', metavar='FILE',
+                        help="Convert every range or prefix in FILE (one per line), or stdin if FILE is '-' or omitted")
+    args = parser.parse_args(argument_list)
+
+    if args.batch is None:
+        if not args.address:
+            parser.error('an address range or prefix is required')
+        try:
+            result = convert_line(' '.join(args.address))
+        except ValueError as e:
+            sys.exit(f'ipcalc range: {e}')
+        # A single range gets one prefix per line
+        print('\n'.join(str(prefix) for prefix in result) if isinstance(result, list) else _format_conversion(result))
+        return
+
+    # One output line per input line, streamed; invalid lines are reported on stderr with their line numbers
+    try:
+        for number, line in bulk.read_numbered_lines(args.batch):
+            try:
+                sys.stdout.write(_format_conversion(convert_line(line)) + '\n')
+            except ValueError as e:
+                print(f'line {number}: {e}', file=sys.stderr)
+    except OSError as e:
+        sys.exit(f'ipcalc range: {e}')
+    sys.stdout.flush()
+
+def _annotate(argument_list):
+    import argparse, time
+    from subnet_calc.annotate import annotate_lines, read_log_lines, read_table, DEFAULT_CHUNK_SIZE
+
+    parser = argparse.ArgumentParser(prog='ipcalc annotate',
+                                     description='Tag each line of a log with the inventory prefix containing its address')
+    parser.add_argument('files', nargs='*', default=['-'], metavar='FILE', help="The logs to annotate, or stdin if FILE is '-' or omitted")
+    parser.add_argument('--table', required=True, metavar='CSV', help='The inventory, one prefix and label per row')
+    parser.add_argument('--field', type=int, metavar='N',
+                        help='The address is in the Nth whitespace separated field (default: the first address in the line)')
+    parser.add_argument('--jobs', type=_job_count, default=1, metavar='N', help='Number of worker processes, 0 for one per CPU (default: 1)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, metavar='N',
+                        help=f'Lines sent to a worker at a time (default: {DEFAULT_CHUNK_SIZE})')
+    args = parser.parse_args(argument_list)
+
+    try:
+        entries = read_table(args.table)
+    except (OSError, ValueError) as e:
+        sys.exit(f'ipcalc annotate: {e}')
+
+    # Logs can hold bytes that are not valid UTF-8, which are passed through unchanged rather than failing the run
+    for stream in (sys.stdin, sys.stdout):
+        if hasattr(stream, 'reconfigure'):
+            stream.reconfigure(errors='surrogateescape')
+
+    start = time.perf_counter()
+    count = 0
+    try:
+        for block in annotate_lines(read_log_lines(args.files), entries, args.field, args.jobs, args.chunk_size):
+            sys.stdout.write(block)
+            count += block.count('\n')
+    except (OSError, ValueError) as e:
+        sys.exit(f'ipcalc annotate: {e}')
+    sys.stdout.flush()
+
+    elapsed = time.perf_counter() - start
+    print(f'annotated {count:,} lines in {elapsed:.2f} s ({count / elapsed if elapsed else 0:,.0f} lines/s)', file=sys.stderr)
+
+def _serve(argument_list):
+    import argparse
+    from subnet_calc.annotate import read_table
+    from subnet_calc.server import serve
+
+    parser = argparse.ArgumentParser(prog='ipcalc serve', description='Serve the subnet calculations and prefix lookups as JSON over HTTP')
+    parser.add_argument('--host', default='127.0.0.1', help='The address to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8080, help='The port to listen on (default: 8080)')
+    parser.add_argument('--table', metavar='CSV', help='Prefixes for /lookup, one prefix and label per row')
+    parser.add_argument('--max-pending', type=int, default=1000, metavar='N',
+                        help='Turn requests away with 503 once N are being handled (default: 1000)')
+    parser.add_argument('--max-batch', type=int, default=10000, metavar='N', help='The most items in one request (default: 10000)')
+    parser.add_argument('--batch-window', type=float, default=0.0, metavar='MS',
+                        help='Wait up to MS milliseconds to coalesce concurrent /calc requests (default: 0)')
+    args = parser.parse_args(argument_list)
+
+    try:
+        table = None if args.table is None else read_table(args.table)
+    except (OSError, ValueError) as e:
+        sys.exit(f'ipcalc serve: {e}')
+
+    def ready(server):
+        print(f'listening on http://{server.host}:{server.port}', file=sys.stderr, flush=True)
+
+    try:
+        serve(args.host, args.port, table, ready, max_pending=args.max_pending, max_batch=args.max_batch,
+              batch_window=args.batch_window / 1000)
+    except OSError as e:
+        sys.exit(f'ipcalc serve: {e}')
+    except KeyboardInterrupt:
+        pass
+
+def _coprocess_command(words: list[str]):
+    import io
+    from contextlib import redirect_stdout, redirect_stderr
+
+    # Run a subcommand as if from the command line, collecting what it prints. It gets an empty stdin, so a command
+    # that reads stdin (eg range --batch) cannot swallow the rest of the protocol.
+    output, errors = io.StringIO(), io.StringIO()
+    stdin = sys.stdin
+    sys.stdin = io.StringIO()
+    try:
+        with redirect_stdout(output), redirect_stderr(errors):
+            main(words)
+    except SystemExit as e:
+        if e.code not in (None, 0): # The reason is either the exit message or the last line written to stderr
+            reasons = errors.getvalue().strip().splitlines()
+            message = e.code if isinstance(e.code, str) else reasons[-1] if reasons else f'exit status {e.code}'
+            return {'error': message, 'output': output.getvalue().splitlines()}
+    except Exception as e: # Anything else a command raises is its answer, the co-process itself keeps running
+        return {'error': str(e), 'output': output.getvalue().splitlines()}
+    finally:
+        sys.stdin = stdin
+    return {'output': output.getvalue().splitlines()}
+
+def _coprocess_line(line: str, fields):
+    import argparse, shlex
+    from subnet_calc.wrapper import calc_subnet
+
+    # Returns the result for one line of input and the field selection for the next line
+    words = line.split()
+    if not words:
+        return {'error': 'Empty line'}, fields
+    if words[0] == 'fields': # fields a,b,... selects the fields for the lines that follow, fields on its own resets them
+        try:
+            selected = _field_list(','.join(words[1:])) or None
+        except argparse.ArgumentTypeError as e:
+            return {'error': str(e)}, fields
+        return {'fields': None if selected is None else list(selected)}, selected
+    if words[0] in _COMMANDS:
+        if words[0] == 'serve':
+            return {'error': 'serve is not available in co-process mode'}, fields
+        try:
+            words = shlex.split(line)
+        except ValueError as e: # Unbalanced quotes
+            return {'error': str(e)}, fields
+        return _coprocess_command(words), fields
+    return calc_subnet(line, fields).to_dict(), fields
+
+def _coprocess(fields, cache_size: int | None):
+    import json
+    from subnet_calc import cache
+
+    # One result line per input line, flushed straight away, so a caller can write a line and block reading the answer
+    compact_json = json.JSONEncoder(separators=(',', ':')).encode
+    if cache_size is not None:
+        cache.enable_cache(cache_size)
+    stdin, stdout = sys.stdin, sys.stdout
+    while line := stdin.readline():
+        line = line.strip()
+        if line in ('quit', 'exit'):
+            break
+        result, fields = _coprocess_line(line, fields)
+        stdout.write(compact_json(result) + '\n')
+        stdout.flush()
+
+# Subcommands, which take over the rest of the command line
+_COMMANDS = {
+    'summarize': _summarize,
+    'subnets': _subnets,
+    'vlsm': _vlsm,
+    'range': _range,
+    'annotate': _annotate,
+    'serve': _serve,
+}
+
+def main(argument_list=None):
+    if argument_list is None:
+        argument_list = sys.argv[1:] # Retrieve arguments
+
+    if argument_list and argument_list[0] in _COMMANDS:
+        _COMMANDS[argument_list[0]](argument_list[1:])
+        return
+
+    # The common case of a single address (or none, to prompt for one) and no options skips argparse altogether
+    if len(argument_list) <= 1 and not (argument_list and argument_list[0].startswith('-')):
+        _calculate(argument_list[0] if argument_list else '')
+        return
+
+    args = _parse_args(argument_list)
+
+    if args.coprocess:
+        _coprocess(args.fields, args.cache)
+        return
+
+    if args.check_overlaps is not None:
+        _check_overlaps(args.check_overlaps)
+        return
+
+    if args.batch is not None:
+        _run_batch(args.batch, args.format, args.jobs, not args.unordered, args.fields, args.cache)
+        return
+
+    _calculate(args.address, args.fields)
+
+def _calculate(address: str, fields=None):
+    from subnet_calc.wrapper import calc_subnet, SECTIONS
 
     if address == '': # If no CLI address is specified
-        address = input('Enter an IP Address in CIDR notation: ') 
+        address = input('Enter an IP Address in CIDR notation: ')
         if address == '': # If no address is specified
             print('Address cannot be blank')
 
-    raw_results = calc_subnet(address)
-    results = json.loads(raw_results)
+    results = calc_subnet(address, fields)
 
-    if results['output']['result']:
-        for key, value in results.items():
-            print(f'{key}:')
-            for sub_key, sub_value in value.items():
-                print(f'   {sub_key:<12}:  {sub_value}')
-            print()
+    if results.result:
+        # Format straight from the result's sections, and write the whole report at once
+        lines = []
+        for name in SECTIONS:
+            section = getattr(results, name)
+            if section is not None:
+                lines.append(f'{name}:')
+                lines.extend(f'   {key:<12}:  {value}' for key, value in section.items())
+                lines.append('')
+        sys.stdout.write('\n'.join(lines) + '\n')
     else:
-        print('Error calculating results')
\ No newline at end of file
+        print('Error calculating results')
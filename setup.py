@@ -6,6 +6,9 @@ setup(
     packages=find_packages(),
     py_modules=['ipcalc'],  # <-- add this line
     install_requires=[],
+    extras_require={
+        'numpy': ['numpy'],  # Only needed for the batch API
+    },
     entry_points={
         'console_scripts': [
             'ipcalc=ipcalc:main',
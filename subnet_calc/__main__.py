@@ -0,0 +1,5 @@
+# python -m subnet_calc runs the ipcalc command line
+from ipcalc import main
+
+if __name__ == '__main__':
+    main()
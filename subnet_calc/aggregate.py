@@ -0,0 +1,111 @@
+from array import array
+from .prefix import Prefix, as_prefix
+from .prefixarray import PrefixArray
+from .tables import MASKS, WILDCARDS
+
+try:
+    import numpy as np
+except ImportError: # numpy is optional, it only speeds up the sort
+    np = None
+
+# Prefixes are handled as single int keys, network << 6 | length, which sort by network and then from least to most
+# specific. A prefix length always fits in the 6 low bits.
+def _key(item):
+    prefix = as_prefix(item)
+    return ((prefix.address & MASKS[prefix.length]) << 6) | prefix.length
+
+# How many sorted positions to convert back to ints at a time
+_SORT_CHUNK = 1 << 16
+
+def sorted_order(keys: array):
+    """
+    Sort an array of 64-bit keys, eg prefixes packed as network << 6 | length, returning the positions of the keys in
+    sorted order rather than the keys themselves, so other columns can be read in the same order. Equal keys keep their
+    input order. With numpy the positions come from an argsort of the array, and are converted back a chunk at a time
+    so they never all exist as int objects.
+
+    :param keys: The keys to sort
+    :type keys: array('Q')
+    :returns: Returns an iterator of positions in keys, in ascending order of key
+    """
+
+    if np is None:
+        return iter(sorted(range(len(keys)), key=keys.__getitem__))
+    order = np.argsort(np.frombuffer(keys, dtype=np.uint64), kind='stable')
+    return (index for start in range(0, len(order), _SORT_CHUNK) for index in order[start:start + _SORT_CHUNK].tolist())
+
+def sort_keys(keys: array):
+    """
+    Sort an array of 64-bit keys, see sorted_order
+
+    :param keys: The keys to sort
+    :type keys: array('Q')
+    :returns: Returns an iterator of the keys as ints, in ascending order
+    """
+
+    return map(keys.__getitem__, sorted_order(keys))
+
+def _collapse(keys):
+    # Merge sorted keys into the minimal list of (network, length) pairs. The stack holds disjoint blocks in address
+    # order, and only the top can absorb or merge with the next prefix: a prefix inside the top block is dropped, and
+    # when the top two blocks are the two halves of a larger block they are replaced by it, which can repeat down the
+    # stack. Once the next prefix starts beyond the end of the top block nothing on the stack can change again, so the
+    # stack is emitted and memory stays bounded however long the input is.
+    stack = []
+    previous = -1
+    for key in keys:
+        if key < previous:
+            raise ValueError(f'Input is not sorted: {Prefix(key >> 6, key & 0x3F)} after {Prefix(previous >> 6, previous & 0x3F)}')
+        previous = key
+        network, length = key >> 6, key & 0x3F
+
+        if stack:
+            top_network, top_length = stack[-1]
+            top_broadcast = top_network | WILDCARDS[top_length]
+            if network <= top_broadcast: # Sorting puts any containing prefix first, so this one is already covered
+                continue
+            if network > top_broadcast + 1: # A gap, nothing on the stack can merge with anything after it
+                yield from stack
+                stack.clear()
+
+        stack.append((network, length))
+        while len(stack) > 1:
+            (left_network, left_length), (right_network, right_length) = stack[-2], stack[-1]
+            if left_length != right_length or left_network ^ right_network != 1 << (32 - right_length):
+                break
+            stack.pop()
+            stack[-1] = (left_network, left_length - 1)
+
+    yield from stack
+
+def summarize_sorted(prefixes):
+    """
+    Summarize prefixes that are already sorted by network, then by prefix length (least specific first). The input is
+    consumed as a stream and summarized prefixes are yielded as soon as they are final, so memory use does not depend
+    on the size of the input. Raises ValueError if the input is out of order.
+
+    :param prefixes: The sorted prefixes in CIDR notation or as Prefix objects. Host bits are ignored.
+    :type prefixes: Iterable[str | Prefix]
+    :returns: Yields the summarized Prefix objects in address order
+    """
+
+    for network, length in _collapse(_key(item) for item in prefixes):
+        yield Prefix(network, length)
+
+def summarize(prefixes):
+    """
+    Summarize a list of prefixes into the smallest list of prefixes that covers exactly the same addresses: prefixes
+    contained in another prefix are removed, and adjacent halves of a larger prefix are merged into it (repeatedly, so
+    four /26 become a /24). The input is sorted first, so this is O(n log n).
+
+    :param prefixes: The prefixes in CIDR notation, as Prefix objects or a PrefixArray. Host bits are ignored.
+    :type prefixes: Iterable[str | Prefix] | PrefixArray
+    :returns: Returns a list of Prefix objects in address order
+    """
+
+    if not isinstance(prefixes, PrefixArray):
+        prefixes = PrefixArray(prefixes)
+
+    # 8 bytes per key in an array, rather than an int object and a list slot for each one
+    keys = array('Q', (((address & MASKS[length]) << 6) | length for address, length in zip(prefixes.addresses, prefixes.lengths)))
+    return [Prefix(network, length) for network, length in _collapse(sort_keys(keys))]
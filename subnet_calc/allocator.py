@@ -0,0 +1,201 @@
+import heapq
+import json
+import os
+from threading import Lock
+from .prefix import Prefix, as_prefix
+from .sets import PrefixSet
+
+class Allocator:
+    """
+    Allocates subnets from a parent prefix, eg the next free /26 in 10.0.0.0/8. Free space is kept as aligned blocks
+    indexed by prefix length (a buddy allocator): an allocation splits the lowest free block that is large enough, and a
+    release merges the block back with its free buddy, so both cost O(log n) rather than a scan of the allocations.
+    The allocator can be shared between threads.
+
+    :param parent: The prefix to allocate from in CIDR notation or as a Prefix object. Host bits are ignored.
+    :param allocations: Prefixes that are already allocated, which must be inside parent and must not overlap
+    :type parent: str | Prefix
+    :type allocations: Iterable[str | Prefix]
+    """
+
+    def __init__(self, parent, allocations=()):
+        parent = as_prefix(parent)
+        self._parent = Prefix(parent.network, parent.length)
+        self._allocated = set()
+        self._lock = Lock()
+
+        # Free blocks of each prefix length: a set for membership tests and a heap for the lowest address. Blocks are
+        # removed from the set straight away and from the heap lazily, the next time they reach the top.
+        self._free = [set() for _ in range(33)]
+        self._heaps = [[] for _ in range(33)]
+
+        for allocation in allocations:
+            prefix = as_prefix(allocation)
+            key = (prefix.network, prefix.length)
+            if prefix.length < self._parent.length or not self._parent.network <= prefix.network <= self._parent.broadcast:
+                raise ValueError(f'{prefix} is not inside {self._parent}')
+            if key in self._allocated:
+                raise ValueError(f'{Prefix(*key)} is allocated more than once')
+            self._allocated.add(key)
+
+        # The free space is whatever is left of the parent, which PrefixSet splits into the fewest aligned blocks
+        allocated = PrefixSet(Prefix(network, length) for network, length in self._allocated)
+        if allocated.num_addresses != sum(1 << (32 - length) for _, length in self._allocated):
+            raise ValueError('The allocations overlap')
+        for block in PrefixSet([self._parent]) - allocated:
+            self._add_free(block.network, block.length)
+
+    @property
+    def parent(self):
+        """The prefix allocations are made from"""
+        return self._parent
+
+    def _add_free(self, network: int, length: int):
+        self._free[length].add(network)
+        heap = self._heaps[length]
+        heapq.heappush(heap, network)
+        if len(heap) > 2 * len(self._free[length]) + 64: # Too many stale entries, rebuild the heap from the set
+            self._heaps[length] = sorted(self._free[length])
+
+    def _lowest_free(self, length: int):
+        # The lowest free block of this length, or None
+        heap, free = self._heaps[length], self._free[length]
+        while heap and heap[0] not in free:
+            heapq.heappop(heap)
+        return heap[0] if heap else None
+
+    def _allocate(self, prefix_len: int):
+        # Take the lowest addressed free block that is large enough, then split it down to the requested size, freeing
+        # the upper half at each step
+        candidates = [(network, length) for length in range(self._parent.length, prefix_len + 1)
+                      if (network := self._lowest_free(length)) is not None]
+        if not candidates:
+            raise ValueError(f'No free /{prefix_len} in {self._parent}')
+        network, length = min(candidates)
+        self._free[length].discard(network)
+        while length < prefix_len:
+            length += 1
+            self._add_free(network | (1 << (32 - length)), length)
+        self._allocated.add((network, prefix_len))
+        return Prefix(network, prefix_len)
+
+    def _check_length(self, prefix_len: int):
+        if not self._parent.length <= prefix_len <= 32:
+            raise ValueError(f'The prefix length must be in the range {self._parent.length}-32')
+
+    def allocate(self, prefix_len: int):
+        """
+        Allocate the lowest free subnet of a given size. Raises ValueError if there is no free space for it.
+
+        :param prefix_len: The prefix length of the subnet
+        :type prefix_len: int
+        :returns: Returns the allocated Prefix
+        """
+
+        self._check_length(prefix_len)
+        with self._lock:
+            return self._allocate(prefix_len)
+
+    def allocate_many(self, prefix_len: int, count: int):
+        """
+        Allocate several subnets of the same size. Either all of them are allocated, or none are and ValueError is raised.
+
+        :param prefix_len: The prefix length of the subnets
+        :param count: The number of subnets
+        :type prefix_len: int
+        :type count: int
+        :returns: Returns a list of the allocated Prefix objects, in address order
+        """
+
+        self._check_length(prefix_len)
+        with self._lock:
+            allocated = []
+            try:
+                for _ in range(count):
+                    allocated.append(self._allocate(prefix_len))
+            except ValueError:
+                for prefix in allocated:
+                    self._release(prefix.network, prefix.length)
+                raise ValueError(f'Not enough free space for {count} /{prefix_len} in {self._parent}')
+            return allocated
+
+    def _release(self, network: int, length: int):
+        self._allocated.remove((network, length))
+        # Merge with the buddy block (the other half of the same parent block) for as long as the buddy is free too
+        while length > self._parent.length:
+            buddy = network ^ (1 << (32 - length))
+            if buddy not in self._free[length]:
+                break
+            self._free[length].remove(buddy)
+            network &= ~(1 << (32 - length))
+            length -= 1
+        self._add_free(network, length)
+
+    def release(self, prefix):
+        """
+        Return an allocated subnet to the free space. Raises KeyError if it is not allocated.
+
+        :param prefix: The subnet in CIDR notation or as a Prefix object, exactly as it was allocated
+        :type prefix: str | Prefix
+        """
+
+        prefix = as_prefix(prefix)
+        key = (prefix.network, prefix.length)
+        with self._lock:
+            if key not in self._allocated:
+                raise KeyError(str(Prefix(*key)))
+            self._release(*key)
+
+    def allocations(self):
+        """
+        :returns: Returns a list of the allocated Prefix objects, in address order
+        """
+
+        with self._lock:
+            return [Prefix(network, length) for network, length in sorted(self._allocated)]
+
+    def free_blocks(self):
+        """
+        :returns: Returns a list of the free blocks as Prefix objects, in address order
+        """
+
+        with self._lock:
+            return [Prefix(network, length) for network, length in sorted((network, length) for length, free in enumerate(self._free) for network in free)]
+
+    @property
+    def free_addresses(self):
+        """The number of free addresses"""
+        with self._lock:
+            return sum(len(free) << (32 - length) for length, free in enumerate(self._free))
+
+    def save(self, path: str):
+        """
+        Save the parent and the allocations to a JSON file. The file is replaced in one step, so a crash while saving
+        leaves the previous snapshot intact.
+
+        :param path: The file to write
+        :type path: str
+        """
+
+        snapshot = {'parent': str(self._parent), 'allocations': [str(prefix) for prefix in self.allocations()]}
+        temporary = f'{path}.tmp'
+        with open(temporary, 'w') as file:
+            json.dump(snapshot, file, indent=2)
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path: str):
+        """
+        Load an allocator saved with save()
+
+        :param path: The file to read
+        :type path: str
+        :returns: Returns a new Allocator
+        """
+
+        with open(path) as file:
+            snapshot = json.load(file)
+        return cls(snapshot['parent'], snapshot['allocations'])
+
+    def __repr__(self):
+        return f"Allocator('{self._parent}', {len(self._allocated)} allocations)"
@@ -0,0 +1,164 @@
+import csv
+import re
+import sys
+from .bulk import BUFFER_SIZE
+from .lookup import PrefixTable
+from .parallel import chunked, map_chunks
+from .prefix import Prefix
+from .tables import OCTET_VALUES
+from .validation import ADDRESS_PATTERN
+
+# Lines handed to a worker at a time. Log lines are cheap to annotate, so the chunks are large to keep the pickling
+# overhead per line small.
+DEFAULT_CHUNK_SIZE = 20000
+
+# The same strict octets as validation.parse_address, but searched for anywhere in a line. An address must not be part
+# of a longer run of digits and dots, so a version number like 1.2.3.4.5 or an octet like 300 is not taken for one.
+_ADDRESS = re.compile(rf'(?<![\d.]){ADDRESS_PATTERN}(?!\.?\d)', re.ASCII)
+
+# Written in place of the prefix and label when no prefix contains the address, or the line has no address
+NO_MATCH = '-'
+
+def read_table(path: str):
+    """
+    Read a subnet inventory from a CSV file with the prefix in the first column and its label in the second. Any other
+    columns are ignored, a missing label is read as an empty string, and a first row that is not a prefix is taken to be
+    a header.
+
+    :param path: The CSV file to read
+    :type path: str
+    :returns: Returns a list of (Prefix, label) tuples
+    """
+
+    entries = []
+    with open(path, newline='') as file:
+        for number, row in enumerate(csv.reader(file), 1):
+            if not row or not row[0].strip():
+                continue
+            try:
+                prefix = Prefix.parse(row[0].strip())
+            except ValueError as e:
+                if number == 1:
+                    continue
+                raise ValueError(f'{path} line {number}: {e}')
+            entries.append((prefix, row[1].strip() if len(row) > 1 else ''))
+
+    return entries
+
+def _field_of(line: str, field: int):
+    # The Nth whitespace separated field, or an empty string if the line is shorter
+    fields = line.split(None, field)
+    return fields[field - 1] if len(fields) >= field else ''
+
+def find_address(line: str, field: int | None = None):
+    """
+    Find the first IPv4 address in a log line
+
+    :param line: The log line
+    :param field: Only look in this whitespace separated field, counting from 1 (as in awk), eg the client address of a
+                  web server log. Otherwise the first address anywhere in the line is used.
+    :type line: str
+    :type field: int | None
+    :returns: Returns the address as a 32-bit int, or None if there is no address
+    """
+
+    match = _ADDRESS.search(line if field is None else _field_of(line, field))
+    if match is None:
+        return None
+    a, b, c, d = match.groups()
+    return (OCTET_VALUES[a] << 24) | (OCTET_VALUES[b] << 16) | (OCTET_VALUES[c] << 8) | OCTET_VALUES[d]
+
+def _annotate_chunk(lines: list[str], table: PrefixTable, field: int | None):
+    # find_address is inlined, the whole chunk is looked up in one call, and each prefix is formatted once per chunk
+    # rather than once per line, since a log usually hits the same few prefixes over and over
+    search, octets = _ADDRESS.search, OCTET_VALUES
+    ips = []
+    for line in lines:
+        match = search(line if field is None else _field_of(line, field))
+        if match is None:
+            ips.append(None)
+            continue
+        a, b, c, d = match.groups()
+        ips.append((octets[a] << 24) | (octets[b] << 16) | (octets[c] << 8) | octets[d])
+    indexes = iter(table.lookup_indexes(ip for ip in ips if ip is not None))
+
+    suffixes = {None: f'\t{NO_MATCH}\t{NO_MATCH}\n'}
+    results = []
+    append = results.append
+    for line, ip in zip(lines, ips):
+        index = None if ip is None else next(indexes)
+        suffix = suffixes.get(index)
+        if suffix is None:
+            prefix, label = table.entry(index)
+            suffix = suffixes[index] = f'\t{prefix}\t{label}\n'
+        append(line + suffix)
+
+    return ''.join(results)
+
+# Each worker process builds its own copy of the table once, in _init_worker, rather than receiving it with every chunk
+_table = None
+_field = None
+
+def _init_worker(entries: list, field: int | None):
+    global _table, _field
+    _table = PrefixTable(entries)
+    _field = field
+
+def _annotate_worker_chunk(lines: list[str]):
+    return _annotate_chunk(lines, _table, _field)
+
+def annotate_lines(lines, entries, field: int | None = None, jobs: int = 1, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                   max_in_flight: int | None = None):
+    """
+    Annotate a stream of log lines with the most specific prefix from an inventory containing each line's address. Each
+    output line is the input line followed by a tab, the prefix, a tab and the prefix's label, or '-' for both if there is
+    no address or no prefix contains it.
+
+    :param lines: The log lines, without their line endings
+    :param entries: The inventory as (prefix, label) pairs, see read_table
+    :param field: The whitespace separated field holding the address, counting from 1, see find_address
+    :param jobs: The number of worker processes, 0 for one per CPU. Each worker builds its own copy of the table.
+    :param chunk_size: The number of lines sent to a worker at a time
+    :param max_in_flight: The maximum number of chunks being processed at once, which bounds the memory used
+    :type lines: Iterable[str]
+    :type entries: Iterable[tuple]
+    :type field: int | None
+    :type jobs: int
+    :type chunk_size: int
+    :type max_in_flight: int | None
+    :returns: A generator yielding the annotated lines in input order, one block of up to chunk_size newline terminated
+              lines at a time
+    """
+
+    if field is not None and field < 1:
+        raise ValueError('The field must be at least 1')
+
+    if jobs == 1: # Build the table here rather than in the module global the workers use
+        table = PrefixTable(entries)
+        for chunk in chunked(lines, chunk_size):
+            yield _annotate_chunk(chunk, table, field)
+        return
+
+    entries = [(prefix, label) for prefix, label in entries] # Pickled once for each worker
+    yield from map_chunks(_annotate_worker_chunk, chunked(lines, chunk_size), jobs or None, True, max_in_flight,
+                          initializer=_init_worker, initargs=(entries, field))
+
+def read_log_lines(sources):
+    """
+    Lazily read the lines of one or more log files, keeping every line (including blank ones) as it is apart from the
+    line ending. Bytes in the files that are not valid UTF-8 are carried through with surrogate escapes, so they can be
+    written back out unchanged.
+
+    :param sources: The paths of the files to read, or '-' for stdin
+    :type sources: Iterable[str]
+    :returns: A generator yielding each line without its line ending
+    """
+
+    for source in sources:
+        if source == '-':
+            for line in sys.stdin:
+                yield line.rstrip('\r\n')
+            continue
+        with open(source, 'r', buffering=BUFFER_SIZE, errors='surrogateescape', newline='') as handle:
+            for line in handle:
+                yield line.rstrip('\r\n')
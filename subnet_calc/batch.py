@@ -0,0 +1,148 @@
+try:
+    import numpy as np
+except ImportError: # numpy is optional, only this module needs it
+    np = None
+
+from .prefix import as_prefix, int_to_ip
+from .tables import MASKS, WILDCARDS, HOST_COUNTS
+
+# The per prefix length tables as arrays, so a whole column of prefix lengths can be used as an index
+if np is not None:
+    _MASKS = np.array(MASKS, dtype=np.uint32)
+    _WILDCARDS = np.array(WILDCARDS, dtype=np.uint32)
+    _HOST_COUNTS = np.array(HOST_COUNTS, dtype=np.int64)
+
+def _require_numpy():
+    if np is None:
+        raise ImportError('The batch API requires numpy. Install it with: pip install subnet_calc[numpy]')
+
+def parse_cidrs(addresses):
+    """
+    Parse a list of addresses in CIDR notation into an address array and a prefix length array
+
+    :param addresses: The addresses to parse in CIDR notation, or already parsed Prefix objects
+    :type addresses: Iterable[str | Prefix]
+    :returns: Returns a tuple of (uint32 address array, uint8 prefix length array)
+    """
+
+    _require_numpy()
+
+    prefixes = [as_prefix(address) for address in addresses]
+    _addresses = np.fromiter((prefix.address for prefix in prefixes), dtype=np.uint32, count=len(prefixes))
+    _lengths = np.fromiter((prefix.length for prefix in prefixes), dtype=np.uint8, count=len(prefixes))
+
+    return _addresses, _lengths
+
+def calc_subnets(addresses, lengths=None):
+    """
+    Perform the subnet calculations on a whole batch of prefixes at once. This gives the same results as the scalar
+    calculate/helpers functions, but as columns of integers computed with vectorised bitwise operations.
+
+    :param addresses: Either a uint32 array of addresses, or a list of addresses in CIDR notation when lengths is not provided
+    :param lengths: A uint8 array of prefix lengths, one per address
+    :type addresses: numpy.ndarray | Iterable[str | Prefix]
+    :type lengths: numpy.ndarray | None
+    :returns: A dictionary of equally sized arrays: network_id, netmask, broadcast, wildcard, first, last, total and
+              has_hosts. has_hosts is a bool array that is False where calculate.ipv4_edge is undefined (/0, /31 and
+              /32); first and last are 0 there, which is only a placeholder since 0.0.0.0 is a real address.
+    """
+
+    _require_numpy()
+
+    if lengths is None:
+        addresses, lengths = parse_cidrs(addresses)
+    else:
+        addresses = np.asarray(addresses, dtype=np.uint32)
+        lengths = np.asarray(lengths, dtype=np.uint8)
+
+    if addresses.shape != lengths.shape:
+        raise ValueError('addresses and lengths must be the same shape')
+    if lengths.size and lengths.max() > 32:
+        raise ValueError('Prefix lengths must be in the range 0-32')
+
+    # The mask, wildcard and host count only depend on the prefix length, so index the lookup tables directly
+    netmask = _MASKS[lengths]
+    wildcard = _WILDCARDS[lengths]
+    network_id = addresses & netmask
+    broadcast = network_id | wildcard
+
+    # First and last usable addresses, only where the scalar ipv4_edge would not reject the prefix
+    has_hosts = (lengths > 0) & (lengths < 31)
+    first = np.where(has_hosts, network_id + np.uint32(1), np.uint32(0))
+    last = np.where(has_hosts, broadcast - np.uint32(1), np.uint32(0))
+
+    return {
+        'network_id': network_id,
+        'netmask': netmask,
+        'broadcast': broadcast,
+        'wildcard': wildcard,
+        'first': first,
+        'last': last,
+        'total': _HOST_COUNTS[lengths],
+        'has_hosts': has_hosts
+    }
+
+def format_addresses(values):
+    """
+    Convert an array of 32-bit addresses back to dot decimal format
+
+    :param values: The addresses to convert
+    :type values: numpy.ndarray
+    :returns: Returns a list of strings in dot decimal format
+    """
+
+    return [int_to_ip(value) for value in values.tolist()]
+
+def ranges_to_cidrs(starts, ends):
+    """
+    Convert a whole batch of address ranges to the fewest prefixes covering each one, see ranges.range_to_cidrs. Each
+    pass takes the largest aligned block from the start of every range that still has addresses left, so the number of
+    passes depends on the ranges' alignment (at most 62) rather than on how many ranges there are.
+
+    :param starts: The first address of each range
+    :param ends: The last address of each range (inclusive)
+    :type starts: numpy.ndarray | Sequence[int]
+    :type ends: numpy.ndarray | Sequence[int]
+    :returns: A tuple of equally sized arrays: the index of the range each prefix belongs to, the network IDs (uint32)
+              and the prefix lengths (uint8), ordered by range and then by address
+    """
+
+    _require_numpy()
+
+    # int64, so the end of the range plus one and the size of a whole /0 still fit
+    starts = np.asarray(starts, dtype=np.int64)
+    ends = np.asarray(ends, dtype=np.int64)
+    if starts.shape != ends.shape:
+        raise ValueError('starts and ends must be the same shape')
+    if starts.size and (starts.min() < 0 or ends.max() > 0xFFFFFFFF):
+        raise ValueError('Addresses must be in the range 0 - 2**32-1')
+    if np.any(starts > ends):
+        raise ValueError('Every range must start before it ends')
+
+    passes = []
+    counts = np.zeros(starts.size, dtype=np.int64)
+    remaining = np.arange(starts.size)
+    current = starts.copy()
+    while remaining.size:
+        start, end = current[remaining], ends[remaining]
+        # frexp gives the bit length of each value, which is exact for ints this small
+        bits = np.frexp(end - start + 1)[1] - 1
+        aligned = np.where(start == 0, 32, np.frexp(start & -start)[1] - 1)
+        bits = np.minimum(bits, aligned)
+
+        passes.append((remaining, start, 32 - bits))
+        counts[remaining] += 1
+        current[remaining] = start + (np.int64(1) << bits)
+        remaining = remaining[current[remaining] <= end]
+
+    # Every range still open takes exactly one prefix per pass, so the nth pass writes the nth prefix of each of its
+    # ranges, and the output is already in range and address order without sorting it
+    offsets = np.cumsum(counts) - counts
+    indexes = np.repeat(np.arange(starts.size), counts)
+    networks = np.empty(indexes.size, dtype=np.uint32)
+    lengths = np.empty(indexes.size, dtype=np.uint8)
+    for number, (remaining, start, length) in enumerate(passes):
+        positions = offsets[remaining] + number
+        networks[positions] = start
+        lengths[positions] = length
+    return indexes, networks, lengths
@@ -0,0 +1,160 @@
+import csv
+import json
+import sys
+from .wrapper import calc_subnet, FIELD_NAMES
+
+# The fields calculated for each record when no fields are selected
+DEFAULT_FIELDS = ('network_id', 'netmask', 'broadcast', 'wildcard', 'first', 'last', 'total')
+
+# Read and write in large blocks, bulk inputs (and the logs read by annotate) can be tens of millions of lines
+BUFFER_SIZE = 1 << 20
+
+def read_lines(source: str):
+    """
+    Lazily read addresses from a file or stdin, one per line. Blank lines are skipped.
+
+    :param source: The path of the file to read, or '-' for stdin
+    :type source: str
+    :returns: A generator yielding each stripped line
+    """
+
+    for _, line in read_numbered_lines(source):
+        yield line
+
+def read_numbered_lines(source: str):
+    """
+    Lazily read addresses from a file or stdin with their line numbers, for reporting back where an address came from.
+    Blank lines are skipped, but still counted.
+
+    :param source: The path of the file to read, or '-' for stdin
+    :type source: str
+    :returns: A generator yielding a (line number, stripped line) tuple for each line, counting from 1
+    """
+
+    if source == '-':
+        handle = sys.stdin
+        close = False
+    else:
+        handle = open(source, 'r', buffering=BUFFER_SIZE)
+        close = True
+
+    try:
+        for number, line in enumerate(handle, 1):
+            line = line.strip()
+            if line:
+                yield number, line
+    finally:
+        if close:
+            handle.close()
+
+def expand_fields(fields):
+    """
+    Expand section names (eg hosts) in a field selection into the individual fields of that section, since bulk records are flat.
+    Fields that share a name with a field in an earlier section are given as section.field.
+
+    :param fields: The field names to expand
+    :type fields: Iterable[str]
+    :returns: A tuple of individual field names. Raises ValueError for an unknown field name.
+    """
+
+    expanded = {}
+    for field in fields:
+        keys = FIELD_NAMES.get(field)
+        if keys is None:
+            raise ValueError(f'Unknown field: {field}')
+        if len(keys) == 1:
+            expanded[field] = None
+            continue
+        for section, name in keys:
+            expanded[name if FIELD_NAMES[name] == ((section, name),) else f'{section}.{name}'] = None
+
+    return tuple(expanded)
+
+def calc_record(address: str, fields=DEFAULT_FIELDS):
+    """
+    Perform the subnet calculations on a single address and return a flat record, suitable for bulk output.
+    Invalid input is reported in the error field rather than raised.
+
+    :param address: The address to calculate in CIDR notation
+    :param fields: The names of the fields to calculate, see wrapper.calc_subnet. Section names are expanded, see
+                   expand_fields, and an unknown field name raises ValueError.
+    :type address: str
+    :type fields: Sequence[str]
+    :returns: A dictionary containing the cidr, the calculated fields and an error message if the calculation failed
+    """
+
+    return _calc_record(address, expand_fields(fields))
+
+def _calc_record(address: str, fields: tuple):
+    # calc_record with the fields already expanded
+    result = calc_subnet(address, fields)
+    record = {'cidr': address}
+    try:
+        for field in fields:
+            record[field] = result.get(field)
+    except ValueError as e:
+        return {'cidr': address, 'error': str(e)}
+
+    return record
+
+def calc_records(addresses, fields=DEFAULT_FIELDS):
+    """
+    Lazily perform the subnet calculations on a stream of addresses
+
+    :param addresses: The addresses to calculate in CIDR notation
+    :param fields: The names of the fields to calculate, see calc_record
+    :type addresses: Iterable[str]
+    :type fields: Sequence[str]
+    :returns: A generator yielding one record per address, see calc_record
+    """
+
+    fields = expand_fields(fields) # Once, rather than for every record
+    for address in addresses:
+        yield _calc_record(address, fields)
+
+def write_jsonl(records, out, fields=DEFAULT_FIELDS):
+    """
+    Write records as JSON Lines, one compact JSON object per line
+
+    :param records: The records to write
+    :param out: A text file object to write to
+    :param fields: Unused, records are written with whatever fields they have
+    :type records: Iterable[dict]
+    :returns: The number of records written
+    """
+
+    count = 0
+    dumps = json.JSONEncoder(separators=(',', ':')).encode
+    for record in records:
+        out.write(dumps(record))
+        out.write('\n')
+        count += 1
+
+    return count
+
+def write_csv(records, out, fields=DEFAULT_FIELDS):
+    """
+    Write records as CSV rows with a header row. Fields that do not apply to a record are left empty.
+
+    :param records: The records to write
+    :param out: A text file object to write to
+    :param fields: The calculated fields, which become the columns between cidr and error
+    :type records: Iterable[dict]
+    :type fields: Sequence[str]
+    :returns: The number of records written
+    """
+
+    count = 0
+    columns = ('cidr', *fields, 'error')
+    writer = csv.writer(out, lineterminator='\n')
+    writer.writerow(columns)
+    for record in records:
+        writer.writerow([record.get(column, '') for column in columns])
+        count += 1
+
+    return count
+
+WRITERS = {
+    'jsonl': write_jsonl,
+    'csv': write_csv
+}
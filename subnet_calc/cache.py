@@ -0,0 +1,92 @@
+from collections import namedtuple
+from contextlib import contextmanager
+from functools import lru_cache
+
+# Same fields as functools.lru_cache's cache_info(), so the numbers can be read the same way
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+# Every calculated field other than the input section only depends on the network ID and the prefix length, so results
+# for 10.0.0.1/8 and 10.0.0.5/8 can share one entry. Each entry is the dictionary the calculated fields are stored in.
+_network_values = None # Set by enable_cache, None while the cache is disabled
+
+def _new_values(network: int, length: int):
+    return {}
+
+def enable_cache(maxsize: int | None = 4096):
+    """
+    Enable the calculation cache used by wrapper.calc_subnet. Any existing cache entries and counters are discarded.
+
+    :param maxsize: The maximum number of networks to keep, the least recently used is evicted first. None for no limit.
+    :type maxsize: int | None
+    """
+
+    global _network_values
+    _network_values = lru_cache(maxsize=maxsize)(_new_values)
+
+def disable_cache():
+    """
+    Disable the calculation cache and discard its entries
+    """
+
+    global _network_values
+    _network_values = None
+
+@contextmanager
+def cache_enabled_for(maxsize: int | None = 4096):
+    """
+    Enable a new, empty calculation cache for the duration of a with block, then put back whatever cache (or none) was
+    in place before it
+
+    :param maxsize: The maximum number of networks to keep, see enable_cache
+    :type maxsize: int | None
+    """
+
+    global _network_values
+    previous = _network_values
+    enable_cache(maxsize)
+    try:
+        yield
+    finally:
+        _network_values = previous
+
+def cache_enabled():
+    """
+    :returns: True/False whether the calculation cache is enabled
+    """
+
+    return _network_values is not None
+
+def cache_info():
+    """
+    Report the cache statistics, so the cache can be sized
+
+    :returns: A CacheInfo with the hits, misses, maxsize and current size. All zero while the cache is disabled.
+    """
+
+    if _network_values is None:
+        return CacheInfo(0, 0, 0, 0)
+    return CacheInfo(*_network_values.cache_info())
+
+def cache_clear():
+    """
+    Discard all cache entries and reset the statistics, leaving the cache enabled
+    """
+
+    if _network_values is not None:
+        _network_values.cache_clear()
+
+def network_values(network: int, length: int):
+    """
+    Get the dictionary that the calculated fields for a network are stored in. While the cache is disabled this is
+    always a new dictionary.
+
+    :param network: The network ID as a 32-bit int
+    :param length: The prefix length
+    :type network: int
+    :type length: int
+    :returns: A dictionary of calculated fields shared by every address in this network
+    """
+
+    if _network_values is None:
+        return {}
+    return _network_values(network, length)
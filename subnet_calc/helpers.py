@@ -1,72 +1,55 @@
-from . import validation, calculate
+from .prefix import Prefix, as_prefix
+from .tables import HOST_COUNTS, OCTET_BINARY, WILDCARD_STRINGS
 
-def ipv4_host_count(address: str):
+def ipv4_host_count(address: str | Prefix):
     """
     Calculate the number of usable IPs in a given subnet.
 
-    :param address: The prefix to use as a basis for the calculation in CIDR format. 
-    :type address: str
+    :param address: The prefix to use as a basis for the calculation in CIDR format, or an already parsed Prefix.
+    :type address: str | Prefix
     :returns: Returns an int containing the number of usable addresses in a given prefix/subnet
     """
 
-    # Initialise internal variables
-    _host_count = 0
-    
-    # Now do the validation
-    if not validation.valid_cidr(address):
-        raise ValueError(f'Invalid CIDR Address: {address}')
+    # The formula is simple enough 2**h - 2, where h is the number of host bits, so this is precomputed per prefix length
+    return HOST_COUNTS[as_prefix(address).length]
 
-    # Split the address as per usual
-    _host_bits =  32 - int(address.split('/')[1])
-
-    # The formula is simple enough 2**h - 2, where h is the number of host bits
-    _host_count = 2**_host_bits - 2
-
-    return _host_count
-
-def ipv4_bin(mask: str):
+def ipv4_bin(mask: str | int):
     """
     Calculate the binary equivalent of the provided netmask
 
-    :param: mask: The netmask to calculate in dot decimal format
-    :type mask: str
+    :param: mask: The netmask to calculate in dot decimal format, or as a 32-bit int
+    :type mask: str | int
     : returns: Returns a string containing the calculated binary netmask
     """
 
-    _binary_mask: list[str] = []
-    
-    # First, check if the provided mask is valid. If not, throw an exception
-    # if not validation.valid_mask(mask):
-    #     raise ValueError(f'Invalid mask: {mask}')
+    if isinstance(mask, int): # Already an int, so there is no need to split anything
+        if not 0 <= mask <= 0xFFFFFFFF:
+            raise ValueError(f'Invalid address: {mask}')
+        return f'{OCTET_BINARY[mask >> 24]}.{OCTET_BINARY[(mask >> 16) & 0xFF]}.{OCTET_BINARY[(mask >> 8) & 0xFF]}.{OCTET_BINARY[mask & 0xFF]}'
 
-    # Split the provided mask into a list and then run the binary calculation on each octet
+    # Split the provided mask into a list and then look up the binary value of each octet
     _split_mask = mask.split('.')
+    if len(_split_mask) != 4:
+        raise ValueError(f'Invalid address: {mask}')
 
-    # Finally we can take the list and return it as a string in dot binary format
+    _binary_mask: list[str] = []
     for octet in _split_mask:
-        _binary_mask.append(format(int(octet), f'0{8}b'))
-    
+        value = int(octet)
+        if not 0 <= value <= 255:
+            raise ValueError(f'Invalid address: {mask}')
+        _binary_mask.append(OCTET_BINARY[value])
+
+    # Finally we can take the list and return it as a string in dot binary format
     return '.'.join(_binary_mask)
 
-def ipv4_wildcard(address: str):
+def ipv4_wildcard(address: str | Prefix):
     """
     Calculate the subnet wildcard from the provided address such that it complies with the relevant IPv4 spec as per RFC 791, 950 and 4632.
 
-    :param address: The IP Address to use as a basis for the calculation in CIDR format. 
-    :type address: str
+    :param address: The IP Address to use as a basis for the calculation in CIDR format, or an already parsed Prefix.
+    :type address: str | Prefix
     :returns: Returns a string containing the calculated wildcard
     """
-    wildcard = []
-
-    # Let's first validate that the provided address is valid
-    if not validation.valid_cidr(address):
-        raise ValueError(f'Invalid CIDR Address: {address}')
-
-    # Now get the mask
-    netmask_split = calculate.calc_ipv4_mask(address).split('.')
-
-    # And now simply calculate the bitwise inverse
-    for i in range(4):
-        wildcard.append(str(~int(netmask_split[i]) &  0xFF))
 
-    return '.'.join(wildcard)
+    # The wildcard is simply the bitwise inverse of the netmask, which only depends on the prefix length
+    return WILDCARD_STRINGS[as_prefix(address).length]
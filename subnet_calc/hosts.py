@@ -0,0 +1,108 @@
+from .prefix import as_prefix, int_to_ip, ip_to_int
+from .tables import OCTET_STRINGS
+
+DEFAULT_CHUNK_SIZE = 65536
+
+def _format_values(values: range):
+    # Convert a range of addresses to strings. Consecutive addresses share their first three octets for up to 256 at a
+    # time, so those are only formatted once per block.
+    if values.step != 1:
+        return [int_to_ip(value) for value in values]
+
+    results = []
+    start, stop = values.start, values.stop
+    while start < stop:
+        end = min(stop, (start | 0xFF) + 1)
+        head = f'{OCTET_STRINGS[start >> 24]}.{OCTET_STRINGS[(start >> 16) & 0xFF]}.{OCTET_STRINGS[(start >> 8) & 0xFF]}.'
+        results += [head + octet for octet in OCTET_STRINGS[start & 0xFF:((end - 1) & 0xFF) + 1]]
+        start = end
+    return results
+
+class HostRange:
+    """
+    The usable host addresses of a prefix, as a lazy sequence: len(), membership tests, indexing and slicing (including
+    with a step) are all O(1), and nothing is generated until it is read. Items are addresses in dot decimal format; use
+    chunks() to read them in batches of ints or strings, which is much faster than one at a time.
+
+    :param values: The 32-bit host addresses
+    :type values: range
+    """
+
+    __slots__ = ('_values',)
+
+    def __init__(self, values: range):
+        self._values = values
+
+    @property
+    def values(self):
+        """The host addresses as a range of 32-bit ints"""
+        return self._values
+
+    def __len__(self):
+        return len(self._values)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return HostRange(self._values[index])
+        return int_to_ip(self._values[index])
+
+    def __contains__(self, address):
+        if isinstance(address, str):
+            address = ip_to_int(address)
+        return address in self._values
+
+    def index(self, address):
+        """
+        :param address: A host address in dot decimal format, or as a 32-bit int
+        :type address: str | int
+        :returns: The position of the address. Raises ValueError if it is not one of these hosts.
+        """
+
+        if isinstance(address, str):
+            address = ip_to_int(address)
+        return self._values.index(address)
+
+    def chunks(self, size: int = DEFAULT_CHUNK_SIZE, strings: bool = False):
+        """
+        Iterate over the hosts in batches
+
+        :param size: The number of hosts per batch (the last batch may be smaller)
+        :param strings: Yield lists of addresses in dot decimal format, rather than ranges of ints
+        :type size: int
+        :type strings: bool
+        :returns: Yields a range of ints or a list of strings per batch
+        """
+
+        if size < 1:
+            raise ValueError('The chunk size must be at least 1')
+        values = self._values
+        for start in range(0, len(values), size):
+            chunk = values[start:start + size]
+            yield _format_values(chunk) if strings else chunk
+
+    def __iter__(self):
+        for chunk in self.chunks(strings=True):
+            yield from chunk
+
+    def __reversed__(self):
+        return iter(self[::-1])
+
+    def __repr__(self):
+        if not self._values:
+            return 'HostRange([])'
+        return f"HostRange('{self[0]}' ... '{self[-1]}', {len(self)} hosts)"
+
+def hosts(cidr):
+    """
+    The usable host addresses of a prefix. That is every address except the network ID and broadcast address, apart
+    from a /31 where both addresses are usable hosts of a point-to-point link (RFC 3021) and a /32 which is a single host.
+
+    :param cidr: The prefix in CIDR notation or as a Prefix object. Host bits are ignored.
+    :type cidr: str | Prefix
+    :returns: Returns a HostRange
+    """
+
+    prefix = as_prefix(cidr)
+    if prefix.length >= 31:
+        return HostRange(range(prefix.network, prefix.broadcast + 1))
+    return HostRange(range(prefix.network + 1, prefix.broadcast))
@@ -0,0 +1,378 @@
+from array import array
+from threading import Lock
+from .prefix import Prefix, as_address, as_prefix, ip_to_int, normalise_entry
+from .tables import MASKS
+
+# The table is a multibit trie with strides of 16, 8 and 8 bits. Each level is an array('i') of slots, where a slot
+# holds the index of the most specific entry covering it (or _EMPTY), or -(n + 2) when the slot continues in child
+# node n of the next level. A lookup is therefore at most three array indexes.
+_EMPTY = -1
+
+class PrefixTable:
+    """
+    A longest prefix match table, built once from a list of prefixes. Each prefix can carry a payload, eg a label or a
+    next hop, which is returned by lookups. If the same network is listed more than once the last payload wins.
+
+    :param prefixes: The prefixes in CIDR notation or as Prefix objects, optionally as (prefix, payload) pairs
+    :type prefixes: Iterable[str | Prefix | tuple]
+    """
+
+    __slots__ = ('_root', '_level2', '_level3', '_networks', '_lengths', '_payloads')
+
+    def __init__(self, prefixes=()):
+        # Remove duplicates, keeping the last payload, then insert from least to most specific so that longer prefixes
+        # simply overwrite the slots of the shorter prefixes they are nested in. The key is a single int, length << 32 |
+        # network, which sorts in exactly that order and keeps a million entries from creating a million tuples.
+        unique = {}
+        for item in prefixes:
+            network, length, payload = normalise_entry(item)
+            unique[(length << 32) | network] = payload
+        ordered = sorted(unique)
+
+        self._networks = array('I', (key & 0xFFFFFFFF for key in ordered))
+        self._lengths = array('B', (key >> 32 for key in ordered))
+        self._payloads = [unique[key] for key in ordered]
+        self._root = array('i', [_EMPTY]) * (1 << 16)
+        self._level2: list[array] = []
+        self._level3: list[array] = []
+
+        for index, key in enumerate(ordered):
+            self._insert(index, key & 0xFFFFFFFF, key >> 32)
+
+    def _insert(self, index: int, network: int, length: int):
+        if length <= 16:
+            start = network >> 16
+            self._root[start:start + (1 << (16 - length))] = array('i', [index]) * (1 << (16 - length))
+            return
+
+        node = self._descend(self._root, network >> 16, self._level2)
+        if length <= 24:
+            start = (network >> 8) & 0xFF
+            node[start:start + (1 << (24 - length))] = array('i', [index]) * (1 << (24 - length))
+            return
+
+        node = self._descend(node, (network >> 8) & 0xFF, self._level3)
+        start = network & 0xFF
+        node[start:start + (1 << (32 - length))] = array('i', [index]) * (1 << (32 - length))
+
+    @staticmethod
+    def _descend(node: array, slot: int, level: list[array]):
+        # Return the child node for this slot, creating it if needed. A new child inherits the slot's entry, so every
+        # address below it still matches the shorter prefix until a longer one is inserted.
+        value = node[slot]
+        if value < _EMPTY:
+            return level[-value - 2]
+        child = array('i', [value]) * 256
+        node[slot] = -len(level) - 2
+        level.append(child)
+        return child
+
+    def _find(self, ip: int):
+        value = self._root[ip >> 16]
+        if value < _EMPTY:
+            value = self._level2[-value - 2][(ip >> 8) & 0xFF]
+            if value < _EMPTY:
+                value = self._level3[-value - 2][ip & 0xFF]
+        return value
+
+    def entry(self, index: int):
+        """
+        Return an entry of the table by its index, see lookup_indexes
+
+        :param index: The index of the entry, from 0 (least specific) to len(table) - 1
+        :type index: int
+        :returns: Returns a tuple of (Prefix, payload)
+        """
+
+        return Prefix(self._networks[index], self._lengths[index]), self._payloads[index]
+
+    def lookup(self, ip: int | str):
+        """
+        Find the most specific prefix containing an address
+
+        :param ip: The address in dot decimal format, or as a 32-bit int
+        :type ip: int | str
+        :returns: Returns a tuple of (Prefix, payload), or None if no prefix contains the address
+        """
+
+        index = self._find(as_address(ip))
+        return None if index == _EMPTY else self.entry(index)
+
+    def lookup_many(self, ips):
+        """
+        Find the most specific prefix for each of a list of addresses
+
+        :param ips: The addresses in dot decimal format, or as 32-bit ints
+        :type ips: Iterable[int | str]
+        :returns: Returns a list with a (Prefix, payload) tuple or None for each address
+        """
+
+        entry = self.entry
+        return [None if index is None else entry(index) for index in self.lookup_indexes(ips)]
+
+    def lookup_indexes(self, ips):
+        """
+        Find the index of the most specific entry for each of a list of addresses. Entries are cheaper to compare and
+        cache by index than as the (Prefix, payload) tuples returned by lookup_many, see entry.
+
+        :param ips: The addresses in dot decimal format, or as 32-bit ints
+        :type ips: Iterable[int | str]
+        :returns: Returns a list with the entry index, or None, for each address
+        """
+
+        # The lookup is inlined here, since function calls are the bulk of the cost of a single lookup
+        root, level2, level3 = self._root, self._level2, self._level3
+        results = []
+        append = results.append
+        for ip in ips:
+            if ip.__class__ is str:
+                ip = ip_to_int(ip)
+            elif not 0 <= ip <= 0xFFFFFFFF: # A negative int would index the trie from the end
+                raise ValueError(f'Invalid address: {ip}')
+            value = root[ip >> 16]
+            if value < _EMPTY:
+                value = level2[-value - 2][(ip >> 8) & 0xFF]
+                if value < _EMPTY:
+                    value = level3[-value - 2][ip & 0xFF]
+            append(None if value == _EMPTY else value)
+
+        return results
+
+    def __len__(self):
+        return len(self._payloads)
+
+    def __iter__(self):
+        # Yields (Prefix, payload) from least to most specific
+        for index in range(len(self._payloads)):
+            yield self.entry(index)
+
+# The mutable table is a persistent path-compressed binary (Patricia) trie. Each node is an immutable
+# (network, length, zero child, one child, entry) tuple, only nodes where the tree branches or that hold a prefix exist,
+# and an update copies just the nodes on the path to the changed prefix (at most 33). Readers that already hold the old
+# root keep seeing the old table, so there is no locking on the lookup side.
+_NETWORK, _LENGTH, _ZERO, _ONE, _ENTRY = range(5)
+
+def _trie_lookup(node, ip: int):
+    best = None
+    while node is not None:
+        network, length, zero, one, entry = node
+        if (ip ^ network) >> (32 - length): # The address is outside this node's prefix
+            break
+        if entry is not None:
+            best = entry
+        if length == 32:
+            break
+        node = one if (ip >> (31 - length)) & 1 else zero
+    return best
+
+def _trie_insert(node, network: int, length: int, entry):
+    # Return a copy of this subtree with the entry set for network/length, and the entry it replaced
+    if node is None:
+        return (network, length, None, None, entry), None
+
+    node_network, node_length = node[_NETWORK], node[_LENGTH]
+    common = min(length, node_length, 32 - (network ^ node_network).bit_length())
+
+    if common == node_length == length: # The same prefix, replace the entry
+        return (network, length, node[_ZERO], node[_ONE], entry), node[_ENTRY]
+
+    if common == node_length: # The new prefix is below this node
+        if (network >> (31 - node_length)) & 1:
+            child, previous = _trie_insert(node[_ONE], network, length, entry)
+            return (node_network, node_length, node[_ZERO], child, node[_ENTRY]), previous
+        child, previous = _trie_insert(node[_ZERO], network, length, entry)
+        return (node_network, node_length, child, node[_ONE], node[_ENTRY]), previous
+
+    if common == length: # The new prefix is above this node
+        if (node_network >> (31 - length)) & 1:
+            return (network, length, None, node, entry), None
+        return (network, length, node, None, entry), None
+
+    # The prefixes diverge below their common part, so add a branch node there
+    leaf = (network, length, None, None, entry)
+    branch = network & MASKS[common]
+    if (network >> (31 - common)) & 1:
+        return (branch, common, node, leaf, None), None
+    return (branch, common, leaf, node, None), None
+
+def _trie_join(network: int, length: int, zero, one, entry):
+    # Build a node, dropping it when it no longer holds an entry or branches
+    if entry is None:
+        if zero is None:
+            return one
+        if one is None:
+            return zero
+    return (network, length, zero, one, entry)
+
+def _trie_delete(node, network: int, length: int):
+    # Return a copy of this subtree without the entry for network/length, and the entry that was removed
+    if node is None or node[_LENGTH] > length or (network ^ node[_NETWORK]) >> (32 - node[_LENGTH]):
+        return node, None
+
+    node_length = node[_LENGTH]
+    if node_length == length:
+        if node[_ENTRY] is None:
+            return node, None
+        return _trie_join(network, length, node[_ZERO], node[_ONE], None), node[_ENTRY]
+
+    if (network >> (31 - node_length)) & 1:
+        child, previous = _trie_delete(node[_ONE], network, length)
+        zero, one = node[_ZERO], child
+    else:
+        child, previous = _trie_delete(node[_ZERO], network, length)
+        zero, one = child, node[_ONE]
+    if previous is None:
+        return node, None
+    return _trie_join(node[_NETWORK], node_length, zero, one, node[_ENTRY]), previous
+
+def _trie_entries(node):
+    # Yield every (Prefix, payload) entry, in address order
+    if node is None:
+        return
+    if node[_ENTRY] is not None:
+        yield node[_ENTRY]
+    yield from _trie_entries(node[_ZERO])
+    yield from _trie_entries(node[_ONE])
+
+class PrefixSnapshot:
+    """
+    A read-only, consistent view of a MutablePrefixTable at one point in time. Later changes to the table are not visible.
+
+    :param root: The root node of the trie
+    :param size: The number of prefixes in the table
+    :param version: The table version, incremented by every published change
+    """
+
+    __slots__ = ('_root', 'size', 'version')
+
+    def __init__(self, root, size: int, version: int):
+        self._root = root
+        self.size = size
+        self.version = version
+
+    def lookup(self, ip: int | str):
+        """
+        Find the most specific prefix containing an address
+
+        :param ip: The address in dot decimal format, or as a 32-bit int
+        :type ip: int | str
+        :returns: Returns a tuple of (Prefix, payload), or None if no prefix contains the address
+        """
+
+        return _trie_lookup(self._root, as_address(ip))
+
+    def lookup_many(self, ips):
+        """
+        Find the most specific prefix for each of a list of addresses, all against this snapshot
+
+        :param ips: The addresses in dot decimal format, or as 32-bit ints
+        :type ips: Iterable[int | str]
+        :returns: Returns a list with a (Prefix, payload) tuple or None for each address
+        """
+
+        root = self._root
+        return [_trie_lookup(root, as_address(ip)) for ip in ips]
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        return _trie_entries(self._root)
+
+class MutablePrefixTable:
+    """
+    A longest prefix match table that can be changed one prefix at a time without a rebuild. Inserts, updates and
+    deletes each cost at most 33 node copies. Changes are serialised with a lock, while lookups never block: each lookup
+    runs against the snapshot that was current when it started, and apply() publishes a whole batch of changes at once.
+
+    :param prefixes: The initial prefixes in CIDR notation or as Prefix objects, optionally as (prefix, payload) pairs
+    :type prefixes: Iterable[str | Prefix | tuple]
+    """
+
+    __slots__ = ('_snapshot', '_lock')
+
+    def __init__(self, prefixes=()):
+        self._snapshot = PrefixSnapshot(None, 0, 0)
+        self._lock = Lock()
+        self.apply(('insert', *item) if isinstance(item, tuple) else ('insert', item) for item in prefixes)
+
+    def snapshot(self):
+        """
+        :returns: The current PrefixSnapshot, for running several lookups against the same version of the table
+        """
+
+        return self._snapshot
+
+    def lookup(self, ip: int | str):
+        """
+        Find the most specific prefix containing an address, see PrefixSnapshot.lookup
+        """
+
+        return self._snapshot.lookup(ip)
+
+    def lookup_many(self, ips):
+        """
+        Find the most specific prefix for each of a list of addresses, see PrefixSnapshot.lookup_many
+        """
+
+        return self._snapshot.lookup_many(ips)
+
+    def insert(self, prefix, payload=None):
+        """
+        Add a prefix, or replace the payload of an existing one
+
+        :param prefix: The prefix in CIDR notation or as a Prefix object. Host bits are ignored.
+        :param payload: The payload returned by lookups that match this prefix
+        """
+
+        self.apply([('insert', prefix, payload)])
+
+    def delete(self, prefix):
+        """
+        Remove a prefix. Raises KeyError if the prefix is not in the table.
+
+        :param prefix: The prefix in CIDR notation or as a Prefix object. Host bits are ignored.
+        """
+
+        self.apply([('delete', prefix)])
+
+    def apply(self, changes):
+        """
+        Apply a batch of changes. Lookups see either none or all of the batch; if any change fails (eg deleting a prefix
+        that is not in the table) none of the batch is applied.
+
+        :param changes: ('insert', prefix, payload), ('insert', prefix) or ('delete', prefix) tuples
+        :type changes: Iterable[tuple]
+        :returns: The new table version
+        """
+
+        with self._lock:
+            current = self._snapshot
+            root, size = current._root, current.size
+
+            for change in changes:
+                action, prefix = change[0], as_prefix(change[1])
+                network, length = prefix.network, prefix.length
+                match action:
+                    case 'insert':
+                        payload = change[2] if len(change) > 2 else None
+                        root, previous = _trie_insert(root, network, length, (Prefix(network, length), payload))
+                        if previous is None:
+                            size += 1
+                    case 'delete':
+                        root, previous = _trie_delete(root, network, length)
+                        if previous is None:
+                            raise KeyError(str(Prefix(network, length)))
+                        size -= 1
+                    case _:
+                        raise ValueError(f'Unknown change: {action}')
+
+            # Publishing the new snapshot is a single attribute assignment, so readers see the whole batch or none of it
+            self._snapshot = PrefixSnapshot(root, size, current.version + 1)
+            return current.version + 1
+
+    def __len__(self):
+        return self._snapshot.size
+
+    def __iter__(self):
+        return iter(self._snapshot)
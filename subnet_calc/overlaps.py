@@ -0,0 +1,50 @@
+from array import array
+from collections import namedtuple
+from .aggregate import sorted_order
+from .prefix import Prefix, normalise_entry
+from .tables import WILDCARDS
+
+# A pair of overlapping prefixes. Two prefixes can only overlap by one containing the other, so outer is the shorter
+# (or identical, for a duplicate) prefix and inner the one inside it. The labels are the positions in the input, or the
+# labels provided with the prefixes, eg line numbers.
+Overlap = namedtuple('Overlap', ['outer', 'outer_label', 'inner', 'inner_label', 'kind'])
+
+def find_overlaps(prefixes):
+    """
+    Find every pair of prefixes that overlap, ie duplicates and prefixes nested inside another prefix. The prefixes are
+    sorted by network ID once and then swept in a single pass with a stack of the prefixes that are still open, so this
+    is O(n log n + k) for k overlapping pairs rather than comparing every pair.
+
+    :param prefixes: The prefixes in CIDR notation or as Prefix objects, optionally as (prefix, label) pairs. Without a
+                     label, each prefix is labelled with its position in the input, counting from 1. Host bits are
+                     ignored, so the prefixes are reported by their network ID.
+    :type prefixes: Iterable[str | Prefix | tuple]
+    :returns: A generator yielding an Overlap (outer, outer_label, inner, inner_label, kind) for each pair, in address
+              order. kind is 'duplicate' for the same network and prefix length, otherwise 'nested'.
+    """
+
+    networks, lengths, labels = array('I'), array('B'), []
+    for position, item in enumerate(prefixes, 1):
+        network, length, label = normalise_entry(item)
+        networks.append(network)
+        lengths.append(length)
+        labels.append(position if label is None else label)
+
+    # Sort by network ID, then from least to most specific, so every prefix comes after the prefixes that contain it
+    keys = array('Q', ((network << 6) | length for network, length in zip(networks, lengths)))
+    return _sweep(sorted_order(keys), networks, lengths, labels)
+
+def _sweep(order, networks: array, lengths: array, labels: list):
+    # The stack holds the open prefixes, each nested in the one below it. Once a prefix ends before the next network ID
+    # it cannot contain anything else, so it is dropped; everything left on the stack contains the next prefix.
+    stack = []
+    for index in order:
+        network, length = networks[index], lengths[index]
+        while stack and stack[-1][1] < network:
+            stack.pop()
+
+        inner = Prefix(network, length)
+        for outer, _, outer_length in stack:
+            kind = 'duplicate' if outer_length == length else 'nested'
+            yield Overlap(Prefix(networks[outer], outer_length), labels[outer], inner, labels[index], kind)
+        stack.append((index, network | WILDCARDS[length], length))
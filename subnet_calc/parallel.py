@@ -0,0 +1,110 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from functools import partial
+from itertools import islice
+from . import bulk
+from . import cache
+
+# Number of addresses handed to a worker at a time. Large enough that the pickling overhead per chunk is small.
+DEFAULT_CHUNK_SIZE = 10000
+
+def chunked(items, size: int):
+    """
+    Lazily split an iterable into lists of at most size items
+
+    :param items: The items to split
+    :param size: The maximum number of items per chunk
+    :type items: Iterable
+    :type size: int
+    :returns: A generator yielding each chunk as a list
+    """
+
+    if size < 1:
+        raise ValueError('Chunk size must be at least 1')
+
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+def map_chunks(func, chunks, jobs: int | None = None, ordered: bool = True, max_in_flight: int | None = None,
+               initializer=None, initargs=()):
+    """
+    Run func over each chunk in a process pool, keeping at most max_in_flight chunks submitted at a time so memory use
+    stays flat no matter how many chunks there are.
+
+    :param func: A picklable function taking a single chunk
+    :param chunks: The chunks to process
+    :param jobs: The number of worker processes, defaults to the number of CPUs. With 1 job everything runs in this process.
+    :param ordered: Yield the results in the same order as the chunks, otherwise yield them as they complete
+    :param max_in_flight: The maximum number of chunks submitted to the pool at once, defaults to twice the number of workers
+    :param initializer: Called once in each worker before any chunks are processed
+    :param initargs: The arguments for initializer
+    :returns: A generator yielding func(chunk) for every chunk
+    """
+
+    jobs = jobs or os.cpu_count() or 1
+
+    if jobs == 1: # No point paying for a pool with a single worker
+        if initializer is not None:
+            initializer(*initargs)
+        for chunk in chunks:
+            yield func(chunk)
+        return
+
+    max_in_flight = max_in_flight or 2 * jobs
+    chunks = iter(chunks)
+    pool = ProcessPoolExecutor(max_workers=jobs, initializer=initializer, initargs=initargs)
+
+    try:
+        if ordered:
+            pending = deque(pool.submit(func, chunk) for chunk in islice(chunks, max_in_flight))
+            while pending:
+                result = pending.popleft().result()
+                for chunk in islice(chunks, 1): # Refill before yielding, so the workers stay busy
+                    pending.append(pool.submit(func, chunk))
+                yield result
+        else:
+            pending = {pool.submit(func, chunk) for chunk in islice(chunks, max_in_flight)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for chunk in islice(chunks, len(done)):
+                    pending.add(pool.submit(func, chunk))
+                for future in done:
+                    yield future.result()
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+def _calc_chunk(addresses: list[str], fields=bulk.DEFAULT_FIELDS):
+    return list(bulk.calc_records(addresses, fields))
+
+def calc_subnets_parallel(addresses, jobs: int | None = None, chunk_size: int = DEFAULT_CHUNK_SIZE, ordered: bool = True,
+                          max_in_flight: int | None = None, fields=bulk.DEFAULT_FIELDS, cache_size: int | None = None):
+    """
+    Perform the subnet calculations on a stream of addresses using a pool of worker processes
+
+    :param addresses: The addresses to calculate in CIDR notation
+    :param jobs: The number of worker processes, defaults to the number of CPUs
+    :param chunk_size: The number of addresses sent to a worker at a time
+    :param ordered: Yield the records in input order, otherwise in whatever order the chunks complete
+    :param max_in_flight: The maximum number of chunks being processed at once
+    :param fields: The names of the fields to calculate, see wrapper.calc_subnet
+    :param cache_size: If given, enable the calculation cache with this size in each worker, see cache.enable_cache.
+                       With a single job the cache is only enabled while the generator runs.
+    :type addresses: Iterable[str]
+    :returns: A generator yielding one record per address, see bulk.calc_record
+    """
+
+    func = partial(_calc_chunk, fields=tuple(fields))
+    chunks = chunked(addresses, chunk_size)
+    if cache_size is None:
+        for records in map_chunks(func, chunks, jobs, ordered, max_in_flight):
+            yield from records
+    elif (jobs or os.cpu_count() or 1) == 1: # In this process, so leave the caller's cache as it was afterwards
+        with cache.cache_enabled_for(cache_size):
+            for records in map_chunks(func, chunks, 1, ordered, max_in_flight):
+                yield from records
+    else:
+        for records in map_chunks(func, chunks, jobs, ordered, max_in_flight, initializer=cache.enable_cache,
+                                  initargs=(cache_size,)):
+            yield from records
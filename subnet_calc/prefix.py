@@ -0,0 +1,160 @@
+from . import validation
+from .tables import MASKS, WILDCARDS, OCTET_STRINGS
+
+def ip_to_int(address: str):
+    """
+    Convert an address in dot decimal format to its 32-bit integer value
+
+    :param address: The address to convert in dot decimal format
+    :type address: str
+    :returns: Returns an int in the range 0 - 2**32-1
+    """
+
+    value, reason = validation.parse_address(address)
+    if reason is not None:
+        raise ValueError(f'Invalid address: {address}')
+    return value
+
+def int_to_ip(value: int):
+    """
+    Convert a 32-bit integer to an address in dot decimal format
+
+    :param value: The integer value of the address
+    :type value: int
+    :returns: Returns a string containing the address in dot decimal format
+    """
+
+    return f'{OCTET_STRINGS[value >> 24]}.{OCTET_STRINGS[(value >> 16) & 0xFF]}.{OCTET_STRINGS[(value >> 8) & 0xFF]}.{OCTET_STRINGS[value & 0xFF]}'
+
+# Prefixes are built for every CIDR string parsed, so the slots are set through a module global rather than looking up
+# object.__setattr__ each time
+_set_slot = object.__setattr__
+
+class Prefix:
+    """
+    A parsed, immutable IPv4 prefix. The address and prefix length are stored as plain ints, so once a CIDR string has been
+    validated and parsed all further calculations are simple bit operations.
+
+    :param address: The 32-bit integer value of the address portion. Host bits are kept as provided.
+    :param length: The prefix length in the range 0-32
+    :type address: int
+    :type length: int
+    """
+
+    __slots__ = ('address', 'length')
+
+    def __init__(self, address: int, length: int):
+        _set_slot(self, 'address', address)
+        _set_slot(self, 'length', length)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Prefix is immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError('Prefix is immutable')
+
+    def __reduce__(self): # Rebuilt through __init__, see SubnetResult.__reduce__
+        return Prefix, (self.address, self.length)
+
+    @classmethod
+    def parse(cls, address: str):
+        """
+        Validate and parse an address in CIDR notation. This is the only place a CIDR string needs to be validated.
+        The prefix length can also be given as a netmask, eg 192.168.1.0/255.255.255.0
+
+        :param address: The IP Address in CIDR notation
+        :type address: str
+        :returns: Returns a Prefix for the provided address
+        """
+
+        value, length, reason = validation.parse_cidr(address)
+        if reason is None:
+            return cls(value, length)
+
+        ip, _, mask = address.partition('/')
+        if '.' in mask: # Netmask notation, look up the prefix length
+            length = validation.mask_length(mask)
+            value, reason = validation.parse_address(ip)
+            if length is not None and reason is None:
+                return cls(value, length)
+
+        raise ValueError(f'Invalid CIDR Address: {address}')
+
+    @property
+    def netmask(self):
+        """The netmask as a 32-bit int"""
+        return MASKS[self.length]
+
+    @property
+    def wildcard(self):
+        """The wildcard (inverse netmask) as a 32-bit int"""
+        return WILDCARDS[self.length]
+
+    @property
+    def network(self):
+        """The network ID as a 32-bit int"""
+        return self.address & self.netmask
+
+    @property
+    def broadcast(self):
+        """The broadcast address as a 32-bit int"""
+        return self.address | self.wildcard
+
+    def __str__(self):
+        return f'{int_to_ip(self.address)}/{self.length}'
+
+    def __repr__(self):
+        return f"Prefix('{self}')"
+
+    def __eq__(self, other):
+        if not isinstance(other, Prefix):
+            return NotImplemented
+        return self.address == other.address and self.length == other.length
+
+    def __hash__(self):
+        return hash((self.address, self.length))
+
+def as_address(address):
+    """
+    Return the provided address as a 32-bit int, parsing it if it is still a string
+
+    :param address: The address in dot decimal format, or as an int
+    :type address: str | int
+    :returns: Returns an int in the range 0 - 2**32-1. Raises ValueError if the address is invalid or out of range.
+    """
+
+    if isinstance(address, str):
+        return ip_to_int(address)
+    if not 0 <= address <= 0xFFFFFFFF:
+        raise ValueError(f'Invalid address: {address}')
+    return address
+
+def as_prefix(address):
+    """
+    Return the provided address as a Prefix, parsing it if it is still a CIDR string.
+
+    :param address: The address in CIDR notation, or an already parsed Prefix
+    :type address: str | Prefix
+    :returns: Returns a Prefix
+    """
+
+    if isinstance(address, Prefix):
+        return address
+    return Prefix.parse(address)
+
+def normalise_entry(item):
+    """
+    Split an entry for a prefix table or inventory into its network, prefix length and payload. Entries are either a
+    prefix on its own, or a (prefix, payload) pair.
+
+    :param item: The prefix in CIDR notation or as a Prefix, optionally as a (prefix, payload) pair
+    :type item: str | Prefix | tuple
+    :returns: Returns a tuple of (network ID as a 32-bit int, prefix length, payload or None)
+    """
+
+    if isinstance(item, tuple):
+        prefix, payload = item
+    else:
+        prefix, payload = item, None
+    prefix = as_prefix(prefix)
+    return prefix.network, prefix.length, payload
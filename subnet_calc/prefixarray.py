@@ -0,0 +1,192 @@
+from array import array
+from . import validation
+from .prefix import Prefix, as_prefix
+from .tables import MASKS, WILDCARDS, HOST_COUNTS
+
+try:
+    import numpy as np
+except ImportError: # numpy is optional, without it the calculations run as plain loops over the arrays
+    np = None
+
+# The columns calc_subnets can return, in the same order as batch.calc_subnets
+COLUMNS = ('network_id', 'netmask', 'broadcast', 'wildcard', 'first', 'last', 'total', 'has_hosts')
+# Every column is a 32-bit address except total, which is signed since helpers.ipv4_host_count gives -1 for a /32, and
+# has_hosts, which is 1 or 0
+_TYPECODES = dict.fromkeys(COLUMNS, 'I') | {'total': 'q', 'has_hosts': 'B'}
+if np is not None:
+    _DTYPES = dict.fromkeys(COLUMNS, np.uint32) | {'total': np.int64, 'has_hosts': np.uint8}
+
+class PrefixArray:
+    """
+    A compact list of prefixes, stored as an array('I') of addresses and an array('B') of prefix lengths: 5 bytes per
+    prefix, against a few hundred for a list of CIDR strings or results. Items are read back as Prefix objects, which
+    are only created when they are accessed.
+
+    :param prefixes: The prefixes in CIDR notation or as Prefix objects
+    :type prefixes: Iterable[str | Prefix]
+    """
+
+    __slots__ = ('_addresses', '_lengths')
+
+    def __init__(self, prefixes=()):
+        self._addresses = array('I')
+        self._lengths = array('B')
+        self.extend(prefixes)
+
+    @classmethod
+    def from_arrays(cls, addresses, lengths):
+        """
+        Build a PrefixArray from existing columns, eg the output of batch.parse_cidrs
+
+        :param addresses: The 32-bit addresses
+        :param lengths: The prefix lengths, one per address
+        :type addresses: Iterable[int]
+        :type lengths: Iterable[int]
+        :returns: Returns a new PrefixArray
+        """
+
+        result = cls()
+        result._addresses = array('I', addresses)
+        result._lengths = array('B', lengths)
+        if len(result._addresses) != len(result._lengths):
+            raise ValueError('addresses and lengths must be the same length')
+        if result._lengths and max(result._lengths) > 32:
+            raise ValueError('Prefix lengths must be in the range 0-32')
+        return result
+
+    def append(self, prefix):
+        """
+        Add a prefix to the end of the array
+
+        :param prefix: The prefix in CIDR notation or as a Prefix object
+        :type prefix: str | Prefix
+        """
+
+        prefix = as_prefix(prefix)
+        self._addresses.append(prefix.address)
+        self._lengths.append(prefix.length)
+
+    def extend(self, prefixes):
+        """
+        Add several prefixes to the end of the array
+
+        :param prefixes: The prefixes in CIDR notation or as Prefix objects
+        :type prefixes: Iterable[str | Prefix]
+        """
+
+        if isinstance(prefixes, PrefixArray):
+            self._addresses.extend(prefixes._addresses)
+            self._lengths.extend(prefixes._lengths)
+            return
+
+        addresses, lengths = self._addresses, self._lengths
+        parse_cidr = validation.parse_cidr
+        for prefix in prefixes:
+            if prefix.__class__ is str: # Parse strings straight into the arrays, without a Prefix in between
+                address, length, reason = parse_cidr(prefix)
+                if reason is not None:
+                    prefix = Prefix.parse(prefix) # Netmask notation, or raises the usual ValueError
+                    address, length = prefix.address, prefix.length
+            else:
+                prefix = as_prefix(prefix)
+                address, length = prefix.address, prefix.length
+            addresses.append(address)
+            lengths.append(length)
+
+    def sort(self, reverse: bool = False):
+        """
+        Sort the prefixes in place by address, then by prefix length (least specific first)
+
+        :param reverse: Sort in descending order instead
+        :type reverse: bool
+        """
+
+        # Sort single ints rather than tuples, a prefix length always fits in the 6 low bits
+        keys = sorted([(address << 6) | length for address, length in zip(self._addresses, self._lengths)], reverse=reverse)
+        self._addresses = array('I', [key >> 6 for key in keys])
+        self._lengths = array('B', [key & 0x3F for key in keys])
+
+    @property
+    def addresses(self):
+        """The addresses as a read-only memoryview of 32-bit ints, eg for numpy.frombuffer"""
+        return memoryview(self._addresses).toreadonly()
+
+    @property
+    def lengths(self):
+        """The prefix lengths as a read-only memoryview of 8-bit ints"""
+        return memoryview(self._lengths).toreadonly()
+
+    @property
+    def nbytes(self):
+        """The number of bytes used to store the prefixes"""
+        return len(self._addresses) * self._addresses.itemsize + len(self._lengths) * self._lengths.itemsize
+
+    def calc_subnets(self, columns=COLUMNS):
+        """
+        Perform the subnet calculations for every prefix in the array at once. This gives the same results as the scalar
+        calculate/helpers functions (and batch.calc_subnets), as columns of ints. Uses numpy when it is installed.
+
+        :param columns: The columns to calculate, from network_id, netmask, broadcast, wildcard, first, last, total and
+                        has_hosts
+        :type columns: Iterable[str]
+        :returns: A dictionary of array('I') columns, with total as an array('q') and has_hosts as an array('B'). has_hosts
+                  is 0 where calculate.ipv4_edge is undefined (/0, /31 and /32), and first and last are 0 there as a
+                  placeholder.
+        """
+
+        columns = tuple(columns)
+        for column in columns:
+            if column not in COLUMNS:
+                raise ValueError(f'Unknown column: {column}')
+
+        if np is not None:
+            from .batch import calc_subnets
+            results = calc_subnets(np.frombuffer(self._addresses, dtype=np.uint32), np.frombuffer(self._lengths, dtype=np.uint8))
+            return {column: array(_TYPECODES[column], results[column].astype(_DTYPES[column]).tobytes()) for column in columns}
+
+        return {column: array(_TYPECODES[column], self._column(column)) for column in columns}
+
+    def _column(self, column: str):
+        addresses, lengths = self._addresses, self._lengths
+        match column:
+            case 'network_id':
+                return (address & MASKS[length] for address, length in zip(addresses, lengths))
+            case 'netmask':
+                return (MASKS[length] for length in lengths)
+            case 'broadcast':
+                return (address | WILDCARDS[length] for address, length in zip(addresses, lengths))
+            case 'wildcard':
+                return (WILDCARDS[length] for length in lengths)
+            case 'first':
+                return ((address & MASKS[length]) + 1 if 0 < length < 31 else 0 for address, length in zip(addresses, lengths))
+            case 'last':
+                return ((address | WILDCARDS[length]) - 1 if 0 < length < 31 else 0 for address, length in zip(addresses, lengths))
+            case 'total':
+                return (HOST_COUNTS[length] for length in lengths)
+            case 'has_hosts':
+                return (1 if 0 < length < 31 else 0 for length in lengths)
+
+    def __len__(self):
+        return len(self._addresses)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            result = PrefixArray()
+            result._addresses = self._addresses[index]
+            result._lengths = self._lengths[index]
+            return result
+        return Prefix(self._addresses[index], self._lengths[index])
+
+    def __iter__(self):
+        for address, length in zip(self._addresses, self._lengths):
+            yield Prefix(address, length)
+
+    def __eq__(self, other):
+        if not isinstance(other, PrefixArray):
+            return NotImplemented
+        return self._addresses == other._addresses and self._lengths == other._lengths
+
+    def __repr__(self):
+        if len(self) > 4:
+            return f"PrefixArray(['{self[0]}', '{self[1]}', ..., '{self[-1]}'], {len(self)} prefixes)"
+        return f'PrefixArray({[str(prefix) for prefix in self]})'
@@ -0,0 +1,205 @@
+import mmap
+import struct
+import sys
+from array import array
+from bisect import bisect_right
+from .prefix import Prefix, ip_to_int, normalise_entry
+
+# The file is a header followed by five sections, all little-endian and 4-byte aligned, so they can be used in place
+# through memoryviews of the mapped file:
+#
+#   header      magic, format version, prefix count
+#   networks    uint32[count]     sorted by network, then from least to most specific
+#   broadcasts  uint32[count]
+#   parents     uint32[count]     index of the next less specific prefix containing this one, or _NO_PARENT
+#   offsets     uint32[count + 1] payload n is blob[offsets[n]:offsets[n + 1]]
+#   blob        the UTF-8 payloads
+MAGIC = b'IPV4PFX\0'
+FORMAT_VERSION = 1
+_HEADER = struct.Struct('<8sII')
+_NO_PARENT = 0xFFFFFFFF
+
+def save_prefixes(path: str, prefixes):
+    """
+    Write a prefix database file, to be opened with PrefixDatabase. If the same network is listed more than once the
+    last payload wins.
+
+    :param path: The file to write
+    :param prefixes: The prefixes in CIDR notation or as Prefix objects, optionally as (prefix, payload) pairs. Payloads
+                     are stored as text, so they must be strings (or None).
+    :type path: str
+    :type prefixes: Iterable[str | Prefix | tuple]
+    :returns: The number of prefixes written
+    """
+
+    unique = {}
+    for item in prefixes:
+        network, length, payload = normalise_entry(item)
+        if payload is not None and not isinstance(payload, str):
+            raise TypeError(f'Payloads must be strings, not {type(payload).__name__}')
+        unique[(network, length)] = payload
+
+    # Sorting by network then length puts every prefix after the prefixes that contain it, so the parents can be found
+    # with a stack of the prefixes that are still open
+    ordered = sorted(unique)
+    networks, broadcasts, parents = array('I'), array('I'), array('I')
+    offsets, blob = array('I', [0]), bytearray()
+    stack = []
+    for index, (network, length) in enumerate(ordered):
+        broadcast = network | (0xFFFFFFFF >> length)
+        while stack and broadcasts[stack[-1]] < network:
+            stack.pop()
+        networks.append(network)
+        broadcasts.append(broadcast)
+        parents.append(stack[-1] if stack else _NO_PARENT)
+        stack.append(index)
+
+        payload = unique[(network, length)]
+        if payload:
+            blob += payload.encode('utf-8')
+        offsets.append(len(blob))
+
+    if sys.byteorder == 'big':
+        for section in (networks, broadcasts, parents, offsets):
+            section.byteswap()
+
+    with open(path, 'wb') as file:
+        file.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(ordered)))
+        for section in (networks, broadcasts, parents, offsets):
+            file.write(section.tobytes())
+        file.write(blob)
+    return len(ordered)
+
+class PrefixDatabase:
+    """
+    A read-only prefix database file written by save_prefixes. The file is mapped into memory rather than read, so
+    opening it takes the same time whatever its size, nothing is parsed or validated, and every process that opens the
+    same file shares the same pages.
+
+    Payloads come back as strings, with None for prefixes saved without a payload (or with an empty one).
+
+    :param path: The database file
+    :type path: str
+    """
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            if len(self._map) < _HEADER.size:
+                raise ValueError(f'Not a prefix database: {path}')
+            magic, version, count = _HEADER.unpack_from(self._map)
+            if magic != MAGIC:
+                raise ValueError(f'Not a prefix database: {path}')
+            if version != FORMAT_VERSION:
+                raise ValueError(f'Unsupported prefix database version: {version}')
+            blob_start = _HEADER.size + 4 * (4 * count + 1)
+            if len(self._map) < blob_start:
+                raise ValueError(f'Truncated prefix database: {path}')
+
+            view = memoryview(self._map)
+            self._view = view
+            self._networks = self._section(view, _HEADER.size, count)
+            self._broadcasts = self._section(view, _HEADER.size + 4 * count, count)
+            self._parents = self._section(view, _HEADER.size + 8 * count, count)
+            self._offsets = self._section(view, _HEADER.size + 12 * count, count + 1)
+            self._blob = view[blob_start:]
+            if self._offsets[count] > len(self._blob):
+                raise ValueError(f'Truncated prefix database: {path}')
+        except Exception:
+            self.close()
+            raise
+
+    @staticmethod
+    def _section(view: memoryview, start: int, length: int):
+        section = view[start:start + 4 * length]
+        if sys.byteorder == 'big': # The file is little-endian, so big-endian hosts pay for a copy
+            section = array('I', section)
+            section.byteswap()
+            return section
+        return section.cast('I')
+
+    def close(self):
+        """Release the mapping. The database cannot be used after this."""
+
+        # The memoryviews have to be released before the map can be closed
+        for name in ('_networks', '_broadcasts', '_parents', '_offsets', '_blob', '_view'):
+            section = self.__dict__.pop(name, None)
+            if isinstance(section, memoryview):
+                section.release()
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _find(self, ip: int):
+        # The last prefix starting at or before the address is either the most specific prefix containing it, or one
+        # nested inside every prefix that does, so walk up its parents until one contains the address
+        index = bisect_right(self._networks, ip) - 1
+        if index < 0:
+            return _NO_PARENT
+        broadcasts, parents = self._broadcasts, self._parents
+        while index != _NO_PARENT and broadcasts[index] < ip:
+            index = parents[index]
+        return index
+
+    def _entry(self, index: int):
+        network = self._networks[index]
+        prefix = Prefix(network, 32 - (self._broadcasts[index] - network).bit_length())
+        start, end = self._offsets[index], self._offsets[index + 1]
+        return prefix, str(self._blob[start:end], 'utf-8') if end > start else None
+
+    def lookup(self, ip: int | str):
+        """
+        Find the most specific prefix containing an address
+
+        :param ip: The address in dot decimal format, or as a 32-bit int
+        :type ip: int | str
+        :returns: Returns a tuple of (Prefix, payload), or None if no prefix contains the address
+        """
+
+        if isinstance(ip, str):
+            ip = ip_to_int(ip)
+        index = self._find(ip)
+        return None if index == _NO_PARENT else self._entry(index)
+
+    def lookup_many(self, ips):
+        """
+        Find the most specific prefix for each of a list of addresses
+
+        :param ips: The addresses in dot decimal format, or as 32-bit ints
+        :type ips: Iterable[int | str]
+        :returns: Returns a list with a (Prefix, payload) tuple or None for each address
+        """
+
+        return [self.lookup(ip) for ip in ips]
+
+    def containing(self, ip: int | str):
+        """
+        Find every prefix containing an address
+
+        :param ip: The address in dot decimal format, or as a 32-bit int
+        :type ip: int | str
+        :returns: Returns a list of (Prefix, payload) tuples, from most to least specific
+        """
+
+        if isinstance(ip, str):
+            ip = ip_to_int(ip)
+        index = self._find(ip)
+        results = []
+        while index != _NO_PARENT:
+            results.append(self._entry(index))
+            index = self._parents[index]
+        return results
+
+    def __len__(self):
+        return len(self._networks)
+
+    def __iter__(self):
+        # Yields (Prefix, payload) in address order, each prefix before the prefixes nested in it
+        for index in range(len(self._networks)):
+            yield self._entry(index)
@@ -0,0 +1,102 @@
+import re
+from .prefix import Prefix, as_address, as_prefix, int_to_ip, ip_to_int
+
+# A range on one line of a bulk input: two addresses separated by a dash, a comma or whitespace
+_RANGE_SEPARATOR = re.compile(r'\s*[-,]\s*|\s+')
+
+def range_prefixes(start: int, end: int):
+    """
+    Split an address range into the fewest prefixes, as plain ints. This is range_to_cidrs without the parsing and
+    without building Prefix objects, for code that works with ints throughout.
+
+    :param start: The first address of the range as a 32-bit int
+    :param end: The last address of the range (inclusive)
+    :type start: int
+    :type end: int
+    :returns: A generator yielding a (network, prefix length) tuple for each prefix, in address order
+    """
+
+    # At each step take the largest block that is aligned at start (the lowest set bit of start) and does not run past
+    # end (the highest set bit of the count left)
+    while start <= end:
+        bits = (end - start + 1).bit_length() - 1
+        if start:
+            bits = min(bits, (start & -start).bit_length() - 1)
+        yield start, 32 - bits
+        start += 1 << bits
+
+def range_to_cidrs(start, end):
+    """
+    Convert an address range to the fewest prefixes that cover exactly the same addresses
+
+    :param start: The first address of the range in dot decimal format, or as a 32-bit int
+    :param end: The last address of the range (inclusive)
+    :type start: str | int
+    :type end: str | int
+    :returns: Returns a list of Prefix objects in address order
+    """
+
+    start, end = as_address(start), as_address(end)
+    if start > end:
+        raise ValueError(f'The range starts after it ends: {int_to_ip(start)} - {int_to_ip(end)}')
+    return [Prefix(network, length) for network, length in range_prefixes(start, end)]
+
+def cidr_to_range(cidr):
+    """
+    Convert a prefix to the address range it covers, ie from its network ID to its broadcast address
+
+    :param cidr: The prefix in CIDR notation or as a Prefix object
+    :type cidr: str | Prefix
+    :returns: Returns a tuple of (first, last) addresses in dot decimal format
+    """
+
+    prefix = as_prefix(cidr)
+    return int_to_ip(prefix.network), int_to_ip(prefix.broadcast)
+
+def parse_range(line: str):
+    """
+    Parse an address range written as 'start-end', 'start,end' or 'start end'
+
+    :param line: The range to parse
+    :type line: str
+    :returns: Returns a tuple of (start, end) as 32-bit ints
+    """
+
+    parts = _RANGE_SEPARATOR.split(line.strip())
+    if len(parts) != 2:
+        raise ValueError(f'Invalid range: {line}')
+    start, end = ip_to_int(parts[0]), ip_to_int(parts[1])
+    if start > end:
+        raise ValueError(f'The range starts after it ends: {line}')
+    return start, end
+
+def convert_line(line: str):
+    """
+    Convert one line of a feed: a range (see parse_range) is converted to the fewest prefixes covering it, and a prefix
+    in CIDR notation is converted to its range
+
+    :param line: The range or prefix to convert
+    :type line: str
+    :returns: Returns a list of Prefix objects for a range, or a (first, last) tuple of addresses for a prefix
+    """
+
+    if '/' in line:
+        return cidr_to_range(line)
+    start, end = parse_range(line)
+    return [Prefix(network, length) for network, length in range_prefixes(start, end)]
+
+def convert_lines(lines):
+    """
+    Lazily convert a stream of ranges and prefixes, eg the lines of a vendor feed, see convert_line
+
+    :param lines: The ranges and prefixes to convert
+    :type lines: Iterable[str]
+    :returns: Yields a (line, result, error) tuple per line, where result is None and error is the reason if the line
+              is invalid
+    """
+
+    for line in lines:
+        try:
+            yield line, convert_line(line), None
+        except ValueError as e:
+            yield line, None, str(e)
@@ -0,0 +1,386 @@
+import asyncio
+import json
+import time
+from bisect import bisect_left
+from urllib.parse import urlsplit, parse_qs
+from .lookup import PrefixTable
+from .prefix import ip_to_int
+from .wrapper import calc_subnet, FIELD_NAMES
+
+# Upper bounds of the latency histogram buckets in milliseconds. Anything slower goes in a final overflow bucket.
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+# How many items of a batch request are calculated before giving other requests a turn on the event loop
+_YIELD_EVERY = 1000
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 411: 'Length Required',
+            413: 'Payload Too Large', 431: 'Request Header Fields Too Large', 500: 'Internal Server Error',
+            503: 'Service Unavailable'}
+
+class HTTPError(Exception):
+    """An error response, with its HTTP status code and message"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+class LatencyHistogram:
+    """
+    Counts request latencies in the fixed LATENCY_BUCKETS, so recording a request is O(log buckets) and the memory used
+    does not grow with the number of requests
+    """
+
+    __slots__ = ('counts', 'total', 'count')
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def record(self, seconds: float):
+        """
+        :param seconds: The latency of one request
+        :type seconds: float
+        """
+
+        milliseconds = seconds * 1000
+        self.counts[bisect_left(LATENCY_BUCKETS, milliseconds)] += 1
+        self.total += milliseconds
+        self.count += 1
+
+    def to_dict(self):
+        """
+        :returns: Returns a dictionary of the request count, the mean latency and the count in each bucket, keyed by
+                  the bucket's upper bound in milliseconds ('inf' for the overflow bucket)
+        """
+
+        labels = [str(bound) for bound in LATENCY_BUCKETS] + ['inf']
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total / self.count, 3) if self.count else None,
+            'buckets_ms': dict(zip(labels, self.counts)),
+        }
+
+def _calc(cidr: str, fields: tuple | None):
+    return calc_subnet(cidr, fields).to_dict()
+
+class _Coalescer:
+    # Collects the single calculations requested while the event loop is busy and runs them together the next time
+    # round, so a burst of concurrent requests costs one batch rather than one wake-up each. Identical requests in the
+    # same batch share one future, so they are only calculated once.
+
+    def __init__(self, max_batch: int, window: float):
+        self._max_batch = max_batch
+        self._window = window
+        self._pending = {}
+        self._handle = None
+        self.requests = 0
+        self.batches = 0
+
+    def submit(self, cidr: str, fields: tuple | None):
+        self.requests += 1
+        key = (cidr, fields)
+        future = self._pending.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._pending[key] = loop.create_future()
+            if len(self._pending) >= self._max_batch:
+                self._flush()
+            elif self._handle is None:
+                self._handle = loop.call_later(self._window, self._flush) if self._window else loop.call_soon(self._flush)
+        return future
+
+    def _flush(self):
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return
+
+        self.batches += 1
+        for (cidr, fields), future in pending.items():
+            if future.cancelled():
+                continue
+            try:
+                future.set_result(_calc(cidr, fields))
+            except Exception as e: # Fail this request alone, the rest of the batch still gets its results
+                future.set_exception(e)
+
+class SubnetServer:
+    """
+    A JSON over HTTP service for the subnet calculations and prefix lookups, built on asyncio with no dependencies
+    outside the standard library. Endpoints:
+
+    - GET /calc?cidr=CIDR[&fields=a,b] or POST /calc {"cidr": ..., "fields": [...]}: the calc_subnet result as a dictionary
+    - POST /batch {"cidrs": [...], "fields": [...]}: {"results": [...]}, one calc_subnet result per CIDR
+    - GET /lookup?ip=IP or POST /lookup {"ips": [...]}: the most specific prefix in the table containing each address
+    - GET /stats: the request latency histogram of each endpoint and the coalescing counters
+
+    Concurrent single calculations are coalesced into batches (see _Coalescer). Once max_pending requests are being
+    handled, further requests are turned away with 503 and a Retry-After header rather than queued without limit.
+
+    :param host: The address to listen on
+    :param port: The port to listen on, or 0 to pick a free port (see the port attribute after start())
+    :param table: The prefixes for /lookup as (prefix, label) pairs, see annotate.read_table
+    :param max_pending: The maximum number of requests being handled at once
+    :param max_batch: The maximum number of items in one batch or lookup request, and in one coalesced batch
+    :param max_body: The maximum request body size in bytes
+    :param batch_window: How long in seconds to wait for more single calculations before running a coalesced batch. With
+                         0 a batch holds whatever arrived while the event loop was busy.
+    :type host: str
+    :type port: int
+    :type table: Iterable[tuple] | None
+    :type max_pending: int
+    :type max_batch: int
+    :type max_body: int
+    :type batch_window: float
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8080, table=None, max_pending: int = 1000,
+                 max_batch: int = 10000, max_body: int = 1 << 20, batch_window: float = 0.0):
+        self.host = host
+        self.port = port
+        self.max_pending = max_pending
+        self.max_batch = max_batch
+        self.max_body = max_body
+        self._table = None if table is None else PrefixTable(table)
+        self._coalescer = _Coalescer(max_batch, batch_window)
+        self._histograms = {}
+        self._in_flight = 0
+        self._server = None
+        self._routes = {
+            '/calc': {'GET': self._calc_get, 'POST': self._calc_post},
+            '/batch': {'POST': self._batch},
+            '/lookup': {'GET': self._lookup_get, 'POST': self._lookup_post},
+            '/stats': {'GET': self._stats},
+        }
+
+    async def start(self):
+        """Start listening. When port was 0, the port that was picked is then in the port attribute."""
+        self._server = await asyncio.start_server(self._connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        """Start listening if needed, and handle requests until the server is closed or the task is cancelled"""
+        if self._server is None:
+            await self.start()
+        await self._server.serve_forever()
+
+    async def close(self):
+        """Stop listening and wait for the server to close"""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def _connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        # One request at a time per connection (HTTP/1.1 keep-alive, no pipelining). A client that sends faster than
+        # it reads its responses is held back by drain(), since nothing more is read from it until the response is out.
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except asyncio.IncompleteReadError: # The client closed the connection
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._respond(writer, 431, {'error': 'The request headers are too large'}, False)
+                    break
+
+                start = time.perf_counter()
+                lines = head.decode('latin-1').split('\r\n')
+                try:
+                    method, target, version = lines[0].split(' ')
+                except ValueError:
+                    await self._respond(writer, 400, {'error': 'Malformed request line'}, False)
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection == 'keep-alive' or (version == 'HTTP/1.1' and connection != 'close')
+
+                try:
+                    length = self._content_length(headers)
+                except HTTPError as e: # The body was not read, so the connection cannot be reused
+                    status, payload = e.status, {'error': str(e)}
+                    keep_alive = False
+                else:
+                    status, payload = await self._handle(method, target, length, reader)
+                await self._respond(writer, status, payload, keep_alive)
+
+                path = urlsplit(target).path
+                if path in self._routes:
+                    self._histograms.setdefault(path, LatencyHistogram()).record(time.perf_counter() - start)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    def _content_length(self, headers: dict):
+        # Anything wrong with the framing leaves the body unread, see _connection
+        if 'transfer-encoding' in headers:
+            raise HTTPError(411, 'Chunked request bodies are not supported, send a Content-Length')
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            raise HTTPError(400, 'Invalid Content-Length')
+        if length < 0:
+            raise HTTPError(400, 'Invalid Content-Length')
+        if length > self.max_body:
+            raise HTTPError(413, f'The request body is larger than {self.max_body} bytes')
+        return length
+
+    async def _handle(self, method: str, target: str, length: int, reader: asyncio.StreamReader):
+        body = await reader.readexactly(length) if length else b''
+
+        url = urlsplit(target)
+        methods = self._routes.get(url.path)
+        if methods is None:
+            return 404, {'error': f'Unknown endpoint: {url.path}'}
+        handler = methods.get(method)
+        if handler is None:
+            return 405, {'error': f'{method} is not supported by {url.path}'}
+
+        if self._in_flight >= self.max_pending:
+            return 503, {'error': 'The server is busy, try again shortly'}
+        self._in_flight += 1
+        try:
+            query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+            return 200, await handler(query, body)
+        except HTTPError as e:
+            return e.status, {'error': str(e)}
+        except Exception as e:
+            return 500, {'error': f'Exception: {e}'}
+        finally:
+            self._in_flight -= 1
+
+    async def _respond(self, writer: asyncio.StreamWriter, status: int, payload: dict, keep_alive: bool):
+        body = json.dumps(payload, separators=(',', ':')).encode()
+        head = [f'HTTP/1.1 {status} {_REASONS[status]}', 'Content-Type: application/json',
+                f'Content-Length: {len(body)}', f'Connection: {"keep-alive" if keep_alive else "close"}']
+        if status == 503:
+            head.append('Retry-After: 1')
+        writer.write('\r\n'.join(head).encode() + b'\r\n\r\n' + body)
+        await writer.drain()
+
+    @staticmethod
+    def _json(body: bytes):
+        try:
+            value = json.loads(body)
+        except ValueError:
+            raise HTTPError(400, 'The request body is not valid JSON')
+        if not isinstance(value, dict):
+            raise HTTPError(400, 'The request body must be a JSON object')
+        return value
+
+    @staticmethod
+    def _fields(fields):
+        # Fields are checked here, so an unknown field is a 400 for the request rather than an error in the batch
+        if fields is None:
+            return None
+        if isinstance(fields, str):
+            fields = [field.strip() for field in fields.split(',') if field.strip()]
+        if not isinstance(fields, list) or not all(isinstance(field, str) for field in fields):
+            raise HTTPError(400, 'fields must be a list of field names')
+        for field in fields:
+            if field not in FIELD_NAMES:
+                raise HTTPError(400, f'Unknown field: {field}')
+        return tuple(fields)
+
+    def _items(self, request: dict, name: str):
+        items = request.get(name)
+        if not isinstance(items, list) or not all(isinstance(item, str) for item in items):
+            raise HTTPError(400, f'{name} must be a list of strings')
+        if len(items) > self.max_batch:
+            raise HTTPError(413, f'At most {self.max_batch} {name} per request')
+        return items
+
+    async def _calc(self, cidr, fields):
+        if not isinstance(cidr, str):
+            raise HTTPError(400, 'cidr is required')
+        # Shielded, since several requests can be waiting on the same future
+        return await asyncio.shield(self._coalescer.submit(cidr, self._fields(fields)))
+
+    async def _calc_get(self, query: dict, body: bytes):
+        return await self._calc(query.get('cidr'), query.get('fields'))
+
+    async def _calc_post(self, query: dict, body: bytes):
+        request = self._json(body)
+        return await self._calc(request.get('cidr'), request.get('fields'))
+
+    async def _batch(self, query: dict, body: bytes):
+        request = self._json(body)
+        cidrs = self._items(request, 'cidrs')
+        fields = self._fields(request.get('fields'))
+
+        # The batch is already a batch, so it skips the coalescer, but duplicates are still only calculated once
+        results, calculated = [], {}
+        for index, cidr in enumerate(cidrs, 1):
+            result = calculated.get(cidr)
+            if result is None:
+                result = calculated[cidr] = _calc(cidr, fields)
+            results.append(result)
+            if not index % _YIELD_EVERY: # Let other requests in between, rather than holding the loop for the whole batch
+                await asyncio.sleep(0)
+        return {'results': results}
+
+    def _lookup(self, ip: str):
+        if self._table is None:
+            raise HTTPError(404, 'No prefix table is loaded')
+        try:
+            match = self._table.lookup(ip_to_int(ip))
+        except (TypeError, ValueError):
+            raise HTTPError(400, f'Invalid address: {ip}')
+        if match is None:
+            return {'ip': ip, 'prefix': None, 'label': None}
+        return {'ip': ip, 'prefix': str(match[0]), 'label': match[1]}
+
+    async def _lookup_get(self, query: dict, body: bytes):
+        if 'ip' not in query:
+            raise HTTPError(400, 'ip is required')
+        return self._lookup(query['ip'])
+
+    async def _lookup_post(self, query: dict, body: bytes):
+        request = self._json(body)
+        return {'results': [self._lookup(ip) for ip in self._items(request, 'ips')]}
+
+    async def _stats(self, query: dict, body: bytes):
+        return {
+            'endpoints': {path: histogram.to_dict() for path, histogram in sorted(self._histograms.items())},
+            'coalesced': {'requests': self._coalescer.requests, 'batches': self._coalescer.batches},
+            'in_flight': self._in_flight - 1, # Not counting this request
+        }
+
+def serve(host: str = '127.0.0.1', port: int = 8080, table=None, ready=None, **options):
+    """
+    Run a SubnetServer until interrupted
+
+    :param host: The address to listen on
+    :param port: The port to listen on
+    :param table: The prefixes for /lookup as (prefix, label) pairs
+    :param ready: Called with the server once it is listening, eg to report the port
+    :param options: Further SubnetServer options
+    """
+
+    async def run():
+        server = SubnetServer(host, port, table, **options)
+        await server.start()
+        if ready is not None:
+            ready(server)
+        await server.serve_forever()
+
+    asyncio.run(run())
@@ -0,0 +1,207 @@
+from array import array
+from bisect import bisect_right
+from .aggregate import sort_keys
+from .prefix import Prefix, as_prefix, ip_to_int
+from .prefixarray import PrefixArray
+from .ranges import range_prefixes
+from .tables import MASKS, WILDCARDS
+
+def _combine(left: array, right: array, keep: tuple):
+    # Merge two sets of boundaries into a new one. Boundaries are the sorted addresses where membership of the set
+    # switches on or off, so walking both lists in order tells us whether each address range is in either set. keep is
+    # the truth table of the operation, indexed by in_left * 2 + in_right.
+    result = array('Q')
+    append = result.append
+    i = j = 0
+    membership = 0
+    state = False
+    left_count, right_count = len(left), len(right)
+    end = 1 << 33
+    while i < left_count or j < right_count:
+        left_next = left[i] if i < left_count else end
+        right_next = right[j] if j < right_count else end
+        if left_next <= right_next:
+            point = left_next
+            membership ^= 2
+            i += 1
+            if right_next == point:
+                membership ^= 1
+                j += 1
+        else:
+            point = right_next
+            membership ^= 1
+            j += 1
+        if keep[membership] != state:
+            state = not state
+            append(point)
+    return result
+
+# The truth tables for _combine: (in neither, only in right, only in left, in both)
+_UNION = (False, True, True, True)
+_INTERSECTION = (False, False, False, True)
+_DIFFERENCE = (False, False, True, False)
+_SYMMETRIC_DIFFERENCE = (False, True, True, False)
+
+class PrefixSet:
+    """
+    A set of IPv4 addresses, stored as sorted disjoint address ranges, so memory depends on the number of ranges rather
+    than the number of prefixes or addresses. Supports the usual set operators (| & - ^) and comparisons, each a single
+    linear merge of the two sets, and converts back to the fewest prefixes covering the same addresses.
+
+    :param prefixes: The prefixes in CIDR notation, as Prefix objects or a PrefixArray. Host bits are ignored.
+    :type prefixes: Iterable[str | Prefix] | PrefixArray
+    """
+
+    __slots__ = ('_bounds',)
+
+    def __init__(self, prefixes=()):
+        if not isinstance(prefixes, PrefixArray):
+            prefixes = PrefixArray(prefixes)
+
+        # Sort by network ID, then merge ranges that overlap or touch. Each key is the network ID in the high 32 bits and
+        # the broadcast address in the low 32 bits.
+        keys = array('Q', (((address & MASKS[length]) << 32) | (address | WILDCARDS[length]) for address, length in zip(prefixes.addresses, prefixes.lengths)))
+        bounds = array('Q')
+        end = -2
+        for key in sort_keys(keys):
+            start = key >> 32
+            if start > end + 1:
+                if bounds:
+                    bounds.append(end + 1)
+                bounds.append(start)
+                end = key & 0xFFFFFFFF
+            elif key & 0xFFFFFFFF > end:
+                end = key & 0xFFFFFFFF
+        if bounds:
+            bounds.append(end + 1)
+        self._bounds = bounds
+
+    @classmethod
+    def _from_bounds(cls, bounds: array):
+        result = cls.__new__(cls)
+        result._bounds = bounds
+        return result
+
+    def ranges(self):
+        """
+        :returns: Yields the (first, last) addresses of each range as 32-bit ints, in address order
+        """
+
+        bounds = self._bounds
+        for index in range(0, len(bounds), 2):
+            yield bounds[index], bounds[index + 1] - 1
+
+    def prefixes(self):
+        """
+        :returns: Yields the fewest Prefix objects covering exactly the addresses in the set, in address order
+        """
+
+        for start, end in self.ranges():
+            for network, length in range_prefixes(start, end):
+                yield Prefix(network, length)
+
+    def __iter__(self):
+        return self.prefixes()
+
+    @property
+    def num_addresses(self):
+        """The number of addresses in the set"""
+        bounds = self._bounds
+        return sum(bounds[1::2]) - sum(bounds[::2])
+
+    def __bool__(self):
+        return bool(self._bounds)
+
+    def __contains__(self, item):
+        # An address (or a whole prefix) is in the set if it is inside a single range, ie after an odd number of bounds
+        if isinstance(item, int):
+            start = end = item
+        elif isinstance(item, str) and '/' not in item:
+            start = end = ip_to_int(item)
+        else:
+            prefix = as_prefix(item)
+            start, end = prefix.network, prefix.broadcast
+        index = bisect_right(self._bounds, start)
+        return index % 2 == 1 and end < self._bounds[index]
+
+    def union(self, other):
+        """:returns: A new PrefixSet with the addresses in either set"""
+        return PrefixSet._from_bounds(_combine(self._bounds, other._bounds, _UNION))
+
+    def intersection(self, other):
+        """:returns: A new PrefixSet with the addresses in both sets"""
+        return PrefixSet._from_bounds(_combine(self._bounds, other._bounds, _INTERSECTION))
+
+    def difference(self, other):
+        """:returns: A new PrefixSet with the addresses in this set but not the other"""
+        return PrefixSet._from_bounds(_combine(self._bounds, other._bounds, _DIFFERENCE))
+
+    def symmetric_difference(self, other):
+        """:returns: A new PrefixSet with the addresses in exactly one of the sets"""
+        return PrefixSet._from_bounds(_combine(self._bounds, other._bounds, _SYMMETRIC_DIFFERENCE))
+
+    def issubset(self, other):
+        """:returns: True if every address in this set is also in the other"""
+        return not self.difference(other)
+
+    def issuperset(self, other):
+        """:returns: True if every address in the other set is also in this one"""
+        return not other.difference(self)
+
+    def isdisjoint(self, other):
+        """:returns: True if the sets have no addresses in common"""
+        return not self.intersection(other)
+
+    def __or__(self, other):
+        if not isinstance(other, PrefixSet):
+            return NotImplemented
+        return self.union(other)
+
+    def __and__(self, other):
+        if not isinstance(other, PrefixSet):
+            return NotImplemented
+        return self.intersection(other)
+
+    def __sub__(self, other):
+        if not isinstance(other, PrefixSet):
+            return NotImplemented
+        return self.difference(other)
+
+    def __xor__(self, other):
+        if not isinstance(other, PrefixSet):
+            return NotImplemented
+        return self.symmetric_difference(other)
+
+    def __le__(self, other):
+        if not isinstance(other, PrefixSet):
+            return NotImplemented
+        return self.issubset(other)
+
+    def __ge__(self, other):
+        if not isinstance(other, PrefixSet):
+            return NotImplemented
+        return self.issuperset(other)
+
+    def __lt__(self, other):
+        if not isinstance(other, PrefixSet):
+            return NotImplemented
+        return self != other and self.issubset(other)
+
+    def __gt__(self, other):
+        if not isinstance(other, PrefixSet):
+            return NotImplemented
+        return self != other and self.issuperset(other)
+
+    def __eq__(self, other):
+        if not isinstance(other, PrefixSet):
+            return NotImplemented
+        return self._bounds == other._bounds
+
+    def __hash__(self): # A PrefixSet never changes, so like frozenset it can be hashed by its contents
+        return hash(self._bounds.tobytes())
+
+    def __repr__(self):
+        prefixes = [str(prefix) for _, prefix in zip(range(5), self.prefixes())]
+        if len(prefixes) == 5:
+            return f'PrefixSet({prefixes[:4]} ...)'
+        return f'PrefixSet({prefixes})'
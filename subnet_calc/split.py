@@ -0,0 +1,118 @@
+from collections import namedtuple
+from .prefix import Prefix, as_prefix
+from .tables import HOST_COUNTS
+
+# One subnet of a VLSM plan: the position of the request in the list of host counts, the number of hosts requested and
+# the subnet allocated for them
+Allocation = namedtuple('Allocation', ['index', 'hosts', 'prefix'])
+
+class Subnets:
+    """
+    The subnets of a prefix at a longer prefix length, eg the /24s of a /8. Nothing is generated up front: the subnets
+    are a range of network IDs, so len(), indexing (subnets[50000]), slicing and membership tests are all O(1), and
+    iterating yields each Prefix as it is needed.
+
+    :param starts: The network IDs of the subnets
+    :param length: The prefix length of the subnets
+    :type starts: range
+    :type length: int
+    """
+
+    __slots__ = ('_starts', '_length')
+
+    def __init__(self, starts: range, length: int):
+        self._starts = starts
+        self._length = length
+
+    @property
+    def length(self):
+        """The prefix length of the subnets"""
+        return self._length
+
+    def __len__(self):
+        return len(self._starts)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return Subnets(self._starts[index], self._length)
+        return Prefix(self._starts[index], self._length)
+
+    def __iter__(self):
+        length = self._length
+        for start in self._starts:
+            yield Prefix(start, length)
+
+    def __reversed__(self):
+        return iter(self[::-1])
+
+    def __contains__(self, prefix):
+        # As in ipaddress, a prefix with host bits set is not one of the subnets
+        prefix = as_prefix(prefix)
+        return prefix.length == self._length and prefix.address == prefix.network and prefix.address in self._starts
+
+    def index(self, prefix):
+        """
+        :param prefix: A subnet in CIDR notation or as a Prefix object
+        :type prefix: str | Prefix
+        :returns: The position of the subnet. Raises ValueError if it is not one of these subnets.
+        """
+
+        if prefix not in self:
+            raise ValueError(f'{prefix} is not one of the subnets')
+        return self._starts.index(as_prefix(prefix).address)
+
+    def __repr__(self):
+        if not self._starts:
+            return 'Subnets([])'
+        return f"Subnets('{self[0]}' ... '{self[-1]}', {len(self)} subnets)"
+
+def subnets(cidr, new_prefix: int):
+    """
+    Split a prefix into subnets with a longer prefix length, eg subnets('10.0.0.0/8', 24)
+
+    :param cidr: The prefix to split in CIDR notation or as a Prefix object. Host bits are ignored.
+    :param new_prefix: The prefix length of the subnets, at least the prefix length of cidr and at most 32
+    :type cidr: str | Prefix
+    :type new_prefix: int
+    :returns: Returns a Subnets sequence
+    """
+
+    prefix = as_prefix(cidr)
+    if not prefix.length <= new_prefix <= 32:
+        raise ValueError(f'The new prefix length must be in the range {prefix.length}-32')
+    return Subnets(range(prefix.network, prefix.broadcast + 1, 1 << (32 - new_prefix)), new_prefix)
+
+def _hosts_length(hosts: int):
+    # The longest prefix length with at least this many usable hosts, counted the same way as ipv4_host_count
+    if hosts < 1:
+        raise ValueError(f'Invalid host count: {hosts}')
+    for length in range(30, -1, -1):
+        if HOST_COUNTS[length] >= hosts:
+            return length
+    raise ValueError(f'Too many hosts for one subnet: {hosts}')
+
+def vlsm_plan(cidr, host_counts):
+    """
+    Plan variable length subnets for a list of host counts within a prefix. The largest subnets are allocated first,
+    each directly after the previous one, which keeps every subnet aligned and leaves no gaps. Raises ValueError straight
+    away if the subnets do not fit.
+
+    :param cidr: The prefix to allocate from in CIDR notation or as a Prefix object. Host bits are ignored.
+    :param host_counts: The number of hosts each subnet needs
+    :type cidr: str | Prefix
+    :type host_counts: Iterable[int]
+    :returns: A generator yielding an Allocation (index, hosts, prefix) per host count, from the largest subnet down
+    """
+
+    prefix = as_prefix(cidr)
+    requests = sorted((_hosts_length(hosts), index, hosts) for index, hosts in enumerate(host_counts))
+    needed = sum(1 << (32 - length) for length, _, _ in requests)
+    available = 1 << (32 - prefix.length)
+    if needed > available:
+        raise ValueError(f'The subnets need {needed} addresses, but {Prefix(prefix.network, prefix.length)} only has {available}')
+    return _allocate(prefix.network, requests)
+
+def _allocate(start: int, requests):
+    for length, index, hosts in requests:
+        yield Allocation(index, hosts, Prefix(start, length))
+        start += 1 << (32 - length)
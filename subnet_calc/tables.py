@@ -0,0 +1,22 @@
+# Lookup tables for everything that only depends on the prefix length or on a single octet.
+# There are only 33 possible prefix lengths (/0 - /32) and 256 possible octets, so these are all built once at import
+# and every calculation that needs them becomes a simple index into a tuple.
+
+def _dotted(value: int):
+    return f'{value >> 24}.{(value >> 16) & 0xFF}.{(value >> 8) & 0xFF}.{value & 0xFF}'
+
+# Per octet tables, indexed by the octet value 0-255
+OCTET_STRINGS = tuple(str(octet) for octet in range(256))
+OCTET_BINARY = tuple(format(octet, '08b') for octet in range(256))
+OCTET_VALUES = {string: octet for octet, string in enumerate(OCTET_STRINGS)} # Reverse of OCTET_STRINGS
+
+# Per prefix length tables, indexed by the prefix length 0-32
+MASKS = tuple((0xFFFFFFFF << (32 - length)) & 0xFFFFFFFF for length in range(33))
+WILDCARDS = tuple(mask ^ 0xFFFFFFFF for mask in MASKS)
+HOST_COUNTS = tuple(2**(32 - length) - 2 for length in range(33)) # Same 2**h - 2 formula as helpers.ipv4_host_count
+MASK_STRINGS = tuple(_dotted(mask) for mask in MASKS)
+WILDCARD_STRINGS = tuple(_dotted(wildcard) for wildcard in WILDCARDS)
+MASK_BINARY = tuple('.'.join(OCTET_BINARY[int(octet)] for octet in mask.split('.')) for mask in MASK_STRINGS)
+
+# Reverse lookup from a netmask in dot decimal format to its prefix length
+MASK_PREFIXES = {mask: length for length, mask in enumerate(MASK_STRINGS)}
@@ -1,7 +1,72 @@
+import re
+from .tables import MASK_PREFIXES, OCTET_VALUES
 
 # Module constants
 VALID_MASK_OCTETS = {0, 128, 192, 224, 240, 248, 252, 254, 255}
 
+# Strict single pass patterns. Each octet is ASCII digits in the range 0-255 and the prefix length is ASCII digits in the
+# range 0-32, both with optional leading zeroes. The groups capture the values without the leading zeroes, so they can
+# be converted with a lookup in OCTET_VALUES rather than int(). ADDRESS_PATTERN is public for modules that search for
+# addresses within a longer string (compile it with re.ASCII).
+_OCTET = r'0*(25[0-5]|2[0-4]\d|1\d\d|[1-9]?\d)'
+ADDRESS_PATTERN = rf'{_OCTET}\.{_OCTET}\.{_OCTET}\.{_OCTET}'
+_ADDRESS = re.compile(ADDRESS_PATTERN, re.ASCII)
+_CIDR = re.compile(rf'{ADDRESS_PATTERN}/0*(3[0-2]|[12]?\d)', re.ASCII)
+_LOOSE_ADDRESS = re.compile(r'\d+\.\d+\.\d+\.\d+', re.ASCII) # Only used to tell the rejection reasons apart
+_PREFIX_LENGTH = re.compile(r'\d+', re.ASCII)
+
+# Rejection reasons returned by parse_address and parse_cidr
+MISSING_PREFIX = 'missing prefix length'
+INVALID_PREFIX = 'invalid prefix length'
+INVALID_ADDRESS = 'invalid address'
+OCTET_RANGE = 'octet out of range'
+
+def parse_address(address: str):
+    """
+    Validate and parse an address in dot decimal format in a single pass. Each octet must be ASCII digits in the range 0-255. Ignores spaces.
+
+    :param address: The address to parse
+    :type address: str
+    :returns: Returns a tuple of (address as a 32-bit int, None), or (None, reason) if the address is invalid
+    """
+
+    match = _ADDRESS.fullmatch(address)
+    if match is None and ' ' in address: # Spaces are allowed anywhere in the address, so only strip them when present
+        address = address.replace(' ', '')
+        match = _ADDRESS.fullmatch(address)
+    if match is None:
+        return None, OCTET_RANGE if _LOOSE_ADDRESS.fullmatch(address) else INVALID_ADDRESS
+
+    a, b, c, d = match.groups()
+    return (OCTET_VALUES[a] << 24) | (OCTET_VALUES[b] << 16) | (OCTET_VALUES[c] << 8) | OCTET_VALUES[d], None
+
+def parse_cidr(address: str):
+    """
+    Validate and parse an address in CIDR notation in a single pass, as per RFC 791, 950 and 4632. The address portion
+    follows the same rules as parse_address, and the prefix length must be ASCII digits in the range 0-32.
+
+    :param address: The IP Address to parse. This would usually be the direct input from the user.
+    :type address: str
+    :returns: Returns a tuple of (address as a 32-bit int, prefix length, None), or (None, None, reason) if the address is invalid
+    """
+
+    match = _CIDR.fullmatch(address)
+    if match is not None: # The common case, a well formed address with no spaces
+        a, b, c, d, length = match.groups()
+        return (OCTET_VALUES[a] << 24) | (OCTET_VALUES[b] << 16) | (OCTET_VALUES[c] << 8) | OCTET_VALUES[d], OCTET_VALUES[length], None
+
+    # Otherwise work out why it did not match, or parse it the slow way if it only failed because of spaces
+    cidr_split = address.split('/')
+    if len(cidr_split) == 1:
+        return None, None, MISSING_PREFIX
+    if len(cidr_split) != 2 or not _PREFIX_LENGTH.fullmatch(cidr_split[1]) or int(cidr_split[1]) > 32:
+        return None, None, INVALID_PREFIX
+
+    value, reason = parse_address(cidr_split[0])
+    if reason is not None:
+        return None, None, reason
+    return value, int(cidr_split[1]), None
+
 def valid_address(address: str):
     """
     Validate that an address is indeed a valid IPv4 address with four octets, with each octet in the range 0-255. Each octet needs to be numeric. Ignores spaces.
@@ -11,21 +76,7 @@ def valid_address(address: str):
     returns: Returns True/False whether this is a valid octet
     """
 
-    octets = address.split('.')
-
-    # First, let's check if there are four octets
-    if len(octets) == 4:
-        for octet in octets:
-            # Validate the octet
-            octet = octet.replace(' ','')
-            if not octet.isnumeric:
-                return False
-            if not 0 <= int(octet) <= 255:
-                return False
-    else:
-        return False
-    
-    return True
+    return parse_address(address)[1] is None
 
 def valid_cidr(address: str):
     """
@@ -36,28 +87,70 @@ def valid_cidr(address: str):
     :returns: Returns True/False whether this is a valid CIDR IPv4 address
     """
 
-    #print(f'This is line 40 in validation.py. Value address is value {address} and is of type {type(address)}')
-
-    try:
-        # First we need to check that the CIDR mask is valid
-        # Start by splitting the entered address and then checking if the list length is == 2
-        
-        cidr_split = address.split('/')
-        if len(cidr_split) == 2:
-            cidr_address = cidr_split[0]
-            cidr_mask = cidr_split[1]
-
-            # If this list length is indeed correct we can proceed to the next step, which is to check if the mask is numeric
-            # If the mask is numeric we can check if the mask is in the valid range of 0-32
-            if cidr_mask.isnumeric():
-                if 0 <= int(cidr_mask) <=32:
-                    # Now we can check that the address portion is valid. use the return from valid_address, since if it passes everything at this point it is a valid address
-                    return valid_address(cidr_address)
-    except ValueError:
-        return False
-    
-    # Return False by default
-    return False
+    return parse_cidr(address)[2] is None
+
+def validate_many(addresses):
+    """
+    Validate a whole batch of addresses in CIDR notation in one call
+
+    :param addresses: Either a list of addresses, or a bytes buffer with one address per line (eg the contents of a file)
+    :type addresses: Iterable[str] | bytes
+    :returns: Returns a tuple of (valid, errors). valid is a bytearray with a 1 or 0 for each address, and errors is a list
+              of (offset, reason) for every invalid address. The offset is the index in the list, or the byte offset of the
+              start of the line in a buffer.
+    """
+
+    if isinstance(addresses, (bytes, bytearray, memoryview)):
+        lines = bytes(addresses).decode('ascii', errors='replace').split('\n')
+        if lines[-1] == '': # A trailing newline does not start another address
+            lines.pop()
+        offsets = []
+        offset = 0
+        for line in lines:
+            offsets.append(offset)
+            offset += len(line) + 1
+        addresses = [line.strip() for line in lines]
+    else:
+        addresses = list(addresses)
+        offsets = range(len(addresses))
+
+    # One strict regex match per address covers almost every valid address
+    valid = bytearray(map(bool, map(_CIDR.fullmatch, addresses)))
+
+    # Only the addresses that did not match need a closer look, either for the rejection reason or because of spaces
+    errors = []
+    for index in [index for index, ok in enumerate(valid) if not ok]:
+        reason = parse_cidr(addresses[index])[2]
+        if reason is None:
+            valid[index] = 1
+        else:
+            errors.append((offsets[index], reason))
+
+    return valid, errors
+
+def mask_length(mask: str):
+    """
+    Look up the prefix length of the provided netmask
+
+    :param mask: The mask to look up in Dotted-Decimal format
+    :type mask: str
+    returns: The prefix length 0-32, or None if this is not a valid netmask
+    """
+
+    # Canonical masks are a single dictionary lookup
+    length = MASK_PREFIXES.get(mask)
+    if length is not None:
+        return length
+
+    # Otherwise normalise the octets (eg leading zeroes) and try again. Anything that is not four numeric octets is not a mask.
+    mask_octets = mask.split('.')
+    if len(mask_octets) != 4:
+        return None
+    for octet in mask_octets:
+        if not (octet.isascii() and octet.isdigit()):
+            return None
+
+    return MASK_PREFIXES.get('.'.join(str(int(octet)) for octet in mask_octets))
 
 def valid_mask(mask: str):
     """
@@ -68,26 +161,5 @@ def valid_mask(mask: str):
     returns: True/False whether this is a valid netmask
     """
 
-    # First, split the mask into octets
-    mask_octets = mask.split(".")
-    # Now check that the correct number of octets is present
-    if not len(mask_octets) == 4: 
-        return False
-
-    # Now check that each octet in turn is valid by simply checking that each is one of the acceptable values
-
-    # Now finally do some logic validation to confirm that the octets are in the correct sequence - eg there are no smaller octets before larger octets
-    prev_octet = 512 # Need to initialise this with an artificially high value, otherwise the next test fails. TODO: Fix this
-    for i in range(len(mask_octets)): 
-        if not mask_octets[i].isnumeric(): # Check that the value is numeric
-            return False
-        if int(mask_octets[i]) < 0: # Test if octet is negative
-            return False
-        if not int(mask_octets[i]) in VALID_MASK_OCTETS: # Check if the octet is in the acceptable list
-            return False
-        if i > 0: # We are dealing with the second or higher octet
-            if prev_octet < int(mask_octets[i]):
-                return False
-        prev_octet = int(mask_octets[i])
-
-    return True
+    # Every valid netmask is in the prefix length table, so this is simply a lookup
+    return mask_length(mask) is not None
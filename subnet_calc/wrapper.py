@@ -1,87 +1,231 @@
-import json
+from functools import lru_cache
+from types import MappingProxyType
 from . import calculate
 from . import helpers
-from . import validation
-
-_subnet_values = {
-    'input'     :   {
-                        'CIDR'          :   '',
-                        'address'       :   '',
-                        'mask'          :   ''
-                    },
-    'output'    :   {
-                        'result'        :   False,          # Default result
-                        'message'       :   'Invalid input' # Default return message
-                    },
-    'network'   :   {
-                        'network_id'    :   '',
-                        'netmask'       :   '',
-                        'broadcask'     :   '',
-                        'wildcard'      :   ''
-                    },
-    'hosts'     :   {
-                        'first'         :   '',
-                        'last'          :   '',
-                        'total'         :   ''
-                    },
-    'binary'    :   {
-                        'network_id'    :   '',
-                        'netmask'       :   '',
-                        'broadcast'     :   ''
-                    }
+from . import cache
+from .prefix import Prefix
+from .tables import MASK_BINARY
+
+# The sections of a result, in output order
+SECTIONS = ('input', 'output', 'network', 'hosts', 'binary')
+
+# Every field calc_subnet can calculate, in output order, with the function that calculates it from the parsed prefix
+# and the original input string
+_FIELDS = {
+    ('input', 'CIDR'):          lambda prefix, address: address,
+    ('input', 'address'):       lambda prefix, address: address.split('/')[0],
+    ('input', 'mask'):          lambda prefix, address: f'/{prefix.length}',
+    ('network', 'network_id'):  lambda prefix, address: calculate.ipv4_net_id(prefix),
+    ('network', 'netmask'):     lambda prefix, address: calculate.calc_ipv4_mask(prefix),
+    ('network', 'broadcast'):   lambda prefix, address: calculate.ipv4_broadcast(prefix),
+    ('network', 'wildcard'):    lambda prefix, address: helpers.ipv4_wildcard(prefix),
+    ('hosts', 'first'):         lambda prefix, address: calculate.ipv4_edge(prefix, True),
+    ('hosts', 'last'):          lambda prefix, address: calculate.ipv4_edge(prefix, False),
+    ('hosts', 'total'):         lambda prefix, address: helpers.ipv4_host_count(prefix),
+    ('binary', 'network_id'):   lambda prefix, address: helpers.ipv4_bin(prefix.network),
+    ('binary', 'netmask'):      lambda prefix, address: MASK_BINARY[prefix.length],
+    ('binary', 'broadcast'):    lambda prefix, address: helpers.ipv4_bin(prefix.broadcast),
 }
 
-def calc_subnet(address:str):
-    """A wrapper to perform all the required calculations on a single subnet
-    
-    :param address: The address to calculate in CIDR notation
+# Field names accepted by the fields selector. A plain field name refers to the first section that has it (so
+# network_id is network.network_id), a section.field name is exact, and a section name selects the whole section.
+FIELD_NAMES: dict[str, tuple[tuple[str, str], ...]] = {}
+for _key in _FIELDS:
+    FIELD_NAMES.setdefault(_key[1], (_key,))
+    FIELD_NAMES[f'{_key[0]}.{_key[1]}'] = (_key,)
+    FIELD_NAMES[_key[0]] = FIELD_NAMES.get(_key[0], ()) + (_key,)
+_ALL_FIELDS = tuple(_FIELDS)
+
+def _select_fields(fields):
+    if fields is None:
+        return _ALL_FIELDS
+    return _select_field_names(tuple(fields))
+
+@lru_cache(maxsize=64) # The same few selections are used over and over, eg for every line of a bulk input
+def _select_field_names(fields: tuple[str, ...]):
+    selected = {}
+    for name in fields:
+        if name not in FIELD_NAMES:
+            raise ValueError(f'Unknown field: {name}')
+        selected.update(dict.fromkeys(FIELD_NAMES[name]))
+
+    # Keep the selected fields in output order, regardless of the order they were asked for in
+    return tuple(key for key in _FIELDS if key in selected)
+
+class SubnetResult:
+    """
+    The immutable result of calc_subnet. Fields are only calculated when they are first read and are then cached,
+    so callers only pay for the fields they actually use. Every call to calc_subnet builds a new result, so results can
+    be shared between threads freely (at worst two threads both calculate the same field the first time).
+
+    Fields can be read by name with get() or as attributes (result.broadcast), and by section (result.network), which
+    returns a read-only mapping of the selected fields in that section.
+
+    :param address: The original input in CIDR notation
+    :param prefix: The parsed input, or None if the input was invalid
+    :param fields: The (section, field) keys selected for this result
+    :param error: The reason the input was invalid
+    :param values: Where the calculated fields (other than the input section) are stored. This can be shared between
+                   results for the same network, see the cache module.
     :type address: str
-    :returns: A JSON dictionary containing the results of the various calculations
+    :type prefix: Prefix | None
+    :type fields: tuple
+    :type error: str | None
+    :type values: dict | None
     """
 
-    if validation.valid_cidr(address): # Only perform the calculations if the input is valid
+    __slots__ = ('_address', '_prefix', '_fields', '_error', '_values', '_output')
+
+    def __init__(self, address: str, prefix: Prefix | None, fields: tuple, error: str | None = None, values: dict | None = None):
+        object.__setattr__(self, '_address', address)
+        object.__setattr__(self, '_prefix', prefix)
+        object.__setattr__(self, '_fields', fields)
+        object.__setattr__(self, '_error', error)
+        object.__setattr__(self, '_values', {} if values is None else values)
+        object.__setattr__(self, '_output', None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('SubnetResult is immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError('SubnetResult is immutable')
+
+    def __reduce__(self):
+        # Rebuilt through __init__, since __setattr__ refuses the usual slot by slot copy. The calculated fields are not
+        # carried over, they are calculated again when read.
+        return SubnetResult, (self._address, self._prefix, self._fields, self._error)
+
+    def _value(self, key: tuple[str, str]):
+        if self._prefix is None:
+            raise ValueError(self._error)
+        if key[0] == 'input': # The input fields are specific to this address and cheap, so they are not stored
+            return _FIELDS[key](self._prefix, self._address)
+
+        values = self._values
+        if key not in values:
+            values[key] = _FIELDS[key](self._prefix, self._address)
+        return values[key]
+
+    def get(self, field: str):
+        """
+        Read a single field, calculating it if it has not been read before
 
-        try:
+        :param field: The field name, eg broadcast or binary.broadcast
+        :type field: str
+        :returns: The value of the field
+        """
 
-            ip, cidr = address.split('/')
+        keys = FIELD_NAMES.get(field)
+        if keys is None or len(keys) != 1:
+            raise KeyError(field)
+        return self._value(keys[0])
 
-            _subnet_values['input'] = {
-                'CIDR': address,
-                'address': ip,
-                'mask': f'/{cidr}'
-            }
+    def __getattr__(self, name):
+        # Only called for names that are not slots, methods or properties
+        keys = FIELD_NAMES.get(name)
+        if keys is None or len(keys) != 1:
+            raise AttributeError(name)
+        return self._value(keys[0])
 
-            _subnet_values['network'] = {
-                'network_id': calculate.ipv4_net_id(address),
-                'netmask': calculate.calc_ipv4_mask(address),
-                'broadcast': calculate.ipv4_broadcast(address),
-                'wildcard': helpers.ipv4_wildcard(address)
-            }
+    def _section(self, section: str):
+        if not self.result:
+            return None
+        keys = [key for key in self._fields if key[0] == section]
+        if not keys:
+            return None
+        return MappingProxyType({key[1]: self._value(key) for key in keys})
 
-            _subnet_values['hosts'] = {
-                'first': calculate.ipv4_edge(address, True),
-                'last': calculate.ipv4_edge(address, False),
-                'total': helpers.ipv4_host_count(address)
-            }
+    @property
+    def output(self):
+        """
+        The output section, containing the result (True/False) and a message. Reading this calculates every selected
+        field, since any of them could fail.
+        """
 
-            _subnet_values['binary'] = {
-                'network_id': helpers.ipv4_bin(_subnet_values['network']['network_id']),
-                'netmask': helpers.ipv4_bin(_subnet_values['network']['netmask']),
-                'broadcast': helpers.ipv4_bin(_subnet_values['network']['broadcast'])
-            }
+        output = self._output
+        if output is None:
+            if self._prefix is None:
+                output = {'result': False, 'message': 'Invalid input'}
+            else:
+                try:
+                    for key in self._fields:
+                        self._value(key)
+                    output = {'result': True, 'message': 'Calculations completed'}
+                except Exception as e:
+                    output = {'result': False, 'message': f'Exception: {str(e)}'}
+            output = MappingProxyType(output)
+            object.__setattr__(self, '_output', output)
+        return output
 
-            _subnet_values['output'] = {
-                'result': True,
-                'message': 'Calculations completed'
-            }
+    @property
+    def result(self):
+        """True if the calculations completed"""
+        return self.output['result']
+
+    @property
+    def message(self):
+        """The message describing the result"""
+        return self.output['message']
+
+    @property
+    def input(self):
+        """The input section"""
+        return self._section('input')
+
+    @property
+    def network(self):
+        """The network section"""
+        return self._section('network')
+
+    @property
+    def hosts(self):
+        """The hosts section"""
+        return self._section('hosts')
+
+    @property
+    def binary(self):
+        """The binary section"""
+        return self._section('binary')
+
+    def to_dict(self):
+        """
+        Convert the result to a dictionary of dictionaries, leaving out any sections that were not calculated
+
+        :returns: A new dictionary, which the caller is free to modify
+        """
+
+        return {name: dict(section) for name in SECTIONS if (section := getattr(self, name)) is not None}
+
+    def to_json(self, indent: int | None = 2):
+        """
+        Convert the result to JSON
+
+        :param indent: The JSON indent, or None for compact output
+        :type indent: int | None
+        :returns: A string containing the JSON dictionary
+        """
+
+        import json # Only needed here, so the command line does not load it for every calculation
+        return json.dumps(self.to_dict(), indent = indent)
+
+    def __repr__(self):
+        return f'SubnetResult({self._address!r})'
+
+def calc_subnet(address:str, fields=None):
+    """A wrapper to perform all the required calculations on a single subnet
+
+    :param address: The address to calculate in CIDR notation
+    :param fields: The names of the fields to include in the result, eg ['network_id', 'broadcast']. Defaults to all fields.
+    :type address: str
+    :type fields: Iterable[str] | None
+    :returns: A SubnetResult containing the results of the various calculations. Use .to_json() for a JSON dictionary.
+    """
 
-        except Exception as e:
-            for key in _subnet_values:
-                _subnet_values.pop(key, None)
+    selected = _select_fields(fields)
 
-            _subnet_values['output'] = {
-                'result': False,
-                'message': f'Exception: {str(e)}'
-            }
+    try: # Parse and validate the input once, every calculation works on the parsed prefix
+        prefix = Prefix.parse(address)
+    except ValueError as e:
+        return SubnetResult(address, None, selected, str(e))
 
-    return json.dumps(_subnet_values, indent = 2)
+    return SubnetResult(address, prefix, selected, values=cache.network_values(prefix.network, prefix.length))
@@ -0,0 +1,95 @@
+import sys
+import os
+import io
+import ipaddress
+import random
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from subnet_calc import aggregate
+from subnet_calc.aggregate import summarize, summarize_sorted
+from subnet_calc.prefix import Prefix, int_to_ip
+from subnet_calc.prefixarray import PrefixArray
+import ipcalc
+
+@pytest.mark.parametrize(
+    'prefixes,expected',
+    [
+        ([], []),
+        (['10.0.0.0/24', '10.0.1.0/24'], ['10.0.0.0/23']),
+        (['10.0.1.0/24', '10.0.2.0/24'], ['10.0.1.0/24', '10.0.2.0/24']), # Adjacent, but not halves of the same /23
+        (['10.0.0.0/26', '10.0.0.64/26', '10.0.0.128/26', '10.0.0.192/26'], ['10.0.0.0/24']),
+        (['10.0.0.0/24', '10.0.1.0/25', '10.0.1.128/25'], ['10.0.0.0/23']),
+        (['10.0.0.0/8', '10.1.0.0/16', '10.255.255.255/32'], ['10.0.0.0/8']),
+        (['10.1.2.3/24', '10.1.2.0/24'], ['10.1.2.0/24']), # Host bits are ignored
+        (['192.168.0.0/24', '10.0.0.0/8', '192.168.1.0/24'], ['10.0.0.0/8', '192.168.0.0/23']),
+        (['0.0.0.0/1', '128.0.0.0/1'], ['0.0.0.0/0']),
+        (['255.255.255.254/32', '255.255.255.255/32'], ['255.255.255.254/31']),
+    ]
+)
+def test_summarize(prefixes: list, expected: list):
+    assert [str(prefix) for prefix in summarize(prefixes)] == expected
+    ordered = sorted(prefixes, key=lambda cidr: (Prefix.parse(cidr).network, Prefix.parse(cidr).length))
+    assert [str(prefix) for prefix in summarize_sorted(ordered)] == expected
+
+@pytest.mark.parametrize('use_numpy', [True, False])
+def test_matches_ipaddress(monkeypatch, use_numpy: bool):
+    if use_numpy:
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(aggregate, 'np', None)
+
+    rng = random.Random(4)
+    prefixes = []
+    for _ in range(5000): # Crowd the prefixes into a /12 so plenty of them overlap and merge
+        length = rng.randint(14, 28)
+        prefixes.append(Prefix((10 << 24) | rng.getrandbits(20), length))
+
+    expected = ipaddress.collapse_addresses(ipaddress.ip_network(f'{int_to_ip(prefix.network)}/{prefix.length}') for prefix in prefixes)
+    assert [str(prefix) for prefix in summarize(PrefixArray(prefixes))] == [str(network) for network in expected]
+
+def test_streaming():
+    # Summarized prefixes are yielded as soon as a gap shows they cannot change any more
+    results = summarize_sorted(iter(['10.0.0.0/24', '10.0.1.0/24', '10.0.3.0/24', '10.0.4.0/24']))
+    assert str(next(results)) == '10.0.0.0/23'
+    assert [str(prefix) for prefix in results] == ['10.0.3.0/24', '10.0.4.0/24']
+
+def test_unsorted():
+    with pytest.raises(ValueError):
+        list(summarize_sorted(['10.0.1.0/24', '10.0.0.0/24']))
+    with pytest.raises(ValueError):
+        list(summarize_sorted(['10.0.0.0/24', '10.0.0.0/8']))
+
+def test_invalid():
+    with pytest.raises(ValueError):
+        summarize(['10.0.0.0/8', 'nope'])
+
+@pytest.mark.parametrize('arguments', [[], ['--sorted']])
+def test_cli_summarize(tmp_path, capsys, arguments: list):
+    path = tmp_path / 'input.txt'
+    path.write_text('10.0.0.0/24\n10.0.1.0/24\n\n10.0.1.128/25\n192.168.0.0/16\n')
+
+    ipcalc.main(['summarize', str(path)] + arguments)
+    assert capsys.readouterr().out == '10.0.0.0/23\n192.168.0.0/16\n'
+
+@pytest.mark.parametrize('use_numpy', [True, False])
+def test_sort_keys(monkeypatch, use_numpy: bool):
+    from array import array
+    if not use_numpy:
+        monkeypatch.setattr(aggregate, 'np', None)
+    rng = random.Random(7)
+    keys = [rng.getrandbits(38) for _ in range(1000)]
+    assert list(aggregate.sort_keys(array('Q', keys))) == sorted(keys)
+    keys = [rng.randrange(50) for _ in range(1000)] # Equal keys keep their input order
+    assert list(aggregate.sorted_order(array('Q', keys))) == sorted(range(len(keys)), key=keys.__getitem__)
+
+def test_cli_summarize_error(monkeypatch):
+    monkeypatch.setattr('sys.stdin', io.StringIO('10.0.1.0/24\n10.0.0.0/24\n'))
+    with pytest.raises(SystemExit, match='not sorted'):
+        ipcalc.main(['summarize', '--sorted'])
+
+@pytest.mark.parametrize('options', [[], ['--sorted']])
+def test_cli_summarize_missing(tmp_path, options: list):
+    with pytest.raises(SystemExit, match='missing.txt'):
+        ipcalc.main(['summarize', str(tmp_path / 'missing.txt')] + options)
@@ -0,0 +1,97 @@
+import sys
+import os
+import random
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from subnet_calc.allocator import Allocator
+from subnet_calc.sets import PrefixSet
+
+def _cidrs(prefixes):
+    return [str(prefix) for prefix in prefixes]
+
+def test_allocate():
+    allocator = Allocator('10.0.0.0/24')
+    assert str(allocator.allocate(26)) == '10.0.0.0/26'
+    assert str(allocator.allocate(28)) == '10.0.0.64/28'
+    assert str(allocator.allocate(26)) == '10.0.0.128/26'
+    assert str(allocator.allocate(28)) == '10.0.0.80/28'
+    assert _cidrs(allocator.free_blocks()) == ['10.0.0.96/27', '10.0.0.192/26']
+    assert allocator.free_addresses == 96
+
+def test_existing_allocations():
+    allocator = Allocator('10.0.0.0/24', ['10.0.0.0/26', '10.0.0.128/25'])
+    assert _cidrs(allocator.free_blocks()) == ['10.0.0.64/26']
+    assert str(allocator.allocate(27)) == '10.0.0.64/27'
+    assert _cidrs(allocator.allocations()) == ['10.0.0.0/26', '10.0.0.64/27', '10.0.0.128/25']
+
+@pytest.mark.parametrize(
+    'allocations',
+    [
+        ['10.0.1.0/26'],                   # Outside the parent
+        ['10.0.0.0/23'],                   # Larger than the parent
+        ['10.0.0.0/26', '10.0.0.0/26'],    # Duplicate
+        ['10.0.0.0/25', '10.0.0.64/26'],   # Overlapping
+    ]
+)
+def test_invalid_allocations(allocations: list):
+    with pytest.raises(ValueError):
+        Allocator('10.0.0.0/24', allocations)
+
+def test_full():
+    allocator = Allocator('10.0.0.0/30')
+    assert _cidrs(allocator.allocate_many(32, 4)) == ['10.0.0.0/32', '10.0.0.1/32', '10.0.0.2/32', '10.0.0.3/32']
+    with pytest.raises(ValueError):
+        allocator.allocate(32)
+    with pytest.raises(ValueError):
+        allocator.allocate(29)
+
+def test_allocate_many_is_all_or_nothing():
+    allocator = Allocator('10.0.0.0/24', ['10.0.0.0/25'])
+    with pytest.raises(ValueError):
+        allocator.allocate_many(26, 3)
+    assert _cidrs(allocator.free_blocks()) == ['10.0.0.128/25']
+
+def test_release_merges_buddies():
+    allocator = Allocator('10.0.0.0/24')
+    prefixes = allocator.allocate_many(26, 4)
+    allocator.release(prefixes[1])
+    allocator.release(prefixes[2]) # Adjacent to the first, but not its buddy
+    assert _cidrs(allocator.free_blocks()) == ['10.0.0.64/26', '10.0.0.128/26']
+    allocator.release('10.0.0.0/26')
+    allocator.release('10.0.0.192/26')
+    assert _cidrs(allocator.free_blocks()) == ['10.0.0.0/24']
+    with pytest.raises(KeyError):
+        allocator.release('10.0.0.0/26')
+
+def test_random_operations():
+    # The free blocks and the allocations always partition the parent
+    rng = random.Random(9)
+    allocator = Allocator('10.0.0.0/16')
+    allocated = []
+    for _ in range(2000):
+        if allocated and rng.random() < 0.4:
+            allocator.release(allocated.pop(rng.randrange(len(allocated))))
+        else:
+            try:
+                allocated.append(allocator.allocate(rng.randint(20, 30)))
+            except ValueError:
+                pass
+        if rng.random() < 0.02:
+            free, used = PrefixSet(allocator.free_blocks()), PrefixSet(allocated)
+            assert free.isdisjoint(used)
+            assert free | used == PrefixSet(['10.0.0.0/16'])
+    assert sorted(allocated, key=lambda prefix: prefix.network) == allocator.allocations()
+
+def test_save_and_load(tmp_path):
+    path = str(tmp_path / 'allocations.json')
+    allocator = Allocator('10.0.0.0/8')
+    allocator.allocate_many(26, 5)
+    allocator.save(path)
+
+    loaded = Allocator.load(path)
+    assert loaded.parent == allocator.parent
+    assert loaded.allocations() == allocator.allocations()
+    assert loaded.free_blocks() == allocator.free_blocks()
+    assert str(loaded.allocate(26)) == '10.0.1.64/26'
@@ -0,0 +1,77 @@
+import sys
+import os
+import io
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from subnet_calc.annotate import annotate_lines, find_address, read_log_lines, read_table
+from subnet_calc.prefix import Prefix, ip_to_int
+import ipcalc
+
+ENTRIES = [(Prefix.parse('10.0.0.0/8'), 'corp'), (Prefix.parse('10.1.0.0/16'), 'lab'), (Prefix.parse('192.168.1.7/32'), 'printer')]
+
+@pytest.fixture
+def table_file(tmp_path):
+    path = tmp_path / 'prefixes.csv'
+    path.write_text('prefix,label,owner\n10.0.0.0/8,corp,it\n10.1.0.0/16,lab\n\n192.168.1.7/32,printer\n')
+    return str(path)
+
+@pytest.mark.parametrize(
+    'line,field,expected',
+    [
+        ('10.1.2.3 - - [18/Oct/2026] "GET / HTTP/1.1" 200',     None,   '10.1.2.3'),
+        ('src=10.1.2.3:443 dst=8.8.8.8',                        None,   '10.1.2.3'),
+        ('src=10.1.2.3:443 dst=8.8.8.8',                        2,      '8.8.8.8'),
+        ('version 1.2.3.4.5 from 10.0.0.1.',                    None,   '10.0.0.1'),
+        ('bad 300.1.1.1 then 010.000.000.001',                  None,   '10.0.0.1'),
+        ('no address here',                                     None,   None),
+        ('10.1.2.3 short',                                      3,      None),
+    ]
+)
+def test_find_address(line: str, field, expected):
+    assert find_address(line, field) == (None if expected is None else ip_to_int(expected))
+
+def test_read_table(table_file):
+    assert read_table(table_file) == ENTRIES
+
+def test_read_table_invalid(tmp_path):
+    path = tmp_path / 'prefixes.csv'
+    path.write_text('10.0.0.0/8,corp\nnope,lab\n')
+    with pytest.raises(ValueError, match='line 2'):
+        read_table(str(path))
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_annotate_lines(jobs: int):
+    lines = ['10.1.2.3 GET /', '', '192.168.1.7 print', '10.200.0.1 x', '8.8.8.8 dns'] * 5
+    blocks = list(annotate_lines(lines, ENTRIES, jobs=jobs, chunk_size=3))
+    assert len(blocks) == 9
+    assert ''.join(blocks).splitlines() == [
+        '10.1.2.3 GET /\t10.1.0.0/16\tlab',
+        '\t-\t-',
+        '192.168.1.7 print\t192.168.1.7/32\tprinter',
+        '10.200.0.1 x\t10.0.0.0/8\tcorp',
+        '8.8.8.8 dns\t-\t-',
+    ] * 5
+
+def test_read_log_lines(tmp_path):
+    path = tmp_path / 'access.log'
+    path.write_bytes(b'10.0.0.1 a\r\n\nbad \xff byte\nlast')
+    lines = list(read_log_lines([str(path)]))
+    assert lines == ['10.0.0.1 a', '', 'bad \udcff byte', 'last']
+    assert lines[2].encode('utf-8', 'surrogateescape') == b'bad \xff byte'
+
+def test_cli_annotate(table_file, monkeypatch, capsys):
+    monkeypatch.setattr('sys.stdin', io.StringIO('10.1.2.3 GET /\n8.8.8.8 GET /\n'))
+    ipcalc.main(['annotate', '--table', table_file])
+    captured = capsys.readouterr()
+    assert captured.out == '10.1.2.3 GET /\t10.1.0.0/16\tlab\n8.8.8.8 GET /\t-\t-\n'
+    assert captured.err.startswith('annotated 2 lines in ')
+
+def test_cli_annotate_files(table_file, tmp_path, capsys):
+    path = tmp_path / 'flows.log'
+    path.write_text('8.8.8.8 10.9.9.9 tcp\n')
+    ipcalc.main(['annotate', '--table', table_file, '--field', '2', str(path), str(path)])
+    assert capsys.readouterr().out == '8.8.8.8 10.9.9.9 tcp\t10.0.0.0/8\tcorp\n' * 2
+    with pytest.raises(SystemExit):
+        ipcalc.main(['annotate', '--table', str(tmp_path / 'missing.csv')])
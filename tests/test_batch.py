@@ -0,0 +1,77 @@
+import sys
+import os
+import random
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+np = pytest.importorskip('numpy')
+
+from subnet_calc.batch import calc_subnets, parse_cidrs, format_addresses, ranges_to_cidrs
+from subnet_calc.calculate import ipv4_net_id, ipv4_broadcast, calc_ipv4_mask, ipv4_edge
+from subnet_calc.helpers import ipv4_wildcard, ipv4_host_count
+from subnet_calc.ranges import range_to_cidrs
+
+def _random_cidrs(count: int):
+    rng = random.Random(42)
+    return [f'{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(0, 255)}/{rng.randint(0, 32)}' for _ in range(count)]
+
+def test_calc_subnets_matches_scalar():
+    cidrs = _random_cidrs(2000) + ['0.0.0.0/0', '255.255.255.255/32', '10.0.0.1/31']
+    results = calc_subnets(cidrs)
+
+    assert format_addresses(results['network_id']) == [ipv4_net_id(cidr) for cidr in cidrs]
+    assert format_addresses(results['broadcast']) == [ipv4_broadcast(cidr) for cidr in cidrs]
+    assert format_addresses(results['netmask']) == [calc_ipv4_mask(cidr) for cidr in cidrs]
+    assert format_addresses(results['wildcard']) == [ipv4_wildcard(cidr) for cidr in cidrs]
+    assert results['total'].tolist() == [ipv4_host_count(cidr) for cidr in cidrs]
+
+    assert results['has_hosts'].dtype == bool
+    for cidr, first, last, has_hosts in zip(cidrs, format_addresses(results['first']), format_addresses(results['last']), results['has_hosts']):
+        if 0 < int(cidr.split('/')[1]) < 31:
+            assert has_hosts
+            assert (first, last) == (ipv4_edge(cidr, True), ipv4_edge(cidr, False))
+        else:
+            assert not has_hosts
+            assert (first, last) == ('0.0.0.0', '0.0.0.0')
+
+def test_calc_subnets_arrays():
+    addresses, lengths = parse_cidrs(['192.168.1.10/24', '10.1.2.3/8'])
+    assert addresses.dtype == np.uint32 and lengths.dtype == np.uint8
+
+    results = calc_subnets(addresses, lengths)
+    assert format_addresses(results['network_id']) == ['192.168.1.0', '10.0.0.0']
+    assert format_addresses(results['broadcast']) == ['192.168.1.255', '10.255.255.255']
+
+@pytest.mark.parametrize(
+    'addresses,lengths',
+    [
+        ([1, 2], [24]),     # Mismatched shapes
+        ([1], [33]),        # Prefix length out of range
+    ]
+)
+def test_calc_subnets_invalid(addresses, lengths):
+    with pytest.raises(ValueError):
+        calc_subnets(addresses, lengths)
+
+def test_calc_subnets_invalid_cidr():
+    with pytest.raises(ValueError):
+        calc_subnets(['192.168.1.0/24', '192.168.1/24'])
+
+def test_ranges_to_cidrs_matches_scalar():
+    rng = random.Random(11)
+    starts = [rng.getrandbits(32) for _ in range(500)]
+    ends = [min(start + rng.getrandbits(rng.randint(0, 32)), 2**32 - 1) for start in starts]
+    starts += [0, 0, 2**32 - 1]
+    ends += [2**32 - 1, 0, 2**32 - 1]
+
+    indexes, networks, lengths = ranges_to_cidrs(starts, ends)
+    expected = [(index, prefix.network, prefix.length) for index, (start, end) in enumerate(zip(starts, ends)) for prefix in range_to_cidrs(start, end)]
+    assert list(zip(indexes.tolist(), networks.tolist(), lengths.tolist())) == expected
+
+def test_ranges_to_cidrs_invalid():
+    with pytest.raises(ValueError):
+        ranges_to_cidrs([5], [4])
+    with pytest.raises(ValueError):
+        ranges_to_cidrs([0], [2**32])
+    assert [len(column) for column in ranges_to_cidrs([], [])] == [0, 0, 0]
@@ -0,0 +1,114 @@
+import sys
+import os
+import io
+import json
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from subnet_calc.bulk import calc_record, calc_records, read_lines, write_csv, write_jsonl
+from subnet_calc import cache
+import ipcalc
+
+@pytest.mark.parametrize(
+    'cidr,field,expected',
+    [
+        ('192.168.1.10/24',  'network_id',  '192.168.1.0'),
+        ('192.168.1.10/24',  'broadcast',   '192.168.1.255'),
+        ('10.0.0.1/8',       'total',       16777214),
+        ('192.168.1/24',     'error',       'Invalid CIDR Address: 192.168.1/24'),
+        ('192.168.1.1/32',   'error',       'Cannot currently handle /32'),
+    ]
+)
+def test_calc_record(cidr: str, field: str, expected):
+    record = calc_record(cidr)
+    assert record['cidr'] == cidr
+    assert record[field] == expected
+
+def test_calc_record_sections():
+    record = calc_record('10.0.0.1/8', ['binary'])
+    assert list(record) == ['cidr', 'binary.network_id', 'binary.netmask', 'binary.broadcast']
+    assert list(calc_records(['10.0.0.1/8'], ['binary'])) == [record]
+    with pytest.raises(ValueError, match='Unknown field: nope'):
+        calc_record('10.0.0.1/8', ['nope'])
+
+def test_read_lines(tmp_path):
+    path = tmp_path / 'input.txt'
+    path.write_text('10.0.0.0/8\n\n  192.168.1.0/24  \n')
+    assert list(read_lines(str(path))) == ['10.0.0.0/8', '192.168.1.0/24']
+
+def test_writers():
+    records = list(calc_records(['10.0.0.0/8', 'foo']))
+
+    out = io.StringIO()
+    assert write_jsonl(records, out) == 2
+    lines = out.getvalue().splitlines()
+    assert json.loads(lines[0])['broadcast'] == '10.255.255.255'
+    assert ' ' not in lines[0]
+    assert json.loads(lines[1])['error'] == 'Invalid CIDR Address: foo'
+
+    out = io.StringIO()
+    assert write_csv(records, out) == 2
+    lines = out.getvalue().splitlines()
+    assert lines[0].startswith('cidr,network_id,netmask')
+    assert lines[1].startswith('10.0.0.0/8,10.0.0.0,255.0.0.0,10.255.255.255')
+    assert lines[2] == 'foo,,,,,,,,Invalid CIDR Address: foo'
+
+@pytest.mark.parametrize('output_format', ['jsonl', 'csv'])
+def test_cli_batch(tmp_path, capsys, output_format: str):
+    path = tmp_path / 'input.txt'
+    path.write_text('10.0.0.0/8\n300.0.0.0/8\n192.168.1.0/24\n')
+
+    ipcalc.main(['--batch', str(path), '--format', output_format])
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == (3 if output_format == 'jsonl' else 4)
+
+@pytest.mark.parametrize('jobs', ['1', '2'])
+def test_cli_batch_missing(tmp_path, jobs: str):
+    with pytest.raises(SystemExit, match='missing.txt'):
+        ipcalc.main(['--batch', str(tmp_path / 'missing.txt'), '--jobs', jobs])
+
+@pytest.mark.parametrize('arguments', [['--batch', '--jobs', '-1'], ['--batch', '--jobs', 'x'], ['annotate', '--table', 'x.csv', '--jobs', '-1']])
+def test_cli_jobs_invalid(capsys, arguments: list):
+    with pytest.raises(SystemExit) as exit_info:
+        ipcalc.main(arguments)
+    assert exit_info.value.code == 2
+    assert 'invalid job count' in capsys.readouterr().err
+
+def test_cli_batch_stdin(monkeypatch, capsys):
+    monkeypatch.setattr('sys.stdin', io.StringIO('10.0.0.0/8\n'))
+    ipcalc.main(['--batch'])
+    assert json.loads(capsys.readouterr().out)['network_id'] == '10.0.0.0'
+
+def test_cli_batch_jobs(tmp_path, capsys):
+    path = tmp_path / 'input.txt'
+    path.write_text('\n'.join(f'10.0.{i}.1/24' for i in range(50)))
+
+    ipcalc.main(['--batch', str(path), '--jobs', '2'])
+    lines = capsys.readouterr().out.splitlines()
+    assert [json.loads(line)['network_id'] for line in lines] == [f'10.0.{i}.0' for i in range(50)]
+
+def test_cli_batch_fields(tmp_path, capsys):
+    path = tmp_path / 'input.txt'
+    path.write_text('10.0.0.0/8\n')
+
+    ipcalc.main(['--batch', str(path), '--fields', 'network_id,binary'])
+    assert json.loads(capsys.readouterr().out) == {
+        'cidr': '10.0.0.0/8',
+        'network_id': '10.0.0.0',
+        'binary.network_id': '00001010.00000000.00000000.00000000',
+        'binary.netmask': '11111111.00000000.00000000.00000000',
+        'binary.broadcast': '00001010.11111111.11111111.11111111'
+    }
+
+@pytest.mark.parametrize('jobs', ['1', '2'])
+def test_cli_batch_cache(tmp_path, capsys, jobs: str):
+    path = tmp_path / 'input.txt'
+    path.write_text('\n'.join(f'10.0.0.{i}/24' for i in range(20)))
+
+    ipcalc.main(['--batch', str(path), '--cache', '16', '--jobs', jobs])
+    assert not cache.cache_enabled()
+    captured = capsys.readouterr()
+    assert len(captured.out.splitlines()) == 20
+    if jobs == '1':
+        assert captured.err == 'cache: 19 hits, 1 misses, 1/16 entries\n'
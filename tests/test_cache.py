@@ -0,0 +1,44 @@
+import sys
+import os
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from subnet_calc import cache
+from subnet_calc.wrapper import calc_subnet
+
+@pytest.fixture
+def enabled_cache():
+    cache.enable_cache(maxsize=2)
+    yield
+    cache.disable_cache()
+
+def test_cache_disabled_by_default():
+    calc_subnet('10.0.0.1/8').to_dict()
+    assert cache.cache_enabled() is False
+    assert cache.cache_info() == (0, 0, 0, 0)
+
+def test_cache_shares_network(enabled_cache):
+    first = calc_subnet('10.0.0.1/8')
+    second = calc_subnet('10.0.0.5/8')
+    assert cache.cache_info() == (1, 1, 2, 1)
+
+    # Both addresses are in the same network, so the network fields are shared but the input fields are not
+    assert first.to_dict()['network'] == second.to_dict()['network']
+    assert first.input['address'] == '10.0.0.1'
+    assert second.input['address'] == '10.0.0.5'
+
+def test_cache_results_match(enabled_cache):
+    addresses = ['10.0.0.1/8', '10.0.0.5/8', '10.0.0.5/24', '8.8.8.8/32', '10.0.0.9/8', 'foo']
+    cached = [calc_subnet(address).to_dict() for address in addresses]
+    cache.disable_cache()
+    assert cached == [calc_subnet(address).to_dict() for address in addresses]
+
+def test_cache_eviction(enabled_cache):
+    for address in ['10.0.0.0/8', '11.0.0.0/8', '12.0.0.0/8', '10.0.0.0/8']:
+        calc_subnet(address)
+    info = cache.cache_info()
+    assert (info.hits, info.misses, info.currsize) == (0, 4, 2)
+
+    cache.cache_clear()
+    assert cache.cache_info() == (0, 0, 2, 0)
@@ -0,0 +1,76 @@
+import sys
+import os
+import io
+import json
+import subprocess
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from subnet_calc import cache
+from subnet_calc.wrapper import calc_subnet
+import ipcalc
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+def run_lines(monkeypatch, capsys, lines: list[str], *options: str):
+    monkeypatch.setattr('sys.stdin', io.StringIO(''.join(f'{line}\n' for line in lines)))
+    try:
+        ipcalc.main(['--coprocess', *options])
+    finally:
+        cache.disable_cache()
+    return [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+def test_calc(monkeypatch, capsys):
+    results = run_lines(monkeypatch, capsys, ['10.1.2.3/24', 'bad', '192.168.0.0/30'])
+    assert results == [calc_subnet(cidr).to_dict() for cidr in ('10.1.2.3/24', 'bad', '192.168.0.0/30')]
+
+def test_fields(monkeypatch, capsys):
+    results = run_lines(monkeypatch, capsys, ['10.0.0.0/8', 'fields network_id,broadcast', '10.0.0.0/8', 'fields nope', 'fields', '10.0.0.0/8'],
+                        '--fields', 'hosts')
+    assert results[0] == calc_subnet('10.0.0.0/8', ['hosts']).to_dict()
+    assert results[1] == {'fields': ['network_id', 'broadcast']}
+    assert results[2] == calc_subnet('10.0.0.0/8', ['network_id', 'broadcast']).to_dict()
+    assert results[3] == {'error': 'unknown field: nope'}
+    assert results[4] == {'fields': None}
+    assert results[5] == calc_subnet('10.0.0.0/8').to_dict()
+
+@pytest.mark.parametrize(
+    'line,expected',
+    [
+        ('range 10.0.0.1 10.0.0.7',     {'output': ['10.0.0.1/32', '10.0.0.2/31', '10.0.0.4/30']}),
+        ('subnets 10.0.0.0/30 31',      {'output': ['10.0.0.0/31', '10.0.0.2/31']}),
+        ('range 10.0.0.9 10.0.0.7',     {'error': 'ipcalc range: The range starts after it ends: 10.0.0.9 10.0.0.7', 'output': []}),
+        ('range --batch',               {'output': []}), # Does not read the rest of the input
+        ('serve',                       {'error': 'serve is not available in co-process mode'}),
+        ('subnets "10.0.0.0/8',         {'error': 'No closing quotation'}),
+        ('',                            {'error': 'Empty line'}),
+    ]
+)
+def test_commands(monkeypatch, capsys, line: str, expected: dict):
+    results = run_lines(monkeypatch, capsys, [line, '10.0.0.0/8'])
+    assert results == [expected, calc_subnet('10.0.0.0/8').to_dict()]
+
+@pytest.mark.parametrize('line', ['range --batch /missing/ranges.txt', 'summarize /missing/prefixes.txt'])
+def test_failing_command(monkeypatch, capsys, line: str):
+    results = run_lines(monkeypatch, capsys, [line, '10.0.0.0/8'])
+    assert len(results) == 2
+    assert '/missing/' in results[0]['error']
+    assert results[1] == calc_subnet('10.0.0.0/8').to_dict()
+
+def test_quit(monkeypatch, capsys):
+    assert len(run_lines(monkeypatch, capsys, ['10.0.0.0/8', 'quit', '10.0.0.0/8'])) == 1
+
+def test_interactive():
+    # Each answer must arrive before the next line is sent, which only works if every result is flushed
+    process = subprocess.Popen([sys.executable, '-c', 'import ipcalc; ipcalc.main()', '--coprocess'], cwd=ROOT,
+                               stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+    try:
+        for cidr in ('10.0.0.0/8', '172.16.0.0/12'):
+            process.stdin.write(f'{cidr}\n')
+            process.stdin.flush()
+            assert json.loads(process.stdout.readline()) == calc_subnet(cidr).to_dict()
+        process.stdin.close()
+        assert process.wait(timeout=10) == 0
+    finally:
+        process.kill()
@@ -0,0 +1,65 @@
+import sys
+import os
+import ipaddress
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from subnet_calc import calculate
+from subnet_calc.hosts import hosts
+
+@pytest.mark.parametrize(
+    'cidr,expected',
+    [
+        ('192.168.1.0/29',   ['192.168.1.1', '192.168.1.2', '192.168.1.3', '192.168.1.4', '192.168.1.5', '192.168.1.6']),
+        ('192.168.1.5/30',   ['192.168.1.5', '192.168.1.6']), # Host bits are ignored
+        ('10.0.0.0/31',      ['10.0.0.0', '10.0.0.1']), # RFC 3021 point-to-point link
+        ('10.0.0.7/32',      ['10.0.0.7']),
+    ]
+)
+def test_hosts(cidr: str, expected: list):
+    results = hosts(cidr)
+    assert len(results) == len(expected)
+    assert list(results) == expected
+    assert list(reversed(results)) == expected[::-1]
+
+@pytest.mark.parametrize('cidr', ['192.168.0.0/16', '10.0.0.0/8', '172.16.4.0/22'])
+def test_matches_ipv4_edge(cidr: str):
+    results = hosts(cidr)
+    assert results[0] == calculate.ipv4_edge(cidr, True)
+    assert results[-1] == calculate.ipv4_edge(cidr, False)
+
+def test_indexing_and_slicing():
+    results = hosts('10.0.0.0/8')
+    assert len(results) == 2**24 - 2
+    assert results[0] == '10.0.0.1'
+    assert results[255] == '10.0.1.0'
+    assert results[-1] == '10.255.255.254'
+    assert list(results[10:40:10]) == ['10.0.0.11', '10.0.0.21', '10.0.0.31']
+    assert len(results[::2]) == 2**23 - 1
+    with pytest.raises(IndexError):
+        results[2**24 - 2]
+
+def test_membership():
+    results = hosts('10.0.0.0/8')
+    assert '10.200.3.4' in results
+    assert (10 << 24) | 5 in results
+    assert '10.0.0.0' not in results
+    assert '10.255.255.255' not in results
+    assert '11.0.0.1' not in results
+    assert results.index('10.0.1.0') == 255
+    with pytest.raises(ValueError):
+        results.index('11.0.0.1')
+
+def test_chunks():
+    results = hosts('10.0.0.0/22')
+    ints = list(results.chunks(300))
+    assert [len(chunk) for chunk in ints] == [300, 300, 300, 122]
+    assert [value for chunk in ints for value in chunk] == list(results.values)
+
+    strings = [address for chunk in results.chunks(300, strings=True) for address in chunk]
+    assert strings == [str(host) for host in ipaddress.ip_network('10.0.0.0/22').hosts()]
+    assert [address for chunk in results[::7].chunks(50, strings=True) for address in chunk] == strings[::7]
+
+    with pytest.raises(ValueError):
+        next(results.chunks(0))
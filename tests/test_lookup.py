@@ -0,0 +1,141 @@
+import sys
+import os
+import random
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from subnet_calc.lookup import PrefixTable, MutablePrefixTable
+from subnet_calc.prefix import Prefix
+
+TABLE = [
+    ('0.0.0.0/0',         'default'),
+    ('10.0.0.0/8',        'ten'),
+    ('10.1.0.0/16',       'ten-one'),
+    ('10.1.2.0/24',       'ten-one-two'),
+    ('10.1.2.128/25',     'upper-half'),
+    ('10.1.2.200/32',     'host'),
+    ('192.168.0.0/15',    'private'),
+]
+
+@pytest.mark.parametrize(
+    'ip,expected',
+    [
+        ('10.1.2.200',      ('10.1.2.200/32', 'host')),
+        ('10.1.2.201',      ('10.1.2.128/25', 'upper-half')),
+        ('10.1.2.1',        ('10.1.2.0/24', 'ten-one-two')),
+        ('10.1.3.1',        ('10.1.0.0/16', 'ten-one')),
+        ('10.2.0.0',        ('10.0.0.0/8', 'ten')),
+        ('192.169.255.255', ('192.168.0.0/15', 'private')),
+        ('8.8.8.8',         ('0.0.0.0/0', 'default')),
+    ]
+)
+def test_lookup(ip: str, expected):
+    prefix, payload = PrefixTable(TABLE).lookup(ip)
+    assert (str(prefix), payload) == expected
+
+def test_lookup_no_match():
+    table = PrefixTable(['10.0.0.0/8'])
+    assert table.lookup('11.0.0.0') is None
+    assert table.lookup_many(['11.0.0.0', '10.9.9.9']) == [None, (Prefix.parse('10.0.0.0/8'), None)]
+
+def test_lookup_indexes():
+    table = PrefixTable(TABLE)
+    ips = ['8.8.8.8', '10.1.2.3', '172.16.0.1']
+    indexes = table.lookup_indexes(ips)
+    assert [None if index is None else table.entry(index) for index in indexes] == table.lookup_many(ips)
+    assert PrefixTable(['10.0.0.0/8']).lookup_indexes(['11.0.0.0', '10.0.0.1']) == [None, 0]
+
+@pytest.mark.parametrize('table_type', [PrefixTable, MutablePrefixTable])
+@pytest.mark.parametrize('ip', [-1, 2 ** 32, 2 ** 32 + 0x0A000001])
+def test_lookup_out_of_range(table_type, ip: int):
+    table = table_type(['0.0.0.0/0', '255.255.0.0/16'])
+    with pytest.raises(ValueError):
+        table.lookup(ip)
+    with pytest.raises(ValueError):
+        table.lookup_many([0, ip])
+    if table_type is PrefixTable:
+        with pytest.raises(ValueError):
+            table.lookup_indexes([ip])
+
+def test_duplicates_and_host_bits():
+    # Host bits are cleared, and the last payload for a network wins
+    table = PrefixTable([('10.1.2.3/8', 'first'), ('10.0.0.0/8', 'second')])
+    assert len(table) == 1
+    assert table.lookup('10.200.0.1') == (Prefix.parse('10.0.0.0/8'), 'second')
+
+def test_lookup_matches_linear_scan():
+    rng = random.Random(7)
+    prefixes = []
+    for _ in range(2000):
+        length = rng.choice([rng.randint(1, 32), rng.randint(17, 32), 24])
+        prefix = Prefix(rng.getrandbits(32), length)
+        prefixes.append((Prefix(prefix.network, length), len(prefixes)))
+    table = PrefixTable(prefixes)
+
+    # Probe random addresses plus addresses inside each prefix
+    probes = [rng.getrandbits(32) for _ in range(500)] + [prefix.network | rng.getrandbits(32 - prefix.length) for prefix, _ in prefixes[:500]]
+    latest = {}
+    for prefix, payload in prefixes:
+        latest[(prefix.network, prefix.length)] = payload
+
+    expected = []
+    for ip in probes:
+        matches = [(length, network) for network, length in latest if ip & Prefix(0, length).netmask == network]
+        if matches:
+            length, network = max(matches)
+            expected.append((Prefix(network, length), latest[(network, length)]))
+        else:
+            expected.append(None)
+    assert table.lookup_many(probes) == expected
+    assert [table.lookup(ip) for ip in probes] == expected
+
+def test_mutable_matches_static():
+    rng = random.Random(11)
+    table = MutablePrefixTable()
+    current = {}
+    for step in range(3000):
+        if current and rng.random() < 0.3:
+            key = rng.choice(list(current))
+            table.delete(key)
+            del current[key]
+        else:
+            length = rng.randint(0, 32)
+            key = str(Prefix(Prefix(rng.getrandbits(32), length).network, length))
+            table.insert(key, step)
+            current[key] = step
+
+    static = PrefixTable(current.items())
+    probes = [rng.getrandbits(32) for _ in range(2000)] + [Prefix.parse(key).network for key in current]
+    assert len(table) == len(static) == len(current)
+    assert table.lookup_many(probes) == static.lookup_many(probes)
+    assert sorted(str(prefix) for prefix, _ in table) == sorted(current)
+
+def test_mutable_snapshot_isolation():
+    table = MutablePrefixTable([('10.0.0.0/8', 'ten')])
+    before = table.snapshot()
+    version = table.apply([('insert', '10.1.0.0/16', 'lab'), ('delete', '10.0.0.0/8')])
+
+    assert version == before.version + 1
+    assert before.lookup('10.1.2.3') == (Prefix.parse('10.0.0.0/8'), 'ten')
+    assert table.lookup('10.1.2.3') == (Prefix.parse('10.1.0.0/16'), 'lab')
+    assert table.lookup('10.2.0.0') is None
+
+def test_mutable_apply_is_atomic():
+    table = MutablePrefixTable(['10.0.0.0/8'])
+    with pytest.raises(KeyError):
+        table.apply([('insert', '192.168.0.0/16'), ('delete', '172.16.0.0/12')])
+    assert len(table) == 1
+    assert table.lookup('192.168.1.1') is None
+
+def test_mutable_update_and_prune():
+    table = MutablePrefixTable()
+    table.insert('10.1.2.3/32', 'a')
+    table.insert('10.1.2.3/32', 'b')
+    assert len(table) == 1
+    assert table.lookup('10.1.2.3') == (Prefix.parse('10.1.2.3/32'), 'b')
+
+    table.delete('10.1.2.3/32')
+    assert len(table) == 0
+    assert table.snapshot()._root is None
+    assert list(table) == []
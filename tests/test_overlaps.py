@@ -0,0 +1,85 @@
+import sys
+import os
+import random
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from subnet_calc import aggregate
+from subnet_calc.overlaps import find_overlaps
+from subnet_calc.prefix import Prefix
+import ipcalc
+
+def _pairs(results):
+    return [(str(overlap.outer), overlap.outer_label, str(overlap.inner), overlap.inner_label, overlap.kind) for overlap in results]
+
+def test_find_overlaps():
+    prefixes = ['10.0.0.0/8', '192.168.0.0/24', '10.1.0.0/16', '10.1.2.3/24', '10.0.0.0/8', '11.0.0.0/8']
+    assert _pairs(find_overlaps(prefixes)) == [
+        ('10.0.0.0/8',  1, '10.0.0.0/8',  5, 'duplicate'),
+        ('10.0.0.0/8',  1, '10.1.0.0/16', 3, 'nested'),
+        ('10.0.0.0/8',  5, '10.1.0.0/16', 3, 'nested'),
+        ('10.0.0.0/8',  1, '10.1.2.0/24', 4, 'nested'),
+        ('10.0.0.0/8',  5, '10.1.2.0/24', 4, 'nested'),
+        ('10.1.0.0/16', 3, '10.1.2.0/24', 4, 'nested'),
+    ]
+
+def test_labels():
+    prefixes = [('10.0.0.0/8', 'corp'), ('10.0.0.0/24', 'lab'), ('10.0.1.0/24', 'office')]
+    assert _pairs(find_overlaps(prefixes)) == [
+        ('10.0.0.0/8', 'corp', '10.0.0.0/24', 'lab', 'nested'),
+        ('10.0.0.0/8', 'corp', '10.0.1.0/24', 'office', 'nested'),
+    ]
+
+def test_no_overlaps():
+    # Adjacent prefixes do not overlap
+    assert list(find_overlaps(['10.0.0.0/24', '10.0.1.0/24', '10.0.2.0/23', '0.0.0.0/5'])) == []
+
+@pytest.mark.parametrize('use_numpy', [True, False])
+def test_matches_all_pairs(monkeypatch, use_numpy: bool):
+    if use_numpy:
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(aggregate, 'np', None) # The sort is aggregate.sorted_order
+
+    rng = random.Random(8)
+    prefixes = [Prefix((10 << 24) | rng.getrandbits(16) << 8, rng.randint(12, 24)) for _ in range(300)]
+    prefixes = [Prefix(prefix.network, prefix.length) for prefix in prefixes]
+    expected = set()
+    for i, first in enumerate(prefixes, 1):
+        for j, second in enumerate(prefixes, 1):
+            if i != j and first.length <= second.length and first.network <= second.network <= first.broadcast:
+                if first.length < second.length or i < j: # Count each duplicate pair once
+                    expected.add((i, j))
+
+    found = [(overlap.outer_label, overlap.inner_label) for overlap in find_overlaps(prefixes)]
+    assert len(found) == len(set(found))
+    assert set(found) == expected
+
+def test_invalid():
+    with pytest.raises(ValueError):
+        find_overlaps(['10.0.0.0/8', 'nope'])
+
+def test_cli_check_overlaps(tmp_path, capsys):
+    path = tmp_path / 'inventory.txt'
+    path.write_text('10.0.0.0/8\n\n192.168.0.0/24\nnope\n10.1.0.0/16\n')
+
+    with pytest.raises(SystemExit) as exit_info:
+        ipcalc.main(['--check-overlaps', str(path)])
+    assert exit_info.value.code == 1
+    captured = capsys.readouterr()
+    assert captured.out == 'line 5: 10.1.0.0/16 is nested in 10.0.0.0/8 (line 1)\n'
+    assert captured.err == 'line 4: Invalid CIDR Address: nope\n1 overlapping pairs found\n'
+
+def test_cli_check_overlaps_missing(tmp_path, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        ipcalc.main(['--check-overlaps', str(tmp_path / 'missing.txt')])
+    assert exit_info.value.code == 2
+    assert 'missing.txt' in capsys.readouterr().err
+
+def test_cli_check_overlaps_clean(tmp_path, capsys):
+    path = tmp_path / 'inventory.txt'
+    path.write_text('10.0.0.0/8\n11.0.0.0/8\n')
+
+    ipcalc.main(['--check-overlaps', str(path)])
+    assert capsys.readouterr().out == ''
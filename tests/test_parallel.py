@@ -0,0 +1,47 @@
+import sys
+import os
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from subnet_calc.bulk import calc_records
+from subnet_calc.parallel import calc_subnets_parallel, chunked
+
+ADDRESSES = [f'10.{i // 256}.{i % 256}.1/{i % 30 + 1}' for i in range(2000)] + ['not an address']
+
+@pytest.mark.parametrize(
+    'items,size,expected',
+    [
+        (range(5),  2,  [[0, 1], [2, 3], [4]]),
+        (range(4),  4,  [[0, 1, 2, 3]]),
+        ([],        3,  []),
+    ]
+)
+def test_chunked(items, size: int, expected):
+    assert list(chunked(items, size)) == expected
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_parallel_ordered(jobs: int):
+    expected = list(calc_records(ADDRESSES))
+    assert list(calc_subnets_parallel(ADDRESSES, jobs=jobs, chunk_size=100, max_in_flight=3)) == expected
+
+def test_parallel_unordered():
+    expected = list(calc_records(ADDRESSES))
+    results = list(calc_subnets_parallel(iter(ADDRESSES), jobs=2, chunk_size=64, ordered=False))
+    key = lambda record: record['cidr']
+    assert sorted(results, key=key) == sorted(expected, key=key)
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_parallel_cache_restored(jobs: int):
+    from subnet_calc import cache
+
+    assert list(calc_subnets_parallel(ADDRESSES, jobs=jobs, cache_size=8)) == list(calc_records(ADDRESSES))
+    assert not cache.cache_enabled()
+
+    cache.enable_cache(4)
+    try:
+        previous = cache.cache_info()
+        list(calc_subnets_parallel(ADDRESSES[:10], jobs=1, cache_size=8))
+        assert cache.cache_info() == previous
+    finally:
+        cache.disable_cache()
@@ -0,0 +1,98 @@
+import sys
+import os
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from subnet_calc.prefix import Prefix, ip_to_int, int_to_ip, normalise_entry
+from subnet_calc.calculate import ipv4_net_id, ipv4_broadcast, calc_ipv4_mask, ipv4_edge
+from subnet_calc.helpers import ipv4_wildcard, ipv4_host_count
+
+@pytest.mark.parametrize(
+    'address,value',
+    [
+        ('0.0.0.0',          0),
+        ('255.255.255.255',  0xFFFFFFFF),
+        ('192.168.1.1',      0xC0A80101),
+        ('10.0.0.1',         0x0A000001),
+    ]
+)
+def test_int_conversion(address: str, value: int):
+    assert ip_to_int(address) == value
+    assert int_to_ip(value) == address
+
+@pytest.mark.parametrize(
+    'cidr,address,length',
+    [
+        ('192.168.1.10/24',  0xC0A8010A, 24),
+        ('0.0.0.0/0',        0,          0),
+        ('10.0.0.1/32',      0x0A000001, 32),
+
+        # Invalid inputs
+        ('192.168.1/24',     pytest.raises(ValueError), None),
+        ('192.168.1.1/33',   pytest.raises(ValueError), None),
+        ('',                 pytest.raises(ValueError), None),
+    ]
+)
+def test_prefix_parse(cidr, address, length):
+    if isinstance(address, int):
+        prefix = Prefix.parse(cidr)
+        assert (prefix.address, prefix.length) == (address, length)
+        assert str(prefix) == cidr
+    else:
+        with address:
+            Prefix.parse(cidr)
+
+@pytest.mark.parametrize(
+    'cidr',
+    ['192.168.0.10/24', '10.0.0.5/8', '172.16.5.10/29', '100.64.0.1/10', '0.0.0.0/0', '1.2.3.4/32']
+)
+def test_prefix_matches_string_api(cidr: str):
+    prefix = Prefix.parse(cidr)
+    assert ipv4_net_id(prefix) == ipv4_net_id(cidr)
+    assert ipv4_broadcast(prefix) == ipv4_broadcast(cidr)
+    assert calc_ipv4_mask(prefix) == calc_ipv4_mask(cidr)
+    assert ipv4_wildcard(prefix) == ipv4_wildcard(cidr)
+    assert ipv4_host_count(prefix) == ipv4_host_count(cidr)
+    if 0 < prefix.length < 31:
+        assert ipv4_edge(prefix, True) == ipv4_edge(cidr, True)
+        assert ipv4_edge(prefix, False) == ipv4_edge(cidr, False)
+
+@pytest.mark.parametrize(
+    'address,expected',
+    [
+        ('192.168.1.10/255.255.255.0',  '192.168.1.10/24'),
+        ('10.0.0.0/255.0.0.0',          '10.0.0.0/8'),
+        ('10.0.0.0/0.0.0.0',            '10.0.0.0/0'),
+        ('10.0.0.0/255.0.255.0',        pytest.raises(ValueError)),  # Discontiguous mask
+        ('10.0.0/255.0.0.0',            pytest.raises(ValueError)),  # Too few octets
+    ]
+)
+def test_prefix_parse_netmask(address, expected):
+    if isinstance(expected, str):
+        assert str(Prefix.parse(address)) == expected
+    else:
+        with expected:
+            Prefix.parse(address)
+
+def test_prefix_immutable():
+    import pickle
+
+    prefix = Prefix.parse('10.1.2.3/8')
+    with pytest.raises(AttributeError):
+        prefix.length = 16
+    with pytest.raises(AttributeError):
+        del prefix.address
+    assert {prefix: 'corp'}[Prefix.parse('10.1.2.3/8')] == 'corp'
+    assert pickle.loads(pickle.dumps(prefix)) == prefix
+
+@pytest.mark.parametrize(
+    'item,expected',
+    [
+        ('10.1.2.3/8',                          (0x0A000000, 8, None)),
+        (Prefix.parse('10.1.2.3/16'),           (0x0A010000, 16, None)),
+        (('192.168.1.7/24', 'lab'),             (0xC0A80100, 24, 'lab')),
+    ]
+)
+def test_normalise_entry(item, expected):
+    assert normalise_entry(item) == expected
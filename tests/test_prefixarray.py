@@ -0,0 +1,97 @@
+import sys
+import os
+import random
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from subnet_calc import calculate, helpers, prefixarray
+from subnet_calc.prefix import Prefix, int_to_ip
+from subnet_calc.prefixarray import PrefixArray, COLUMNS
+
+CIDRS = ['192.168.1.77/24', '10.0.0.0/8', '10.0.0.0/16', '1.2.3.4/32', '0.0.0.0/0', '172.16.5.5/31', '10.0.0.0/255.255.0.0']
+
+def test_items():
+    prefixes = PrefixArray(CIDRS)
+    assert len(prefixes) == len(CIDRS)
+    assert [str(prefix) for prefix in prefixes] == [str(Prefix.parse(cidr)) for cidr in CIDRS]
+    assert prefixes[0] == Prefix.parse('192.168.1.77/24')
+    assert prefixes[-1] == Prefix.parse('10.0.0.0/16')
+    assert prefixes.nbytes == 5 * len(CIDRS)
+
+def test_append_and_extend():
+    prefixes = PrefixArray()
+    prefixes.append('10.0.0.0/8')
+    prefixes.append(Prefix.parse('10.1.0.0/16'))
+    prefixes.extend(PrefixArray(['10.2.0.0/16']))
+    prefixes.extend(['10.3.0.0/16'])
+    assert [str(prefix) for prefix in prefixes] == ['10.0.0.0/8', '10.1.0.0/16', '10.2.0.0/16', '10.3.0.0/16']
+
+@pytest.mark.parametrize('cidr', ['10.0.0.0', '10.0.0.0/33', '256.0.0.0/8', '10.0.0.0/255.0.255.0'])
+def test_invalid(cidr: str):
+    with pytest.raises(ValueError):
+        PrefixArray(['10.0.0.0/8', cidr])
+
+def test_slicing():
+    prefixes = PrefixArray(CIDRS)
+    assert isinstance(prefixes[1:3], PrefixArray)
+    assert list(prefixes[1:3]) == list(prefixes)[1:3]
+    assert list(prefixes[::-2]) == list(prefixes)[::-2]
+    assert prefixes[:] == prefixes
+
+def test_sort():
+    prefixes = PrefixArray(CIDRS)
+    expected = sorted(prefixes, key=lambda prefix: (prefix.address, prefix.length))
+    prefixes.sort()
+    assert list(prefixes) == expected
+    prefixes.sort(reverse=True)
+    assert list(prefixes) == expected[::-1]
+
+def test_from_arrays():
+    prefixes = PrefixArray(CIDRS)
+    assert PrefixArray.from_arrays(prefixes.addresses, prefixes.lengths) == prefixes
+    with pytest.raises(ValueError):
+        PrefixArray.from_arrays([1, 2], [8])
+    with pytest.raises(ValueError):
+        PrefixArray.from_arrays([1], [33])
+
+def _scalar(cidr: str):
+    # The same columns, from the scalar functions
+    prefix = Prefix.parse(cidr)
+    try:
+        first, last = calculate.ipv4_edge(prefix, True), calculate.ipv4_edge(prefix, False)
+        has_hosts = 1
+    except ValueError:
+        first = last = '0.0.0.0'
+        has_hosts = 0
+    return {
+        'network_id': calculate.ipv4_net_id(prefix),
+        'netmask': calculate.calc_ipv4_mask(prefix),
+        'broadcast': calculate.ipv4_broadcast(prefix),
+        'wildcard': helpers.ipv4_wildcard(prefix),
+        'first': first,
+        'last': last,
+        'total': helpers.ipv4_host_count(prefix),
+        'has_hosts': has_hosts,
+    }
+
+@pytest.mark.parametrize('use_numpy', [True, False])
+def test_calc_subnets(monkeypatch, use_numpy: bool):
+    if use_numpy:
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(prefixarray, 'np', None)
+
+    rng = random.Random(3)
+    cidrs = CIDRS + [f'{int_to_ip(rng.getrandbits(32))}/{rng.randint(0, 32)}' for _ in range(200)]
+    results = PrefixArray(cidrs).calc_subnets()
+    assert tuple(results) == COLUMNS
+    for index, cidr in enumerate(cidrs):
+        row = {column: values[index] if column in ('total', 'has_hosts') else int_to_ip(values[index]) for column, values in results.items()}
+        assert row == _scalar(cidr)
+
+def test_calc_subnets_columns():
+    results = PrefixArray(['10.1.2.3/8']).calc_subnets(['broadcast'])
+    assert list(results) == ['broadcast']
+    with pytest.raises(ValueError):
+        PrefixArray().calc_subnets(['nope'])
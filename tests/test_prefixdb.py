@@ -0,0 +1,93 @@
+import sys
+import os
+import random
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from subnet_calc.lookup import PrefixTable
+from subnet_calc.prefix import Prefix
+from subnet_calc.prefixdb import PrefixDatabase, save_prefixes
+
+TABLE = [
+    ('0.0.0.0/0',         'default'),
+    ('10.0.0.0/8',        'ten'),
+    ('10.1.0.0/16',       None),
+    ('10.1.2.0/24',       'ten-one-two'),
+    ('10.1.2.128/25',     'upper-half'),
+    ('10.1.2.200/32',     'host'),
+    ('192.168.0.0/15',    'private'),
+]
+
+@pytest.fixture
+def database(tmp_path):
+    path = str(tmp_path / 'prefixes.db')
+    save_prefixes(path, TABLE)
+    with PrefixDatabase(path) as database:
+        yield database
+
+@pytest.mark.parametrize(
+    'ip,expected',
+    [
+        ('10.1.2.200',      ['10.1.2.200/32', '10.1.2.128/25', '10.1.2.0/24', '10.1.0.0/16', '10.0.0.0/8', '0.0.0.0/0']),
+        ('10.1.2.1',        ['10.1.2.0/24', '10.1.0.0/16', '10.0.0.0/8', '0.0.0.0/0']),
+        ('10.1.3.1',        ['10.1.0.0/16', '10.0.0.0/8', '0.0.0.0/0']),
+        ('192.169.255.255', ['192.168.0.0/15', '0.0.0.0/0']),
+        ('8.8.8.8',         ['0.0.0.0/0']),
+    ]
+)
+def test_containing(database, ip: str, expected):
+    assert [str(prefix) for prefix, payload in database.containing(ip)] == expected
+
+def test_lookup(database):
+    assert database.lookup('10.1.2.201') == (Prefix.parse('10.1.2.128/25'), 'upper-half')
+    assert database.lookup('10.1.3.1') == (Prefix.parse('10.1.0.0/16'), None)
+    assert len(database) == len(TABLE)
+    assert [(str(prefix), payload) for prefix, payload in database] == TABLE
+
+def test_no_match(tmp_path):
+    path = str(tmp_path / 'prefixes.db')
+    save_prefixes(path, ['10.0.0.0/8', ('10.0.0.0/8', 'last wins')])
+    with PrefixDatabase(path) as database:
+        assert database.lookup_many(['9.255.255.255', '10.0.0.1', '11.0.0.0']) == [None, (Prefix.parse('10.0.0.0/8'), 'last wins'), None]
+
+def test_empty(tmp_path):
+    path = str(tmp_path / 'prefixes.db')
+    assert save_prefixes(path, []) == 0
+    with PrefixDatabase(path) as database:
+        assert len(database) == 0
+        assert database.lookup('1.2.3.4') is None
+
+def test_matches_prefix_table(tmp_path):
+    rng = random.Random(5)
+    prefixes = []
+    for index in range(2000):
+        length = rng.randint(0, 32)
+        prefixes.append((Prefix(rng.getrandbits(32) & (0xFFFFFFFF << (32 - length)), length), f'payload {index}'))
+    # Nest some prefixes inside others
+    prefixes += [(Prefix(prefix.network, min(prefix.length + 3, 32)), 'nested') for prefix, _ in prefixes[:500]]
+
+    path = str(tmp_path / 'prefixes.db')
+    save_prefixes(path, prefixes)
+    table = PrefixTable(prefixes)
+    ips = [rng.getrandbits(32) for _ in range(5000)] + [prefix.network for prefix, _ in prefixes]
+    with PrefixDatabase(path) as database:
+        assert database.lookup_many(ips) == table.lookup_many(ips)
+
+@pytest.mark.parametrize(
+    'content',
+    [
+        b'',
+        b'not a prefix database',
+        b'IPV4PFX\0\x01\0\0\0\x10\0\0\0',
+    ]
+)
+def test_invalid_file(tmp_path, content: bytes):
+    path = tmp_path / 'prefixes.db'
+    path.write_bytes(content)
+    with pytest.raises(ValueError):
+        PrefixDatabase(str(path))
+
+def test_payload_type(tmp_path):
+    with pytest.raises(TypeError):
+        save_prefixes(str(tmp_path / 'prefixes.db'), [('10.0.0.0/8', 1)])
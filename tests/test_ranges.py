@@ -0,0 +1,90 @@
+import sys
+import os
+import ipaddress
+import io
+import random
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from subnet_calc.prefix import int_to_ip
+from subnet_calc.ranges import range_to_cidrs, range_prefixes, cidr_to_range, parse_range, convert_lines
+import ipcalc
+
+@pytest.mark.parametrize(
+    'start,end,expected',
+    [
+        ('10.0.0.0',    '10.0.0.255',       ['10.0.0.0/24']),
+        ('10.0.0.1',    '10.0.0.7',         ['10.0.0.1/32', '10.0.0.2/31', '10.0.0.4/30']),
+        ('10.0.0.5',    '10.0.0.5',         ['10.0.0.5/32']),
+        ('0.0.0.0',     '255.255.255.255',  ['0.0.0.0/0']),
+        ('0.0.0.1',     '255.255.255.254',  None), # Checked against ipaddress below
+        (0,             1,                  ['0.0.0.0/31']),
+    ]
+)
+def test_range_to_cidrs(start, end, expected: list):
+    results = [str(prefix) for prefix in range_to_cidrs(start, end)]
+    if expected is None:
+        start, end = ipaddress.IPv4Address(start), ipaddress.IPv4Address(end)
+        expected = [str(network) for network in ipaddress.summarize_address_range(start, end)]
+    assert results == expected
+
+def test_matches_ipaddress():
+    rng = random.Random(12)
+    for _ in range(500):
+        start = rng.getrandbits(32)
+        end = min(start + rng.getrandbits(rng.randint(0, 32)), 2**32 - 1)
+        expected = ipaddress.summarize_address_range(ipaddress.IPv4Address(start), ipaddress.IPv4Address(end))
+        assert [str(prefix) for prefix in range_to_cidrs(start, end)] == [str(network) for network in expected]
+
+@pytest.mark.parametrize('start,end', [('10.0.0.2', '10.0.0.1'), ('10.0.0.256', '10.0.1.0'), (-1, 5), (0, 2**32)])
+def test_range_to_cidrs_invalid(start, end):
+    with pytest.raises(ValueError):
+        range_to_cidrs(start, end)
+
+@pytest.mark.parametrize(
+    'cidr,expected',
+    [
+        ('10.1.2.3/8',          ('10.0.0.0', '10.255.255.255')),
+        ('192.168.1.7/32',      ('192.168.1.7', '192.168.1.7')),
+        ('0.0.0.0/0',           ('0.0.0.0', '255.255.255.255')),
+    ]
+)
+def test_cidr_to_range(cidr: str, expected: tuple):
+    assert cidr_to_range(cidr) == expected
+    assert [str(prefix) for prefix in range_to_cidrs(*expected)] == [f'{expected[0]}/{cidr.split("/")[1]}']
+
+@pytest.mark.parametrize('line', ['10.0.0.1-10.0.0.9', '10.0.0.1 - 10.0.0.9', '10.0.0.1,10.0.0.9', '10.0.0.1\t10.0.0.9'])
+def test_parse_range(line: str):
+    start, end = parse_range(line)
+    assert (int_to_ip(start), int_to_ip(end)) == ('10.0.0.1', '10.0.0.9')
+
+def test_convert_lines():
+    results = list(convert_lines(['10.0.0.0-10.0.0.2', '10.0.0.0/30', 'nope']))
+    assert [str(prefix) for prefix in results[0][1]] == ['10.0.0.0/31', '10.0.0.2/32']
+    assert results[1] == ('10.0.0.0/30', ('10.0.0.0', '10.0.0.3'), None)
+    assert results[2] == ('nope', None, 'Invalid range: nope')
+
+def test_cli_range(capsys):
+    ipcalc.main(['range', '10.0.0.1', '10.0.0.7'])
+    assert capsys.readouterr().out == '10.0.0.1/32\n10.0.0.2/31\n10.0.0.4/30\n'
+    ipcalc.main(['range', '10.0.0.0/30'])
+    assert capsys.readouterr().out == '10.0.0.0-10.0.0.3\n'
+    with pytest.raises(SystemExit):
+        ipcalc.main(['range', '10.0.0.9', '10.0.0.7'])
+
+def test_cli_range_batch(monkeypatch, capsys):
+    monkeypatch.setattr('sys.stdin', io.StringIO('10.0.0.1-10.0.0.7\nnope\n\n10.0.0.0/8\n'))
+    ipcalc.main(['range', '--batch'])
+    captured = capsys.readouterr()
+    assert captured.out == '10.0.0.1/32 10.0.0.2/31 10.0.0.4/30\n10.0.0.0-10.255.255.255\n'
+    assert captured.err == 'line 2: Invalid range: nope\n'
+
+def test_cli_range_batch_missing(tmp_path):
+    with pytest.raises(SystemExit, match='missing.txt'):
+        ipcalc.main(['range', '--batch', str(tmp_path / 'missing.txt')])
+
+def test_range_prefixes():
+    assert list(range_prefixes(1, 7)) == [(1, 32), (2, 31), (4, 30)]
+    assert list(range_prefixes(0, 0xFFFFFFFF)) == [(0, 0)]
+    assert list(range_prefixes(5, 4)) == []
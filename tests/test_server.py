@@ -0,0 +1,156 @@
+import sys
+import os
+import asyncio
+import json
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from subnet_calc.server import SubnetServer, LatencyHistogram, LATENCY_BUCKETS
+from subnet_calc.wrapper import calc_subnet
+
+TABLE = [('10.0.0.0/8', 'corp'), ('10.1.0.0/16', 'lab')]
+
+async def request(port: int, method: str, target: str, body=None, connection=None):
+    # A minimal HTTP/1.1 client, returning (status, headers, decoded JSON body)
+    reader, writer = connection or await asyncio.open_connection('127.0.0.1', port)
+    data = b'' if body is None else (body if isinstance(body, bytes) else json.dumps(body).encode())
+    writer.write(f'{method} {target} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(data)}\r\n\r\n'.encode() + data)
+    await writer.drain()
+    head = (await reader.readuntil(b'\r\n\r\n')).decode().split('\r\n')
+    headers = dict(line.split(': ', 1) for line in head[1:] if line)
+    payload = json.loads(await reader.readexactly(int(headers['Content-Length'])))
+    if connection is None:
+        writer.close()
+    return int(head[0].split(' ')[1]), headers, payload
+
+def run(test, **options):
+    async def main():
+        async with SubnetServer(port=0, table=TABLE, **options) as server:
+            return await test(server)
+    return asyncio.run(main())
+
+def test_calc():
+    async def test(server):
+        status, _, payload = await request(server.port, 'GET', '/calc?cidr=10.1.2.3/24&fields=network_id,broadcast')
+        assert (status, payload) == (200, calc_subnet('10.1.2.3/24', ['network_id', 'broadcast']).to_dict())
+        status, _, payload = await request(server.port, 'POST', '/calc', {'cidr': '192.168.1.1/30'})
+        assert (status, payload) == (200, calc_subnet('192.168.1.1/30').to_dict())
+        status, _, payload = await request(server.port, 'GET', '/calc?cidr=10.1.2.3')
+        assert (status, payload['output']['result']) == (200, False)
+    run(test)
+
+def test_batch():
+    async def test(server):
+        cidrs = ['10.0.0.0/8', 'nope', '10.0.0.0/8', '172.16.5.4/12']
+        status, _, payload = await request(server.port, 'POST', '/batch', {'cidrs': cidrs, 'fields': ['hosts']})
+        assert status == 200
+        assert payload['results'] == [calc_subnet(cidr, ['hosts']).to_dict() for cidr in cidrs]
+    run(test)
+
+def test_lookup():
+    async def test(server):
+        status, _, payload = await request(server.port, 'GET', '/lookup?ip=10.1.2.3')
+        assert (status, payload) == (200, {'ip': '10.1.2.3', 'prefix': '10.1.0.0/16', 'label': 'lab'})
+        status, _, payload = await request(server.port, 'POST', '/lookup', {'ips': ['10.9.9.9', '8.8.8.8']})
+        assert [result['label'] for result in payload['results']] == ['corp', None]
+        status, _, payload = await request(server.port, 'GET', '/lookup?ip=10.1.2.300')
+        assert status == 400
+    run(test)
+
+@pytest.mark.parametrize(
+    'method,target,body,status',
+    [
+        ('GET',     '/nope',                    None,                               404),
+        ('DELETE',  '/calc',                    None,                               405),
+        ('POST',    '/batch',                   b'{not json',                       400),
+        ('POST',    '/batch',                   {'cidrs': 'not a list'},            400),
+        ('POST',    '/batch',                   {'cidrs': ['10.0.0.0/8'] * 11},     413),
+        ('GET',     '/calc',                    None,                               400),
+        ('GET',     '/calc?cidr=10.0.0.0/8&fields=nope', None,                      400),
+    ]
+)
+def test_errors(method: str, target: str, body, status: int):
+    async def test(server):
+        result = await request(server.port, method, target, body)
+        assert result[0] == status
+        assert 'error' in result[2]
+    run(test, max_batch=10)
+
+def test_body_too_large():
+    async def test(server):
+        status, headers, _ = await request(server.port, 'POST', '/batch', {'cidrs': ['10.0.0.0/8'] * 100})
+        assert (status, headers['Connection']) == (413, 'close')
+    run(test, max_body=100)
+
+@pytest.mark.parametrize('length', ['abc', '-5'])
+def test_bad_content_length(length: str):
+    async def test(server):
+        # The body is never read, so it must not be taken for the next request on the connection
+        reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+        writer.write(f'POST /calc HTTP/1.1\r\nHost: localhost\r\nContent-Length: {length}\r\n\r\n'
+                     'GET /calc?cidr=10.0.0.0/8 HTTP/1.1\r\n\r\n'.encode())
+        await writer.drain()
+        response = (await reader.read()).decode()
+        writer.close()
+        head, _, body = response.partition('\r\n\r\n')
+        assert head.startswith('HTTP/1.1 400 ')
+        assert 'Connection: close' in head
+        assert json.loads(body) == {'error': 'Invalid Content-Length'}
+    run(test)
+
+def test_keep_alive():
+    async def test(server):
+        connection = await asyncio.open_connection('127.0.0.1', server.port)
+        for cidr in ('10.0.0.0/8', '10.0.0.0/16'):
+            status, headers, payload = await request(server.port, 'GET', f'/calc?cidr={cidr}', connection=connection)
+            assert (status, headers['Connection'], payload['input']['CIDR']) == (200, 'keep-alive', cidr)
+        connection[1].close()
+    run(test)
+
+def test_coalescing():
+    async def test(server):
+        cidrs = [f'10.0.{index % 10}.0/24' for index in range(50)]
+        results = await asyncio.gather(*(request(server.port, 'GET', f'/calc?cidr={cidr}') for cidr in cidrs))
+        assert [payload for _, _, payload in results] == [calc_subnet(cidr).to_dict() for cidr in cidrs]
+        _, _, stats = await request(server.port, 'GET', '/stats')
+        assert stats['coalesced']['requests'] == 50
+        assert stats['coalesced']['batches'] < 50
+        assert stats['endpoints']['/calc']['count'] == 50
+    run(test, batch_window=0.01)
+
+def test_coalescing_error(monkeypatch):
+    from subnet_calc import server as server_module
+
+    def calc(cidr, fields):
+        if cidr == '10.0.1.0/24':
+            raise RuntimeError('boom')
+        return calc_subnet(cidr, fields).to_dict()
+    monkeypatch.setattr(server_module, '_calc', calc)
+
+    async def test(server):
+        # One failing calculation must not leave the rest of its batch waiting
+        cidrs = ['10.0.0.0/24', '10.0.1.0/24', '10.0.2.0/24']
+        results = await asyncio.wait_for(asyncio.gather(*(request(server.port, 'GET', f'/calc?cidr={cidr}') for cidr in cidrs)), 5)
+        assert [status for status, _, _ in results] == [200, 500, 200]
+        assert results[2][2] == calc_subnet(cidrs[2]).to_dict()
+    run(test, batch_window=0.01)
+
+def test_backpressure():
+    async def test(server):
+        server._in_flight = server.max_pending # As if max_pending requests were still being handled
+        status, headers, _ = await request(server.port, 'GET', '/calc?cidr=10.0.0.0/8')
+        assert (status, headers['Retry-After']) == (503, '1')
+        server._in_flight = 0
+        assert (await request(server.port, 'GET', '/calc?cidr=10.0.0.0/8'))[0] == 200
+    run(test, max_pending=5)
+
+def test_latency_histogram():
+    histogram = LatencyHistogram()
+    for seconds in (0.00005, 0.0003, 0.0003, 5):
+        histogram.record(seconds)
+    result = histogram.to_dict()
+    assert result['count'] == 4
+    assert (result['buckets_ms']['0.1'], result['buckets_ms']['0.5'], result['buckets_ms']['inf']) == (1, 2, 1)
+    assert sum(result['buckets_ms'].values()) == 4
+    assert len(result['buckets_ms']) == len(LATENCY_BUCKETS) + 1
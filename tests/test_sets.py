@@ -0,0 +1,82 @@
+import sys
+import os
+import random
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from subnet_calc.prefix import Prefix
+from subnet_calc.sets import PrefixSet
+
+def _cidrs(prefix_set: PrefixSet):
+    return [str(prefix) for prefix in prefix_set]
+
+@pytest.mark.parametrize(
+    'prefixes,expected',
+    [
+        ([], []),
+        (['10.0.0.0/24', '10.0.1.0/24'], ['10.0.0.0/23']),
+        (['10.0.1.0/24', '10.0.2.0/24'], ['10.0.1.0/24', '10.0.2.0/24']),
+        (['10.0.0.0/8', '10.1.0.0/16'], ['10.0.0.0/8']),
+        (['10.1.2.3/24'], ['10.1.2.0/24']),
+        (['0.0.0.0/0', '10.0.0.0/8'], ['0.0.0.0/0']),
+        (['255.255.255.255/32', '255.255.255.254/32'], ['255.255.255.254/31']),
+    ]
+)
+def test_prefixes(prefixes: list, expected: list):
+    assert _cidrs(PrefixSet(prefixes)) == expected
+
+def test_operations():
+    allocated = PrefixSet(['10.0.0.0/16'])
+    reserved = PrefixSet(['10.0.0.0/24', '10.0.255.0/24'])
+    in_use = PrefixSet(['10.0.1.0/24', '10.0.2.0/23', '192.168.0.0/24'])
+
+    free = allocated - reserved - in_use
+    assert _cidrs(free) == ['10.0.4.0/22', '10.0.8.0/21', '10.0.16.0/20', '10.0.32.0/19', '10.0.64.0/18', '10.0.128.0/18',
+                            '10.0.192.0/19', '10.0.224.0/20', '10.0.240.0/21', '10.0.248.0/22', '10.0.252.0/23', '10.0.254.0/24']
+    assert free.num_addresses == 65536 - 256 * 5
+    assert _cidrs(allocated & in_use) == ['10.0.1.0/24', '10.0.2.0/23']
+    assert _cidrs(reserved | in_use) == ['10.0.0.0/22', '10.0.255.0/24', '192.168.0.0/24']
+    assert _cidrs(allocated ^ in_use) == _cidrs((allocated - in_use) | PrefixSet(['192.168.0.0/24']))
+    assert (free | reserved | (in_use & allocated)) == allocated
+
+def test_comparisons():
+    small = PrefixSet(['10.1.0.0/16'])
+    large = PrefixSet(['10.0.0.0/8'])
+    assert small <= large and small < large
+    assert large >= small and large > small
+    assert not large <= small
+    assert large <= large and not large < large
+    assert small.isdisjoint(PrefixSet(['11.0.0.0/8']))
+    assert not small.isdisjoint(large)
+    assert PrefixSet(['10.0.0.0/9', '10.128.0.0/9']) == large
+    assert hash(PrefixSet(['10.0.0.0/9', '10.128.0.0/9'])) == hash(large)
+    assert not PrefixSet() and large
+
+def test_contains():
+    prefix_set = PrefixSet(['10.0.0.0/24', '10.0.1.0/24', '192.168.0.0/16'])
+    assert '10.0.1.255' in prefix_set
+    assert (10 << 24) in prefix_set
+    assert '10.0.2.0' not in prefix_set
+    assert '10.0.0.0/23' in prefix_set # Made up of two prefixes, but in a single range
+    assert Prefix.parse('10.0.0.0/22') not in prefix_set
+    assert '9.255.255.255' not in prefix_set
+    assert '255.255.255.255' not in prefix_set
+
+def test_matches_python_sets():
+    # Compare against plain sets of the addresses, in a small address space so they stay small
+    rng = random.Random(6)
+    def random_set():
+        prefixes = [Prefix((10 << 24) | rng.getrandbits(12), rng.randint(22, 32)) for _ in range(40)]
+        addresses = {address for prefix in prefixes for address in range(prefix.network, prefix.broadcast + 1)}
+        return PrefixSet(prefixes), addresses
+
+    for _ in range(20):
+        (left, left_addresses), (right, right_addresses) = random_set(), random_set()
+        for result, expected in [(left | right, left_addresses | right_addresses),
+                                 (left & right, left_addresses & right_addresses),
+                                 (left - right, left_addresses - right_addresses),
+                                 (left ^ right, left_addresses ^ right_addresses)]:
+            assert {address for start, end in result.ranges() for address in range(start, end + 1)} == expected
+            assert result.num_addresses == len(expected)
+            assert result == PrefixSet(result.prefixes()) # The prefixes cover exactly the same addresses
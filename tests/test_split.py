@@ -0,0 +1,87 @@
+import sys
+import os
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from subnet_calc.prefix import Prefix
+from subnet_calc.split import subnets, vlsm_plan
+import ipcalc
+
+@pytest.mark.parametrize(
+    'cidr,new_prefix,expected',
+    [
+        ('192.168.1.0/24',   26,  ['192.168.1.0/26', '192.168.1.64/26', '192.168.1.128/26', '192.168.1.192/26']),
+        ('192.168.1.77/24',  25,  ['192.168.1.0/25', '192.168.1.128/25']), # Host bits are ignored
+        ('10.0.0.0/30',      30,  ['10.0.0.0/30']),
+        ('10.0.0.0/31',      32,  ['10.0.0.0/32', '10.0.0.1/32']),
+    ]
+)
+def test_subnets(cidr: str, new_prefix: int, expected: list):
+    results = subnets(cidr, new_prefix)
+    assert len(results) == len(expected)
+    assert [str(prefix) for prefix in results] == expected
+    assert [str(prefix) for prefix in reversed(results)] == expected[::-1]
+
+def test_subnets_indexing():
+    results = subnets('10.0.0.0/8', 30)
+    assert len(results) == 2**22
+    assert str(results[50000]) == '10.3.13.64/30'
+    assert str(results[-1]) == '10.255.255.252/30'
+    assert [str(prefix) for prefix in results[4:12:4]] == ['10.0.0.16/30', '10.0.0.32/30']
+    assert len(results[1000:]) == 2**22 - 1000
+    with pytest.raises(IndexError):
+        results[2**22]
+
+def test_subnets_membership():
+    results = subnets('10.0.0.0/8', 24)
+    assert '10.20.30.0/24' in results
+    assert Prefix.parse('10.20.30.0/25') not in results
+    assert '11.0.0.0/24' not in results
+    assert results.index('10.0.2.0/24') == 2
+    with pytest.raises(ValueError):
+        results.index('11.0.0.0/24')
+
+def test_subnets_membership_host_bits():
+    results = subnets('10.0.0.0/8', 30)
+    assert '10.3.13.64/30' in results
+    assert '10.3.13.65/30' not in results
+    with pytest.raises(ValueError):
+        results.index('10.3.13.65/30')
+
+@pytest.mark.parametrize('new_prefix', [7, 33])
+def test_subnets_invalid(new_prefix: int):
+    with pytest.raises(ValueError):
+        subnets('10.0.0.0/8', new_prefix)
+
+def test_vlsm_plan():
+    plan = list(vlsm_plan('192.168.1.0/24', [10, 100, 2, 50]))
+    assert [(allocation.index, allocation.hosts, str(allocation.prefix)) for allocation in plan] == [
+        (1, 100, '192.168.1.0/25'),
+        (3, 50,  '192.168.1.128/26'),
+        (0, 10,  '192.168.1.192/28'),
+        (2, 2,   '192.168.1.208/30'),
+    ]
+
+def test_vlsm_plan_exact_fit():
+    plan = vlsm_plan('10.0.0.0/24', [126, 62, 30, 14, 6, 2, 2])
+    assert [str(allocation.prefix) for allocation in plan][-2:] == ['10.0.0.248/30', '10.0.0.252/30']
+
+@pytest.mark.parametrize('host_counts', [[127, 127], [255], [0], [2**32]])
+def test_vlsm_plan_invalid(host_counts: list):
+    # Fails before anything is yielded
+    with pytest.raises(ValueError):
+        vlsm_plan('10.0.0.0/24', host_counts)
+
+def test_cli_subnets(capsys):
+    ipcalc.main(['subnets', '10.0.0.0/8', '/30', '--start', '50000', '--count', '2'])
+    assert capsys.readouterr().out == '10.3.13.64/30\n10.3.13.68/30\n'
+
+def test_cli_vlsm(capsys):
+    ipcalc.main(['vlsm', '192.168.1.0/24', '10', '100'])
+    lines = capsys.readouterr().out.splitlines()
+    assert [line.split()[:2] for line in lines] == [['192.168.1.0/25', '100'], ['192.168.1.128/28', '10']]
+
+def test_cli_vlsm_error():
+    with pytest.raises(SystemExit, match='only has 256'):
+        ipcalc.main(['vlsm', '10.0.0.0/24', '200', '200'])
@@ -0,0 +1,66 @@
+import sys
+import os
+import subprocess
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from subnet_calc.wrapper import calc_subnet
+import ipcalc
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Cold start budget for a single calculation, in milliseconds of import time on top of the interpreter's own start-up.
+# It is about 15 ms on a slow 1 CPU container, so this leaves plenty of room for noise, but not for an accidental
+# top-level import of numpy, asyncio or the process pool (over 100 ms each).
+IMPORT_BUDGET_MS = 60
+
+# Modules the single calculation path must not import
+HEAVY_MODULES = ('argparse', 'json', 'csv', 'numpy', 'asyncio', 'concurrent.futures', 'multiprocessing')
+
+CALCULATE = "import ipcalc; ipcalc.main(['10.1.2.3/24'])"
+
+def import_times(code: str):
+    # Run code with -X importtime and return {module: (cumulative microseconds, nesting level)}. Bytecode caching is
+    # turned back on (and warmed up by a first run), otherwise every run would include compiling the modules.
+    env = {name: value for name, value in os.environ.items() if name != 'PYTHONDONTWRITEBYTECODE'}
+    command = [sys.executable, '-X', 'importtime', '-c', code]
+    subprocess.run(command, cwd=ROOT, env=env, capture_output=True, check=True)
+    stderr = subprocess.run(command, cwd=ROOT, env=env, capture_output=True, text=True, check=True).stderr
+
+    times = {}
+    for line in stderr.splitlines()[1:]:
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = (int(cumulative), (len(name) - len(name.lstrip()) - 1) // 2)
+    return times
+
+def added_import_ms(code: str):
+    # The time spent importing modules that a bare interpreter does not import, taking the best of three runs
+    baseline = import_times('pass')
+    best = None
+    for _ in range(3):
+        total = sum(cumulative for name, (cumulative, level) in import_times(code).items() if level == 0 and name not in baseline)
+        best = total if best is None else min(best, total)
+    return best / 1000
+
+def test_no_heavy_imports():
+    imported = set(import_times(CALCULATE)) - set(import_times('pass'))
+    assert [module for module in HEAVY_MODULES if module in imported] == []
+
+def test_import_budget():
+    assert added_import_ms(CALCULATE) < IMPORT_BUDGET_MS
+
+def test_output(capsys):
+    ipcalc.main(['10.1.2.3/24'])
+    expected = ''.join(f'{section}:\n' + ''.join(f'   {key:<12}:  {value}\n' for key, value in fields.items()) + '\n'
+                       for section, fields in calc_subnet('10.1.2.3/24').to_dict().items())
+    assert capsys.readouterr().out == expected
+    ipcalc.main(['10.1.2.3/33'])
+    assert capsys.readouterr().out == 'Error calculating results\n'
+
+@pytest.mark.parametrize('entry_point', [['-m', 'subnet_calc'], [ROOT]])
+def test_entry_points(entry_point: list):
+    result = subprocess.run([sys.executable, *entry_point, '10.1.2.3/24'], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert '   network_id  :  10.1.2.0' in result.stdout
@@ -0,0 +1,24 @@
+import sys
+import os
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from subnet_calc import tables
+from subnet_calc.helpers import ipv4_bin
+
+@pytest.mark.parametrize('length', range(33))
+def test_prefix_length_tables(length: int):
+    mask = (0xFFFFFFFF << (32 - length)) & 0xFFFFFFFF
+    assert tables.MASKS[length] == mask
+    assert tables.WILDCARDS[length] == ~mask & 0xFFFFFFFF
+    assert tables.HOST_COUNTS[length] == 2**(32 - length) - 2
+    assert tables.MASK_PREFIXES[tables.MASK_STRINGS[length]] == length
+    assert tables.MASK_BINARY[length] == ipv4_bin(tables.MASK_STRINGS[length])
+    assert tables.MASK_BINARY[length].replace('.', '') == '1' * length + '0' * (32 - length)
+
+@pytest.mark.parametrize('address', ['0.0.0.0', '192.168.1.1', '255.255.255.255', '10.0.0.1'])
+def test_bin_int_and_string_agree(address: str):
+    octets = [int(octet) for octet in address.split('.')]
+    value = (octets[0] << 24) | (octets[1] << 16) | (octets[2] << 8) | octets[3]
+    assert ipv4_bin(value) == ipv4_bin(address)
@@ -4,7 +4,7 @@ import pytest
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from subnet_calc.validation import valid_address, valid_cidr, valid_mask
+from subnet_calc.validation import valid_address, valid_cidr, valid_mask, mask_length, parse_cidr, validate_many
 
 @pytest.mark.parametrize(
     'ip,expected',
@@ -54,4 +54,60 @@ def test_valid_cidr(cidr: str, expected: bool):
     ],
 )
 def test_valid_mask(mask: str, expected: bool):
-    assert valid_mask(mask) is expected
\ No newline at end of file
+    assert valid_mask(mask) is expected
+
+@pytest.mark.parametrize(
+    'mask,expected',
+    [
+        ('255.255.255.000', 24),   # Leading zeroes are normalised
+        ('0.0.0.0',          0),
+        ('255.255.255.255', 32),
+        ('128.128.0.0',   None),   # Invalid: each octet is valid but the bits are not contiguous
+        ('255.254.255.0', None),   # Invalid: discontiguous mask
+        ('255.255.255.²', None),   # Invalid: not an ASCII digit
+    ],
+)
+def test_mask_length(mask: str, expected):
+    assert mask_length(mask) == expected
+    assert valid_mask(mask) is (expected is not None)
+
+@pytest.mark.parametrize(
+    'cidr,expected',
+    [
+        ('192.168.1.1/24',    (0xC0A80101, 24, None)),
+        ('0.0.0.0/0',         (0, 0, None)),
+        (' 192.168.1.1 /24',  (0xC0A80101, 24, None)),          # Spaces in the address are ignored
+        ('192.168.1.1',       (None, None, 'missing prefix length')),
+        ('192.168.1.1/33',    (None, None, 'invalid prefix length')),
+        ('192.168.1.1/ 24',   (None, None, 'invalid prefix length')),
+        ('192.168.1.1/2/4',   (None, None, 'invalid prefix length')),
+        ('192.168.1/24',      (None, None, 'invalid address')),
+        ('192.168.1.+1/24',   (None, None, 'invalid address')),  # Not a digit, but int() would accept it
+        ('192.168.1_0.1/24',  (None, None, 'invalid address')),  # Not a digit, but int() would accept it
+        ('192.168.1.١/24',    (None, None, 'invalid address')),  # Not an ASCII digit
+        ('192.168.256.1/24',  (None, None, 'octet out of range')),
+    ],
+)
+def test_parse_cidr(cidr: str, expected):
+    assert parse_cidr(cidr) == expected
+
+@pytest.mark.parametrize(
+    'ip,expected',
+    [
+        ('192.168.1.1',    True),
+        ('192.168.1.',     False),  # Empty octet
+        ('1+0.0.0.1',      False),  # Non-numeric octet
+    ],
+)
+def test_valid_address_strict(ip: str, expected: bool):
+    assert valid_address(ip) is expected
+
+def test_validate_many():
+    valid, errors = validate_many(['10.0.0.0/8', 'foo', ' 10.0.0.0/8', '10.0.0.0/33'])
+    assert valid == bytearray([1, 0, 1, 0])
+    assert errors == [(1, 'missing prefix length'), (3, 'invalid prefix length')]
+
+def test_validate_many_buffer():
+    valid, errors = validate_many(b'10.0.0.0/8\r\n300.0.0.0/8\n192.168.1.0/24\n')
+    assert valid == bytearray([1, 0, 1])
+    assert errors == [(12, 'octet out of range')]
@@ -27,8 +27,89 @@ from subnet_calc.wrapper import calc_subnet
     ("", False),
 ])
 def test_cidr_result_only(input_address, expected_result):
-    result_raw = calc_subnet(input_address)  # This returns JSON string
+    result_raw = calc_subnet(input_address).to_json()  # This returns JSON string
     result_dict = json.loads(result_raw)          # Parse JSON string to dict
     actual_result = result_dict.get('result', None)
     assert actual_result is expected_result
 
+
+def test_result_sections():
+    result = calc_subnet('192.168.1.10/24')
+    assert result.result is True
+    assert result.network['broadcast'] == '192.168.1.255'
+    assert result.hosts['total'] == 254
+    assert list(result.to_dict()) == ['input', 'output', 'network', 'hosts', 'binary']
+    assert json.loads(result.to_json(indent=None)) == result.to_dict()
+
+@pytest.mark.parametrize("input_address, message", [
+    ("192.168.1.1/33", 'Invalid input'),
+    ("8.8.8.8/32", 'Exception: Cannot currently handle /32'),
+])
+def test_result_failure(input_address, message):
+    result = calc_subnet(input_address)
+    assert result.result is False
+    assert result.message == message
+    assert list(result.to_dict()) == ['output']
+
+def test_result_immutable():
+    result = calc_subnet('10.0.0.0/8')
+    with pytest.raises(AttributeError):
+        result.network = {}
+    with pytest.raises(TypeError):
+        result.network['broadcast'] = '1.2.3.4'
+
+@pytest.mark.parametrize('address', ['10.0.0.1/8', '10.0.0.1'])
+def test_result_pickle(address: str):
+    import copy
+    import pickle
+
+    result = calc_subnet(address, ['network', 'hosts'])
+    result.to_dict()
+    for other in (pickle.loads(pickle.dumps(result)), copy.copy(result), copy.deepcopy(result)):
+        assert type(other) is type(result)
+        assert other.to_dict() == result.to_dict()
+
+def test_results_independent():
+    from concurrent.futures import ThreadPoolExecutor
+
+    addresses = [f'10.{i}.0.1/{i % 30 + 1}' for i in range(256)]
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(calc_subnet, addresses))
+    assert [result.input['CIDR'] for result in results] == addresses
+    assert results[0].to_dict() == calc_subnet(addresses[0]).to_dict()
+
+def test_result_lazy(monkeypatch):
+    from subnet_calc import wrapper
+
+    # Count the calculations of each field: only fields that are read are calculated, and only once
+    calls = {}
+    for key, func in list(wrapper._FIELDS.items()):
+        def counted(prefix, address, key=key, func=func):
+            calls[key] = calls.get(key, 0) + 1
+            return func(prefix, address)
+        monkeypatch.setitem(wrapper._FIELDS, key, counted)
+
+    result = calc_subnet('10.1.2.3/8')
+    assert result.broadcast == '10.255.255.255'
+    assert result.get('broadcast') == '10.255.255.255'
+    assert result.get('binary.broadcast') == '00001010.11111111.11111111.11111111'
+    assert calls == {('network', 'broadcast'): 1, ('binary', 'broadcast'): 1}
+
+@pytest.mark.parametrize("fields, expected", [
+    (['network_id', 'broadcast'],   {'network': {'network_id': '10.0.0.0', 'broadcast': '10.255.255.255'}}),
+    (['hosts.total'],               {'hosts': {'total': 16777214}}),
+    (['binary.netmask', 'CIDR'],    {'input': {'CIDR': '10.1.2.3/8'}, 'binary': {'netmask': '11111111.00000000.00000000.00000000'}}),
+])
+def test_result_fields(fields, expected):
+    result = calc_subnet('10.1.2.3/8', fields=fields).to_dict()
+    assert result.pop('output') == {'result': True, 'message': 'Calculations completed'}
+    assert result == expected
+
+def test_result_fields_skip_failures():
+    # The first/last calculation fails for a /32, but only if it is selected
+    assert calc_subnet('8.8.8.8/32', fields=['network']).result is True
+    assert calc_subnet('8.8.8.8/32', fields=['hosts']).result is False
+
+def test_result_unknown_field():
+    with pytest.raises(ValueError):
+        calc_subnet('10.0.0.0/8', fields=['bogus'])